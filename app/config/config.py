@@ -1,13 +1,14 @@
 import os
 from enum import Enum
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseSettings
 
-ROOT = Path(__file__).parent.parent.parent
+from app.core.enums.health_enum import Dependency
+from app.core.enums.triage_mode_enum import TriageMode
 
-print(ROOT)
+ROOT = Path(__file__).parent.parent.parent
 
 
 class BaseConfig(BaseSettings):
@@ -23,11 +24,22 @@ class BaseConfig(BaseSettings):
     # SERVER
     SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int
+    # Production launcher (conf/gunicorn.conf.py); 0 workers = one per available CPU
+    SERVER_WORKERS: int = 0
+    SERVER_MAX_REQUESTS: int = 2000
+    SERVER_MAX_REQUESTS_JITTER: int = 200
+    # Keep above the load balancer idle timeout so it never reuses a connection we closed
+    SERVER_KEEPALIVE: int = 75
+    SERVER_TIMEOUT: int = 120
+    SERVER_GRACEFUL_TIMEOUT: int = 30
 
     # MOCK SERVER
+    # MOCK_ON sends Azure traffic to the local stand-in (python -m mock.server) on PROXY_PORT;
+    # PROXY_ON makes the stand-in forward to the real endpoints and record the responses.
     MOCK_ON: bool
     PROXY_ON: bool
     PROXY_PORT: int
+    MOCK_HOST: str = "127.0.0.1"
 
     # MYSQL
     MYSQL_HOST: str
@@ -49,18 +61,153 @@ class BaseConfig(BaseSettings):
     REDIS_PASSWORD: str
     REDIS_NODES: List[dict] = []
 
+    # METRICS
+    # Shared directory for per-worker snapshots; empty keeps metrics process-local.
+    METRICS_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0
+
+    # TRACING
+    TRACING_ON: bool = True
+    # Head sampling ratio; slow (>= TRACE_TAIL_LATENCY_MS) and 5xx requests are always exported.
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_TAIL_LATENCY_MS: float = 2000.0
+    TRACE_EXPORT_FILE = os.path.join(LOG_DIR, "azure_vision.traces.jsonl")
+    # OTLP/HTTP JSON endpoint, e.g. http://otel-collector:4318/v1/traces; empty writes TRACE_EXPORT_FILE.
+    TRACE_EXPORT_URL: str = ""
+
+    # DOCUMENT OCR
+    # Concurrent Azure read calls per worker for multi-page documents and tiles
+    OCR_CONCURRENCY: int = 8
+    OCR_MAX_PAGES: int = 50
+    PDF_RENDER_DPI: int = 200
+    # Images with a side above the threshold are read as overlapping tiles at full resolution
+    OCR_TILE_THRESHOLD: int = 10000
+    OCR_TILE_SIZE: int = 4000
+    # Must exceed the widest word, or words cut at a tile edge can be lost
+    OCR_TILE_OVERLAP: int = 384
+
+    # TRIAGE
+    # Local checks on a downsampled copy before paying for an Azure call
+    TRIAGE_MODE: TriageMode = TriageMode.REJECT
+    TRIAGE_SAMPLE_SIDE: int = 512
+    # Shorter side of the original image, in px
+    TRIAGE_MIN_SIDE: int = 200
+    # Grey levels from the median paper level at which a pixel counts as ink
+    TRIAGE_INK_CONTRAST: int = 48
+    # Share of ink pixels below which a page is blank; one line of text on A4 is well above it
+    TRIAGE_MIN_INK: float = 0.0002
+    # Mean grey level below which a frame is black (lens cap, pocket shot)
+    TRIAGE_MIN_MEAN: float = 16.0
+    # Variance of the Laplacian around the ink; lower is blurrier
+    TRIAGE_MIN_SHARPNESS: float = 40.0
+    # Share of Canny edge pixels around the ink; printed text is well above it
+    TRIAGE_MIN_EDGE_DENSITY: float = 0.004
+
+    # NEAR DUPLICATE
+    # Perceptual-hash index in Redis (needs REDIS_ON); near-duplicates reuse the stored result
+    NEAR_DUP_ON: bool = True
+    # 1 - max differing bits / 64 for both pHash and dHash
+    NEAR_DUP_MIN_SIMILARITY: float = 0.9
+    # Largest normalised thumbnail cell difference of a confirmed match; a changed text line scores about 1
+    NEAR_DUP_MAX_DIFFERENCE: float = 0.5
+    # Receipts feed the rollups and exports: off unless a reused result is acceptable
+    NEAR_DUP_RECEIPTS_ON: bool = False
+    # Multi-index hashing bands; more bands probe fewer keys per band but find more candidates
+    NEAR_DUP_BANDS: int = 4
+    NEAR_DUP_TTL: int = 30 * 24 * 3600
+    # Cached analysis results (Redis) behind near-duplicates and region queries
+    RESULT_CACHE_TTL: int = 30 * 24 * 3600
+    # Word indexes kept per worker for region queries
+    REGION_INDEX_CACHE_SIZE: int = 256
+
+    # URL FETCH
+    # /ocr/?fetch=true downloads the image here instead of letting Azure fetch the URL
+    URL_FETCH_TIMEOUT: float = 15.0
+    URL_FETCH_MAX_BYTES: int = 20 * 1024 * 1024
+    URL_FETCH_MAX_REDIRECTS: int = 3
+    # Downloads in flight per worker, and per host
+    URL_FETCH_CONCURRENCY: int = 32
+    URL_FETCH_HOST_CONCURRENCY: int = 4
+    # Host names (and their subdomains) images may be fetched from, internal ones included;
+    # empty allows any host that resolves to public addresses only
+    URL_FETCH_ALLOWED_HOSTS: List[str] = []
+
+    # WEBHOOK
+    # Callbacks are signed with HMAC-SHA256 of WEBHOOK_SECRET, or JWT_SECRET_KEY when empty
+    WEBHOOK_ON: bool = True
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    # Retry n waits min(BASE * 2 ** (n - 1), MAX) seconds, jittered down to half
+    WEBHOOK_BACKOFF_BASE: float = 2.0
+    WEBHOOK_BACKOFF_MAX: float = 600.0
+    # Deliveries in flight per worker, and per receiving host
+    WEBHOOK_CONCURRENCY: int = 32
+    WEBHOOK_HOST_CONCURRENCY: int = 4
+    # Outbox poll interval when idle; new jobs wake the dispatcher of their worker at once
+    WEBHOOK_POLL_INTERVAL: float = 2.0
+    # Seconds after which an accepted job that never finished (its worker restarted) is called back as failed
+    WEBHOOK_JOB_TIMEOUT: int = 1800
+    # Callback host names (and their subdomains), as URL_FETCH_ALLOWED_HOSTS
+    WEBHOOK_ALLOWED_HOSTS: List[str] = []
+
+    # HEALTH
+    # Dependencies are probed in the background; /health/ready only reads the last results
+    HEALTH_PROBE_INTERVAL: float = 10.0
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    # A failing required dependency takes the worker out of rotation; Redis users fail open
+    HEALTH_REQUIRED: List[Dependency] = [Dependency.DATABASE, Dependency.AZURE]
+    # Not ready while more calls than this wait for an OCR slot or a worker thread (0 disables)
+    HEALTH_MAX_OCR_WAITING: int = 32
+    HEALTH_MAX_THREAD_WAITING: int = 32
+
+    # ADMIN
+    # Token for /admin and for profiling requests (X-Admin-Token); empty disables both
+    ADMIN_TOKEN: str = ""
+
+    # PROFILING
+    PROFILE_INTERVAL_MS: float = 5.0
+    # Upper bound of any profile, request or worker window
+    PROFILE_MAX_SECONDS: float = 300.0
+    PROFILE_DIR = os.path.join(LOG_DIR, "profiles")
+
+    # MEMORY
+    # RSS growth per request, as a metric and on the request trace
+    MEMORY_TRACKING_ON: bool = True
+    # Share of requests also traced by tracemalloc (peak allocation, per-stage deltas); 0 disables
+    MEMORY_TRACEMALLOC_SAMPLE_RATE: float = 0.0
+    MEMORY_TRACEMALLOC_FRAMES: int = 1
+    # Requests growing RSS by more than this are logged with their request id
+    MEMORY_WARN_RSS_DELTA_MB: float = 256.0
+    # /admin/memory snapshots kept besides the baseline
+    MEMORY_SNAPSHOTS_KEPT: int = 4
+
+    # COMPRESSION
+    # gzip, or brotli when the `brotli` package is installed, for JSON/NDJSON/text bodies
+    COMPRESSION_ON: bool = True
+    # Smaller single-body responses are sent as is; streamed bodies are always compressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
     # RETRY
     RETRY_TIMES = 1
 
     # LOG
     AZURE_VISION_ERROR = "AZURE_VISION_ERROR"
     AZURE_VISION_INFO = "AZURE_VISION_INFO"
+    LOG_LEVEL: str = "DEBUG"
+    LOG_JSON_ON: bool = False
+    LOG_JSON_NAME = os.path.join(LOG_DIR, "azure_vision.json.log")
+    # Keep ratio per Log name for records below WARNING, e.g. {"OCR Route": 0.1}
+    LOG_JSON_SAMPLING: Dict[str, float] = {}
 
     # JWT
     JWT_ALGORITHM: str = "HS256"
     JWT_AUD_CREATE: str = "azure_vision:create"
     JWT_AUD_VERIFY: str = "azure_vision:verify"
     JWT_AUD_RESET: str = "azure_vision:reset"
+    JWT_SECRET_KEY: str = ""
 
     # AZURE
     AZURE_VISION_KEY: str = ""
@@ -68,6 +215,7 @@ class BaseConfig(BaseSettings):
     AZURE_VISION_API_ENDPOINT: str = ""
     AZURE_FORM_RECOGNIZER_KEY: str = ""
     AZURE_FORM_RECOGNIZER_ENDPOINT: str = ""
+    AZURE_HTTP_POOL_SIZE: int = 32
 
 
 class DevConfig(BaseConfig):
@@ -93,6 +241,10 @@ Config.REDIS_NODES = [
     }
 ]
 
+if Config.MOCK_ON:
+    Config.AZURE_VISION_ENDPOINT = f"http://{Config.MOCK_HOST}:{Config.PROXY_PORT}/"
+    Config.AZURE_FORM_RECOGNIZER_ENDPOINT = f"http://{Config.MOCK_HOST}:{Config.PROXY_PORT}/"
+
 
 class AppEnv(str, Enum):
     local = "local"
@@ -0,0 +1,20 @@
+import hmac
+
+from fastapi import Header
+
+from app.config.config import Config
+from app.core.exceptions import UnauthorizedException
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin(token: str) -> bool:
+    """
+    True when `token` is ADMIN_TOKEN; always False while ADMIN_TOKEN is unset.
+    """
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode())
+
+
+async def require_admin(x_admin_token: str = Header("", alias=ADMIN_TOKEN_HEADER)):
+    if not is_admin(x_admin_token):
+        raise UnauthorizedException("A valid X-Admin-Token header is required.")
@@ -1,6 +1,10 @@
-import requests
+import os
+
+import anyio
+
 from app.config.config import Config
 from app.core.enums.content_type_enum import ContentType
+from app.core.metrics.metrics import observe_azure_response, track_stage
 
 from app.utils.logger import Log
 
@@ -12,6 +16,34 @@ AZURE_VISION_PARAMS: dict = {
 
 log = Log("OCR Route")
 
+_http_session = None
+
+
+def get_http_session():
+    """
+    Keep-alive connection pool to Azure, created lazily in each process.
+    """
+    global _http_session
+    if _http_session is None:
+        # requests is imported here, on the first Azure call, to keep startup fast.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.AZURE_HTTP_POOL_SIZE)
+        _http_session = requests.Session()
+        _http_session.mount("https://", adapter)
+        _http_session.mount("http://", adapter)
+    return _http_session
+
+
+def _reset_http_session():
+    # A forked worker must not reuse the parent's sockets.
+    global _http_session
+    _http_session = None
+
+
+os.register_at_fork(after_in_child=_reset_http_session)
+
 
 def extract_text_from_images(data, content_type: str):
     # Prepare the headers
@@ -24,16 +56,46 @@ def extract_text_from_images(data, content_type: str):
     azure_url = Config.AZURE_VISION_ENDPOINT + Config.AZURE_VISION_API_ENDPOINT
 
     # Send the REST request
-    response = requests.post(
-        azure_url,
-        headers=headers,
-        params=AZURE_VISION_PARAMS,
-        json=data if content_type == ContentType.JSON else None,
-        data=data if content_type == ContentType.OCTET_STREAM else None,
-    )
+    with track_stage("azure_read") as stage:
+        response = get_http_session().post(
+            azure_url,
+            headers=headers,
+            params=AZURE_VISION_PARAMS,
+            json=data if content_type == ContentType.JSON else None,
+            data=data if content_type == ContentType.OCTET_STREAM else None,
+        )
+        stage.set("http.status_code", response.status_code)
+    observe_azure_response("read", response.status_code, len(data) if isinstance(data, bytes) else 0)
 
     # Handle the response
     if response.status_code == 200:
         return response.json()
     else:
         return ("Error:", response.status_code, response.text)
+
+
+_ocr_limiter = None
+
+
+def _get_ocr_limiter() -> anyio.CapacityLimiter:
+    # Created inside the event loop on first use; shared by every request of the worker.
+    global _ocr_limiter
+    if _ocr_limiter is None:
+        _ocr_limiter = anyio.CapacityLimiter(Config.OCR_CONCURRENCY)
+    return _ocr_limiter
+
+
+def ocr_waiting() -> int:
+    """
+    Calls of this worker waiting for an OCR_CONCURRENCY slot.
+    """
+    return _ocr_limiter.statistics().tasks_waiting if _ocr_limiter is not None else 0
+
+
+async def extract_text_concurrently(data, content_type: str):
+    """
+    Run extract_text_from_images in a worker thread, at most OCR_CONCURRENCY
+    calls per process at a time, so page and tile fan-out stays within the
+    Azure rate budget and does not block the event loop.
+    """
+    return await anyio.to_thread.run_sync(extract_text_from_images, data, content_type, limiter=_get_ocr_limiter())
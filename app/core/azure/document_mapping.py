@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from app.core.entities.receipt.receipt import Receipt, ReceiptItem
+
+
+def identity(value: Any) -> Any:
+    return value
+
+
+def amount(value: Any) -> str:
+    # Currency fields are CurrencyValue objects; str() of one prepends the symbol ("¥1100.0").
+    value = getattr(value, "amount", value)
+    return "" if value is None else str(value)
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    Maps one Azure document field onto an entity attribute.
+    """
+
+    source: str
+    target: str
+    convert: Callable[[Any], Any] = identity
+
+
+@dataclass(frozen=True)
+class CollectionSpec:
+    """
+    Maps an Azure list field (e.g. receipt Items) onto entities appended to the parent.
+    """
+
+    source: str
+    entity: type
+    fields: Tuple[FieldSpec, ...]
+    add: str
+    index: Dict[str, FieldSpec] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "index", {spec.source: spec for spec in self.fields})
+
+
+@dataclass(frozen=True)
+class DocumentModel:
+    """
+    Declarative description of a prebuilt Form Recognizer model.
+
+    Adding a document type means adding an entity dataclass and one of these,
+    the extraction code itself does not change.
+    """
+
+    model_id: str
+    entity: type
+    fields: Tuple[FieldSpec, ...]
+    collections: Tuple[CollectionSpec, ...] = ()
+    locale: str = "ja-JP"
+    index: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Lookup by Azure field name so extraction is one pass over the document fields.
+        index: Dict[str, Any] = {spec.source: spec for spec in self.fields}
+        index.update({spec.source: spec for spec in self.collections})
+        object.__setattr__(self, "index", index)
+
+
+def extract_fields(fields: Optional[Mapping[str, Any]], specs: Mapping[str, FieldSpec], target: Any) -> Any:
+    """
+    Copy mapped field values and their confidences onto target.
+
+    Fields without a spec, and fields Azure returned without a value, are skipped.
+    """
+    for name, document_field in (fields or {}).items():
+        spec = specs.get(name)
+        if spec is None or document_field is None or document_field.value is None:
+            continue
+        if isinstance(spec, CollectionSpec):
+            add = getattr(target, spec.add)
+            for item in document_field.value:
+                add(extract_fields(item.value, spec.index, spec.entity()))
+            continue
+        setattr(target, spec.target, spec.convert(document_field.value))
+        target.confidences[spec.target] = document_field.confidence
+    return target
+
+
+RECEIPT_ITEM_FIELDS = (
+    FieldSpec("Description", "description"),
+    FieldSpec("Quantity", "quantity"),
+    FieldSpec("Price", "price", amount),
+    FieldSpec("TotalPrice", "total_price", amount),
+)
+
+RECEIPT_MODEL = DocumentModel(
+    model_id="prebuilt-receipt",
+    entity=Receipt,
+    fields=(
+        FieldSpec("MerchantName", "merchant_name"),
+        FieldSpec("TransactionDate", "transaction_date"),
+        FieldSpec("MerchantAddress", "address"),
+        FieldSpec("MerchantPhoneNumber", "phone_number"),
+        FieldSpec("TransactionTime", "transaction_time"),
+        FieldSpec("Subtotal", "subtotal", amount),
+        FieldSpec("TotalTax", "tax", amount),
+        FieldSpec("Tip", "tip", amount),
+        FieldSpec("Total", "total", amount),
+    ),
+    collections=(CollectionSpec("Items", ReceiptItem, RECEIPT_ITEM_FIELDS, "add_receipt_item"),),
+)
+
+DOCUMENT_MODELS = {model.model_id: model for model in (RECEIPT_MODEL,)}
@@ -0,0 +1,287 @@
+"""
+Offline bulk OCR / receipt analysis of archived scans, resumable.
+
+    python -m app.core.bulk.bulk scans/ --output scans.ndjson
+    python -m app.core.bulk.bulk --manifest files.txt --pipeline receipt --output receipts.parquet --format parquet
+    python -m app.core.bulk.bulk scans/ --output scans.ndjson --concurrency 16 --processes 8 --index
+
+Files are read, hashed, decoded, triaged and re-encoded in a process pool
+(--processes) while up to --concurrency Azure calls are in flight. One record
+per input is written to NDJSON, or to a directory of Parquet part files, and
+inputs are checkpointed next to the output (`<output>.checkpoint`) once their
+record is on disk: running the same command again skips what is done. With
+--index, results are also stored the way the API stores them (search index,
+result cache, receipts table).
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+import anyio
+
+from app.config.config import Config
+from app.core.enums.content_type_enum import ContentType
+from app.core.export.receipt_export import parquet_available
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+# Form Recognizer also reads PDFs; they skip decoding and triage.
+RECEIPT_SUFFIXES = IMAGE_SUFFIXES | {".pdf"}
+
+
+class Prepared(NamedTuple):
+    path: str
+    document_id: str
+    # JPEG to send to Azure; None for tiled images, receipts and failures.
+    payload: Optional[bytes] = None
+    tiled: bool = False
+    error: Optional[str] = None
+    rejected: bool = False
+
+
+def prepare(path: str, pipeline: str) -> Prepared:
+    """
+    The CPU-bound half of the pipeline, run in a pool process.
+    """
+    from app.core.document.tiling import needs_tiling
+    from app.core.triage.triage import triage
+    from app.helpers.converter import convert_image_to_bytes, decode_image
+
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        return Prepared(path, "", error=f"{type(e).__name__}: {e}")
+    document_id = hashlib.sha256(raw).hexdigest()
+    if pipeline == "receipt" and path.lower().endswith(".pdf"):
+        return Prepared(path, document_id)
+
+    image = decode_image(raw)
+    if image is None:
+        return Prepared(path, document_id, error="not a decodable image")
+    verdict = triage(image)
+    if verdict.rejected:
+        return Prepared(path, document_id, error=verdict.reason.code, rejected=True)
+    if pipeline == "receipt":
+        return Prepared(path, document_id)
+    if needs_tiling(image):
+        return Prepared(path, document_id, tiled=True)
+    return Prepared(path, document_id, payload=convert_image_to_bytes(image))
+
+
+def discover(source: Optional[str], manifest: Optional[str], suffixes: set) -> Iterator[str]:
+    """
+    Input files in a stable order: the manifest's lines as given, or the
+    directory tree sorted.
+    """
+    if manifest:
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        return
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in suffixes:
+                yield os.path.join(root, name)
+
+
+class Progress(object):
+    """
+    Throughput over the last minute, ETA and outcome counts, on stderr.
+    """
+
+    def __init__(self, total: int, skipped: int, interval: float):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.started = time.monotonic()
+        self.window = deque([(self.started, 0)])
+        self.last_report = self.started
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    def update(self, status: str):
+        self.counts[status] += 1
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.window.append((now, self.done))
+            while len(self.window) > 2 and now - self.window[0][0] > 60:
+                self.window.popleft()
+            self.report()
+
+    def rate(self) -> float:
+        (start, done_then), (now, done_now) = self.window[0], (time.monotonic(), self.done)
+        return (done_now - done_then) / (now - start) if now > start else 0.0
+
+    def report(self, final: bool = False):
+        done, rate = self.done, self.rate()
+        if final:
+            elapsed = time.monotonic() - self.started
+            rate = done / elapsed if elapsed else 0.0
+        eta = (self.total - done) / rate if rate and not final else 0
+        outcomes = " ".join(f"{status}={count}" for status, count in sorted(self.counts.items()))
+        line = (
+            f"{done}/{self.total} ({done / self.total:.1%}) {rate:.1f} files/s "
+            f"ETA {time.strftime('%H:%M:%S', time.gmtime(eta))} {outcomes}"
+            if self.total
+            else "nothing to do"
+        )
+        if self.skipped:
+            line += f" (resumed, {self.skipped} already done)"
+        print(("done: " if final else "") + line, file=sys.stderr, flush=True)
+
+
+class BulkRunner(object):
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, paths: List[str], writer, progress: Progress):
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(self.args.processes)
+        inputs = iter(paths)
+
+        async def worker():
+            for path in inputs:
+                prepared = await loop.run_in_executor(self.pool, prepare, path, self.args.pipeline)
+                record = await self.process(prepared)
+                writer.add(record)
+                progress.update(record["status"])
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def process(self, prepared: Prepared) -> dict:
+        record = {"path": prepared.path, "document_id": prepared.document_id}
+        if prepared.error:
+            return dict(record, status="rejected" if prepared.rejected else "error", error=prepared.error)
+        try:
+            if self.args.pipeline == "receipt":
+                return await self._receipt(prepared, record)
+            return await self._ocr(prepared, record)
+        except Exception as e:
+            return dict(record, status="error", error=f"{type(e).__name__}: {e}")
+
+    async def _ocr(self, prepared: Prepared, record: dict) -> dict:
+        from app.core.azure.azure_vision import extract_text_concurrently
+        from app.core.cache.result_cache import OCR_RESULTS
+        from app.core.document.tiling import ocr_tiled
+        from app.core.search.ocr_search import index_document
+        from app.helpers.converter import decode_image
+
+        if prepared.tiled:
+            raw = await anyio.to_thread.run_sync(lambda: open(prepared.path, "rb").read())
+            result = await ocr_tiled(await anyio.to_thread.run_sync(decode_image, raw))
+        else:
+            result = await extract_text_concurrently(prepared.payload, ContentType.OCTET_STREAM)
+        if isinstance(result, tuple):
+            # ("Error:", status, text) from a non-200 Azure answer.
+            return dict(record, status="error", error=f"azure {result[1]}: {result[2][:200]}")
+
+        if self.args.index:
+            await index_document(prepared.document_id, prepared.path, result)
+            await OCR_RESULTS.put(prepared.document_id, result)
+        text = (result.get("readResult") or {}).get("content")
+        return dict(record, status="ok", text=text, result=result)
+
+    async def _receipt(self, prepared: Prepared, record: dict) -> dict:
+        from app.core.azure.azure_receipt import analyze_receipt_concurrently
+        from app.core.cache.result_cache import RECEIPT_RESULTS
+        from app.core.database import get_async_session
+        from app.core.entities.receipt.receipt import Receipt
+        from app.core.receipt.receipt_store import store_receipt
+
+        result = await analyze_receipt_concurrently(prepared.path)
+        if not isinstance(result, Receipt):
+            return dict(record, status="error", error="receipt analysis failed")
+        result.receipt_id = prepared.document_id
+
+        if self.args.index:
+            session = get_async_session().session_factory()
+            try:
+                await store_receipt(session, prepared.document_id, result)
+            finally:
+                await session.close()
+            await RECEIPT_RESULTS.put(prepared.document_id, result)
+        return dict(record, status="ok", result=result)
+
+
+async def run(args: argparse.Namespace) -> Counter:
+    from app.core.bulk.output import NDJSONWriter, ParquetWriter, load_checkpoint
+    from app.core.database import dispose_engine
+
+    suffixes = RECEIPT_SUFFIXES if args.pipeline == "receipt" else IMAGE_SUFFIXES
+    paths: Iterable[str] = discover(args.source, args.manifest, suffixes)
+    checkpoint = args.checkpoint or args.output.rstrip("/") + ".checkpoint"
+    done = load_checkpoint(checkpoint)
+    todo, skipped = [], 0
+    for path in paths:
+        if path in done:
+            skipped += 1
+        else:
+            todo.append(path)
+    if args.limit:
+        todo = todo[: args.limit]
+
+    writer_class = ParquetWriter if args.format == "parquet" else NDJSONWriter
+    writer = writer_class(args.output, checkpoint, args.batch_size)
+    progress = Progress(len(todo), skipped, args.progress_interval)
+    try:
+        await BulkRunner(args).run(todo, writer, progress)
+    finally:
+        writer.close()
+        progress.report(final=True)
+        if args.index:
+            await dispose_engine()
+    return progress.counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.core.bulk.bulk", description="Bulk OCR of archived scans.")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("source", nargs="?", help="Directory walked recursively for images.")
+    inputs.add_argument("--manifest", help="File with one input path per line.")
+    parser.add_argument("--output", required=True, help="NDJSON file, or Parquet dataset directory.")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], help="Defaults from the output extension.")
+    parser.add_argument("--pipeline", choices=["ocr", "receipt"], default="ocr")
+    parser.add_argument("--concurrency", type=int, default=Config.OCR_CONCURRENCY, help="Azure calls in flight.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Decode/triage processes.")
+    parser.add_argument("--checkpoint", help="Defaults to <output>.checkpoint.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per write and checkpoint.")
+    parser.add_argument("--index", action="store_true", help="Also store results like the API (needs MySQL/Redis).")
+    parser.add_argument("--limit", type=int, default=0, help="Process at most this many new inputs.")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines.")
+    args = parser.parse_args(argv)
+
+    args.format = args.format or ("parquet" if args.output.rstrip("/").endswith(".parquet") else "ndjson")
+    if args.format == "parquet" and not parquet_available():
+        parser.error("--format parquet requires pyarrow to be installed")
+    if args.source and not os.path.isdir(args.source):
+        parser.error(f"{args.source} is not a directory")
+    # Bounds both the page/tile fan-out and the receipt threads, like OCR_CONCURRENCY in the API.
+    Config.OCR_CONCURRENCY = args.concurrency
+
+    try:
+        counts = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+    return 1 if counts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Set
+
+from app.core.schema.orjson_response import dumps
+
+# Parquet columns; the full result stays a JSON string so every pipeline shares one schema.
+PARQUET_COLUMNS = ("path", "document_id", "status", "error", "text", "result")
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Inputs already written by an earlier run; a torn last line is ignored.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        lines = f.read().split(b"\n")
+    # Only newline-terminated entries were fully written.
+    return {line.decode() for line in lines[:-1] if line}
+
+
+class ResultWriter(ABC):
+    """
+    Buffers records and writes them in batches, then checkpoints their inputs.
+
+    An input is added to the checkpoint only after its record is on disk, so
+    a run killed at any point resumes without losing results; at worst the
+    records of the last batch are written twice (same path, same result).
+    """
+
+    def __init__(self, output: str, checkpoint: str, batch_size: int):
+        self.output = output
+        self.checkpoint = open(checkpoint, "ab")
+        self.batch_size = batch_size
+        self.records: List[dict] = []
+
+    def add(self, record: dict):
+        self.records.append(record)
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.records:
+            return
+        self._write(self.records)
+        self.checkpoint.write(b"".join(record["path"].encode() + b"\n" for record in self.records))
+        self.checkpoint.flush()
+        os.fsync(self.checkpoint.fileno())
+        self.records = []
+
+    @abstractmethod
+    def _write(self, records: List[dict]):
+        """
+        Append `records` to the output durably before returning.
+        """
+
+    def close(self):
+        self.flush()
+        self.checkpoint.close()
+
+
+class NDJSONWriter(ResultWriter):
+    def __init__(self, output: str, checkpoint: str, batch_size: int):
+        super().__init__(output, checkpoint, batch_size)
+        self.file = open(output, "ab")
+
+    def _write(self, records: List[dict]):
+        self.file.write(b"".join(dumps(record) + b"\n" for record in records))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class ParquetWriter(ResultWriter):
+    """
+    A Parquet dataset: `output` is a directory and every batch a new part
+    file, which is what makes appending on resume possible. pyarrow is an
+    optional dependency that is only needed for this format.
+    """
+
+    def __init__(self, output: str, checkpoint: str, batch_size: int):
+        super().__init__(output, checkpoint, batch_size)
+        os.makedirs(output, exist_ok=True)
+        self.part = sum(1 for name in os.listdir(output) if name.endswith(".parquet"))
+
+    def _write(self, records: List[dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {column: [record.get(column) for record in records] for column in PARQUET_COLUMNS}
+        columns["result"] = [None if result is None else dumps(result).decode() for result in columns["result"]]
+        table = pa.table(columns, schema=pa.schema([(column, pa.string()) for column in PARQUET_COLUMNS]))
+        name = os.path.join(self.output, f"part-{self.part:05d}.parquet")
+        # Written under a temporary name, so a killed run never leaves a torn part behind.
+        pq.write_table(table, name + ".tmp")
+        os.replace(name + ".tmp", name)
+        self.part += 1
@@ -0,0 +1,67 @@
+from typing import Optional
+
+import orjson
+
+from app.config.config import Config
+from app.core.metrics.metrics import CACHE_LOOKUPS
+from app.core.redis.redis import get_redis
+from app.core.schema.orjson_response import dumps
+from app.utils.logger import Log
+
+log = Log("Result Cache")
+
+
+class ResultCache(object):
+    """
+    Analysis results by document id in Redis (`{namespace}:result:{id}`), so
+    near-duplicates and region queries are answered without calling Azure.
+
+    Best effort: it is a no-op without REDIS_ON and Redis errors are logged,
+    never raised.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    @property
+    def enabled(self) -> bool:
+        return Config.REDIS_ON
+
+    def key(self, document_id: str) -> str:
+        return f"{self.namespace}:result:{document_id}"
+
+    async def get(self, document_id: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        try:
+            value = await get_redis().get(self.key(document_id))
+        except Exception as e:
+            log.warning("result cache get failed: {}", e)
+            CACHE_LOOKUPS.labels(f"{self.namespace}_result", "error").inc()
+            return None
+        CACHE_LOOKUPS.labels(f"{self.namespace}_result", "miss" if value is None else "hit").inc()
+        return None if value is None else orjson.loads(value)
+
+    async def put(self, document_id: str, result):
+        """
+        Cache a result for RESULT_CACHE_TTL; meant to run as a background task.
+        """
+        if not self.enabled or result is None or isinstance(result, tuple):
+            # ("Error:", status, text) answers are not worth keeping.
+            return
+        try:
+            await get_redis().set(self.key(document_id), dumps(result), ex=Config.RESULT_CACHE_TTL)
+        except Exception as e:
+            log.warning("result cache put failed: {}", e)
+
+    async def discard(self, document_id: str):
+        if not self.enabled:
+            return
+        try:
+            await get_redis().delete(self.key(document_id))
+        except Exception as e:
+            log.warning("result cache discard failed: {}", e)
+
+
+OCR_RESULTS = ResultCache("ocr")
+RECEIPT_RESULTS = ResultCache("receipt")
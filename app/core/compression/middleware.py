@@ -0,0 +1,132 @@
+import importlib.util
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import Config
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "text/")
+
+
+def brotli_available() -> bool:
+    return importlib.util.find_spec("brotli") is not None
+
+
+def choose_encoding(accept_encoding: str, brotli: bool) -> Optional[str]:
+    """
+    Preferred of br/gzip the client accepts (q > 0), or None for identity.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli else ("gzip",)
+    scored = [(accepted.get(name, wildcard), -rank, name) for rank, name in enumerate(candidates)]
+    quality, _, name = max(scored)
+    return name if quality > 0 else None
+
+
+class _Compressor(object):
+    __slots__ = ("encoding", "compressor")
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            import brotli
+
+            self.compressor = brotli.Compressor(quality=Config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(Config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self.compressor.process(data)
+            return out + (self.compressor.finish() if final else self.compressor.flush())
+        out = self.compressor.compress(data)
+        return out + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware(object):
+    """
+    Negotiated gzip/brotli response compression.
+
+    Bodies below COMPRESSION_MIN_SIZE, non-text types and responses that
+    already carry a Content-Encoding pass through untouched. A streamed body
+    (NDJSON pages) is compressed chunk by chunk with a sync flush, so each
+    line still reaches the client as soon as it is produced. Brotli is used
+    when the optional `brotli` package is installed and the client prefers it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.brotli = brotli_available()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.brotli)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body part shows whether compression pays off.
+                start = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                if passthrough or (not more_body and len(body) < Config.COMPRESSION_MIN_SIZE):
+                    MutableHeaders(scope=response_start).add_vary_header("Accept-Encoding")
+                    passthrough = True
+                    await send(response_start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = MutableHeaders(scope=response_start)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = compressor.compress(body, final=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(response_start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+            if passthrough:
+                await send(message)
+                return
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": compressor.compress(body, final=not more_body),
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_wrapper)
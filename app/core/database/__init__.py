@@ -1,7 +1,8 @@
 from asyncio import current_task
-from typing import AsyncGenerator, TypeVar
+from typing import AsyncGenerator, Optional, TypeVar
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_scoped_session,
     create_async_engine,
@@ -18,28 +19,60 @@ MYSQL_URL = (
     f"/{Config.MYSQL_DB_NAME}?charset=utf8mb4"
 )
 
-async_engine = create_async_engine(MYSQL_URL, echo=True)
-AsyncSessionLocal = async_scoped_session(
-    sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=async_engine,
-        future=True,
-        class_=AsyncSession,
-    ),
-    scopefunc=current_task,
-)
+# Created on first use (API startup, or on demand in CLI tools) rather than at
+# import, so importing the app stays cheap and every worker owns its own pool.
+_async_engine: Optional[AsyncEngine] = None
+_async_session: Optional[async_scoped_session] = None
 
 Base: DeclarativeMeta = declarative_base()
 
 BaseT = TypeVar("BaseT", bound=DeclarativeMeta)
 
 
+def get_engine() -> AsyncEngine:
+    """
+    @brief Get the async engine, creating it on first use.
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(MYSQL_URL, echo=True)
+    return _async_engine
+
+
+def get_async_session() -> async_scoped_session:
+    """
+    @brief Get the task-scoped session registry, creating it on first use.
+    """
+    global _async_session
+    if _async_session is None:
+        _async_session = async_scoped_session(
+            sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=get_engine(),
+                future=True,
+                class_=AsyncSession,
+            ),
+            scopefunc=current_task,
+        )
+    return _async_session
+
+
+async def dispose_engine():
+    """
+    @brief Close pooled connections and forget the engine.
+    """
+    global _async_engine, _async_session
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session = None
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     @brief Get a database.
     """
-    async with AsyncSessionLocal() as session:
+    async with get_async_session()() as session:
         try:
             yield session
         finally:
@@ -0,0 +1,11 @@
+from .ocr_document import OcrDocument
+from .receipt import ReceiptItemRecord, ReceiptRecord, ReceiptRollup
+from .webhook_delivery import WebhookDelivery
+
+__all__ = [
+    "OcrDocument",
+    "ReceiptRecord",
+    "ReceiptItemRecord",
+    "ReceiptRollup",
+    "WebhookDelivery",
+]
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, String, func
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+from app.core.database import Base
+
+
+class OcrDocument(Base):
+    __tablename__ = "ocr_documents"
+
+    # sha256 of the uploaded bytes, or of the url for url requests.
+    id = Column(String(64), primary_key=True)
+    source = Column(String(2048), nullable=False, default="")
+    content = Column(MEDIUMTEXT, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    # The ngram parser tokenizes CJK text without whitespace, which the
+    # default parser cannot do for the Japanese text we OCR.
+    __table_args__ = (
+        Index(
+            "ft_ocr_documents_content",
+            "content",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+    )
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class ReceiptRecord(Base):
+    __tablename__ = "receipts"
+
+    # sha256 of the uploaded file, so re-uploading the same receipt is idempotent.
+    id = Column(String(64), primary_key=True)
+    merchant_name = Column(String(255), nullable=False, default="")
+    transaction_date = Column(Date, nullable=True, index=True)
+    transaction_time = Column(String(32), nullable=False, default="")
+    phone_number = Column(String(64), nullable=False, default="")
+    subtotal = Column(Numeric(14, 2), nullable=False, default=0)
+    tax = Column(Numeric(14, 2), nullable=False, default=0)
+    tip = Column(Numeric(14, 2), nullable=False, default=0)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    items = relationship(
+        "ReceiptItemRecord",
+        cascade="all, delete-orphan",
+        order_by="ReceiptItemRecord.position",
+        lazy="selectin",
+    )
+
+
+class ReceiptItemRecord(Base):
+    __tablename__ = "receipt_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    receipt_id = Column(String(64), ForeignKey("receipts.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    description = Column(String(255), nullable=False, default="")
+    quantity = Column(Numeric(14, 3), nullable=True)
+    price = Column(Numeric(14, 2), nullable=True)
+    total_price = Column(Numeric(14, 2), nullable=True)
+
+
+class ReceiptRollup(Base):
+    """
+    Pre-aggregated spend per merchant and period bucket.
+
+    Rows are adjusted by deltas whenever a receipt is stored or corrected,
+    so reads are a primary-key lookup regardless of how many receipts exist.
+    """
+
+    __tablename__ = "receipt_rollups"
+
+    merchant_name = Column(String(255), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    period_start = Column(Date, primary_key=True)
+    total = Column(Numeric(16, 2), nullable=False, default=0)
+    tax = Column(Numeric(16, 2), nullable=False, default=0)
+    receipt_count = Column(Integer, nullable=False, default=0)
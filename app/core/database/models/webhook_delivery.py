@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+from app.core.database import Base
+from app.core.enums.webhook_enum import DeliveryStatus
+
+
+class WebhookDelivery(Base):
+    """
+    Outbox of webhook callbacks: a row is written when a job is accepted,
+    queued when it completes and removed from the queue once delivered or out
+    of attempts, so jobs and pending deliveries survive restarts.
+    """
+
+    __tablename__ = "webhook_deliveries"
+
+    # Also sent as X-Webhook-Id, stable across retries so receivers can dedupe.
+    id = Column(String(32), primary_key=True)
+    url = Column(String(2048), nullable=False)
+    event = Column(String(64), nullable=False)
+    payload = Column(MEDIUMTEXT, nullable=False)
+    status = Column(String(16), nullable=False, default=DeliveryStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    # UTC; doubles as the lease of a claimed delivery and the deadline of a running job.
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_status_code = Column(Integer, nullable=True)
+    last_error = Column(String(512), nullable=False, default="")
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_webhook_deliveries_due", "status", "next_attempt_at"),)
@@ -0,0 +1,241 @@
+import base64
+import time
+from functools import lru_cache
+from itertools import combinations
+from typing import List, NamedTuple, Optional
+
+from app.config.config import Config
+from app.core.cache.result_cache import OCR_RESULTS, RECEIPT_RESULTS, ResultCache
+from app.core.metrics.metrics import CACHE_LOOKUPS
+from app.core.redis.redis import get_redis
+from app.helpers.converter import to_gray
+from app.utils.logger import Log
+
+log = Log("Near Duplicate")
+
+HASH_BITS = 64
+# Side of the square grey thumbnail kept to confirm a match, and of the cells compared.
+THUMB_SIDE = 96
+THUMB_CELL = 4
+
+
+class Fingerprint(NamedTuple):
+    phash: int
+    dhash: int
+    # THUMB_SIDE x THUMB_SIDE 8-bit grey pixels; empty in fingerprints stored before it existed.
+    thumb: bytes = b""
+
+    def distance(self, other: "Fingerprint") -> int:
+        # Both hashes must agree: pHash is robust to re-compression, dHash to small shifts.
+        return max((self.phash ^ other.phash).bit_count(), (self.dhash ^ other.dhash).bit_count())
+
+    def difference(self, other: "Fingerprint") -> float:
+        """
+        Largest mean difference of a THUMB_CELL square between the two
+        thumbnails, each normalised to zero mean and unit deviation.
+
+        Hashes only see the layout: two receipts sharing a header differ in
+        a few hashed bits at most, or none when only the total changed. A
+        changed line of text moves its cells by about 1, while re-compression,
+        resizing, noise and brightness stay near 0.1. Infinite when either
+        thumbnail is missing.
+        """
+        import numpy as np
+
+        if not self.thumb or not other.thumb:
+            return float("inf")
+        cells = THUMB_SIDE // THUMB_CELL
+        diff = np.abs(_normalized(self.thumb) - _normalized(other.thumb))
+        return float(diff.reshape(cells, THUMB_CELL, cells, THUMB_CELL).mean(axis=(1, 3)).max())
+
+    def encode(self) -> str:
+        return f"{self.phash:016x}:{self.dhash:016x}:{base64.b64encode(self.thumb).decode()}"
+
+    @classmethod
+    def decode(cls, value: str) -> "Fingerprint":
+        phash, dhash, *thumb = value.split(":")
+        return cls(int(phash, 16), int(dhash, 16), base64.b64decode(thumb[0]) if thumb else b"")
+
+
+def _normalized(thumb: bytes):
+    import numpy as np
+
+    pixels = np.frombuffer(thumb, dtype=np.uint8).astype(np.float32).reshape(THUMB_SIDE, THUMB_SIDE)
+    return (pixels - pixels.mean()) / max(float(pixels.std()), 1.0)
+
+
+def fingerprint(image) -> Fingerprint:
+    """
+    64-bit pHash (sign of the low 8x8 DCT frequencies of a 32x32 thumbnail
+    against their median) and dHash (horizontal gradient signs of a 9x8
+    thumbnail) of a decoded image, with the grey thumbnail that confirms a
+    match.
+    """
+    import cv2
+    import numpy as np
+
+    # Shrunk from near full resolution: text strokes alias differently from a coarse copy.
+    fine = to_gray(image, 1024)
+    preview = cv2.resize(fine, (THUMB_SIDE, THUMB_SIDE), interpolation=cv2.INTER_AREA)
+    gray = to_gray(fine, 256).astype(np.float32)
+
+    low = cv2.dct(cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA))[:8, :8].ravel()
+    # The DC term only carries overall brightness.
+    phash_bits = low > np.median(low[1:])
+
+    thumb = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    dhash_bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+
+    return Fingerprint(
+        int.from_bytes(np.packbits(phash_bits).tobytes(), "big"),
+        int.from_bytes(np.packbits(dhash_bits).tobytes(), "big"),
+        preview.tobytes(),
+    )
+
+
+@lru_cache(maxsize=None)
+def flip_masks(bits: int, radius: int) -> List[int]:
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(bits), r):
+            mask = 0
+            for position in positions:
+                mask |= 1 << position
+            masks.append(mask)
+    return masks
+
+
+class Match(NamedTuple):
+    document_id: str
+    distance: int
+    difference: float
+    result: object
+
+    def report(self) -> dict:
+        return {
+            "document_id": self.document_id,
+            "distance": self.distance,
+            "similarity": round(1 - self.distance / HASH_BITS, 4),
+            "difference": round(self.difference, 4),
+        }
+
+
+class NearDuplicateIndex(object):
+    """
+    Hamming-distance index of image fingerprints in Redis (multi-index hashing).
+
+    The pHash is cut into NEAR_DUP_BANDS bands; each band value is a sorted
+    set of document ids scored by expiry time. If two hashes are within
+    distance r, at least one band differs by at most r // bands bits
+    (pigeonhole), so a lookup only reads the band values within that radius
+    and verifies the few candidates exactly. A candidate within distance is
+    only a match once its thumbnail confirms it (NEAR_DUP_MAX_DIFFERENCE),
+    since look-alike documents share most hashed bits. Expired members are
+    skipped on read and trimmed on write; fingerprints expire with
+    NEAR_DUP_TTL. The matched result itself comes from `results`. `switch`
+    names the Config flag that turns this index on.
+    """
+
+    def __init__(self, namespace: str, results: ResultCache, switch: str = "NEAR_DUP_ON"):
+        self.namespace = namespace
+        self.results = results
+        self.switch = switch
+        self.bands = Config.NEAR_DUP_BANDS
+        self.band_bits = HASH_BITS // self.bands
+        self.max_distance = int(HASH_BITS * (1 - Config.NEAR_DUP_MIN_SIMILARITY))
+
+    @property
+    def enabled(self) -> bool:
+        return Config.NEAR_DUP_ON and getattr(Config, self.switch) and Config.REDIS_ON
+
+    def _fingerprint_key(self, document_id: str) -> str:
+        return f"{self.namespace}:nd:fp:{document_id}"
+
+    def _band_key(self, band: int, value: int) -> str:
+        return f"{self.namespace}:nd:band:{band}:{value:x}"
+
+    def _band_values(self, phash: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(phash >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    async def lookup(self, fp: Fingerprint) -> Optional[Match]:
+        if not self.enabled:
+            return None
+        try:
+            match = await self._lookup(fp)
+        except Exception as e:
+            # The index is an optimisation: without Redis we just call Azure.
+            log.warning("near-duplicate lookup failed: {}", e)
+            CACHE_LOOKUPS.labels("near_duplicate", "error").inc()
+            return None
+        CACHE_LOOKUPS.labels("near_duplicate", "hit" if match else "miss").inc()
+        return match
+
+    async def _lookup(self, fp: Fingerprint) -> Optional[Match]:
+        redis = get_redis()
+        now = time.time()
+        masks = flip_masks(self.band_bits, self.max_distance // self.bands)
+        pipe = redis.pipeline(transaction=False)
+        for band, value in enumerate(self._band_values(fp.phash)):
+            for mask in masks:
+                pipe.zrangebyscore(self._band_key(band, value ^ mask), now, "+inf")
+        candidates = sorted({member for members in await pipe.execute() for member in members})
+        if not candidates:
+            return None
+
+        best = None
+        stored = await redis.mget([self._fingerprint_key(candidate) for candidate in candidates])
+        for candidate, value in zip(candidates, stored):
+            if value is None:
+                continue
+            other = Fingerprint.decode(value)
+            distance = fp.distance(other)
+            if distance > self.max_distance:
+                continue
+            difference = fp.difference(other)
+            if difference <= Config.NEAR_DUP_MAX_DIFFERENCE and (best is None or difference < best[2]):
+                best = (candidate, distance, difference)
+        if best is None:
+            return None
+
+        result = await self.results.get(best[0])
+        if result is None:
+            return None
+        return Match(best[0], best[1], best[2], result)
+
+    async def add(self, document_id: str, fp: Fingerprint):
+        """
+        Remember the fingerprint of a processed image whose result is in
+        `results`; meant to run as a background task.
+        """
+        if not self.enabled:
+            return
+        ttl = Config.NEAR_DUP_TTL
+        now = time.time()
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.set(self._fingerprint_key(document_id), fp.encode(), ex=ttl)
+            for band, value in enumerate(self._band_values(fp.phash)):
+                key = self._band_key(band, value)
+                pipe.zadd(key, {document_id: now + ttl})
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            log.warning("near-duplicate add failed: {}", e)
+
+    async def discard(self, document_id: str):
+        """
+        Forget a document, e.g. after it was corrected; its band entries expire unused.
+        """
+        await self.results.discard(document_id)
+        if not self.enabled:
+            return
+        try:
+            await get_redis().delete(self._fingerprint_key(document_id))
+        except Exception as e:
+            log.warning("near-duplicate discard failed: {}", e)
+
+
+OCR_NEAR_DUPLICATES = NearDuplicateIndex("ocr", OCR_RESULTS)
+RECEIPT_NEAR_DUPLICATES = NearDuplicateIndex("receipt", RECEIPT_RESULTS, "NEAR_DUP_RECEIPTS_ON")
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List
+
+import anyio
+
+from app.core.azure.azure_vision import extract_text_concurrently
+from app.core.cache.result_cache import OCR_RESULTS
+from app.core.document.pages import PageSource
+from app.core.enums.content_type_enum import ContentType
+from app.core.enums.projection_enum import Projection
+from app.core.metrics.metrics import track_stage
+from app.core.projection.projection import project_entry
+from app.core.schema.orjson_response import dumps
+from app.core.search.ocr_search import index_document
+from app.utils.logger import Log
+
+log = Log("Document OCR")
+
+
+async def _ocr_page(source: PageSource, index: int, first_page_of: Dict[str, int], tasks: List[asyncio.Task]) -> dict:
+    try:
+        with track_stage("page_render"):
+            page = await anyio.to_thread.run_sync(source.render, index)
+    except Exception as e:
+        log.error("page {} render failed: {}", index + 1, e)
+        return {"page": index + 1, "error": {"status": None, "message": f"page could not be rendered: {e}"}}
+
+    # Identical pages (blank separators, repeated terms) are OCR'd once.
+    digest = hashlib.sha256(page).hexdigest()
+    original = first_page_of.setdefault(digest, index)
+    if original != index:
+        await asyncio.shield(tasks[original])
+        return {"page": index + 1, "duplicate_of": original + 1, "result": None}
+
+    try:
+        result = await extract_text_concurrently(page, ContentType.OCTET_STREAM)
+    except Exception as e:
+        log.error("page {} OCR failed: {}", index + 1, e)
+        return {"page": index + 1, "error": {"status": None, "message": str(e)}}
+    if isinstance(result, tuple):
+        # extract_text_from_images returns ("Error:", status, text) on a non-200 answer.
+        return {"page": index + 1, "error": {"status": result[1], "message": result[2]}}
+    return {"page": index + 1, "result": result}
+
+
+async def ocr_pages(source: PageSource) -> AsyncIterator[dict]:
+    """
+    OCR every page concurrently and yield one entry per page, in page order,
+    as soon as that page and all pages before it are done.
+
+    All pages start at once; the number of Azure calls in flight is bounded
+    by OCR_CONCURRENCY, so a document takes roughly as long as its slowest
+    page rather than the sum of its pages. The source is closed once the
+    iteration ends.
+    """
+    first_page_of: Dict[str, int] = {}
+    tasks: List[asyncio.Task] = []
+    for index in range(source.count):
+        tasks.append(asyncio.create_task(_ocr_page(source, index, first_page_of, tasks)))
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        # Client went away: do not keep paying for the remaining pages.
+        for task in tasks:
+            task.cancel()
+        # Waits for a render still running in a thread, so not on the event loop.
+        await anyio.to_thread.run_sync(source.close)
+
+
+def merge_page_results(entries: List[dict]) -> dict:
+    """
+    Combine per-page read results into one readResult with document page numbers.
+    """
+    pages = []
+    for entry in entries:
+        result = entry.get("result")
+        if not isinstance(result, dict):
+            continue
+        for page in (result.get("readResult") or {}).get("pages") or ():
+            pages.append(dict(page, pageNumber=entry["page"]))
+    return {"readResult": {"pages": pages}}
+
+
+async def stream_document(
+    document_id: str, source: PageSource, entries: List[dict], projection: Projection = Projection.FULL
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON body: a header line, then one line per page in page order.
+
+    Finished entries are also appended to `entries`, untrimmed by
+    `projection`, for indexing once the response is complete.
+    """
+    yield dumps({"document_id": document_id, "kind": source.kind, "pages": source.count}) + b"\n"
+    async for entry in ocr_pages(source):
+        entries.append(entry)
+        yield dumps(project_entry(entry, projection)) + b"\n"
+
+
+async def index_pages(document_id: str, filename: str, entries: List[dict]):
+    result = merge_page_results(entries)
+    await OCR_RESULTS.put(document_id, result)
+    await index_document(document_id, filename, result)
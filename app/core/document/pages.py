@@ -0,0 +1,123 @@
+import importlib.util
+import threading
+from typing import Callable, Optional
+
+from app.config.config import Config
+from app.core.schema.error_schema import ErrorCode
+from app.helpers.converter import convert_image_to_bytes, decode_image
+from app.helpers.file import remove_file_tmp, save_bytes_tmp
+
+PDF_MAGIC = b"%PDF"
+TIFF_MAGICS = (b"II*\x00", b"MM\x00*")
+
+# pdfium is not thread-safe even across documents: every call into it, from
+# any upload of this worker, holds this lock.
+_pdfium_lock = threading.Lock()
+
+
+class DocumentError(Exception):
+    def __init__(self, error: ErrorCode):
+        super().__init__(error.msg)
+        self.error = error
+
+
+def pdf_available() -> bool:
+    return importlib.util.find_spec("pypdfium2") is not None
+
+
+class PageSource(object):
+    """
+    Pages of an uploaded image, multi-page TIFF or PDF, rendered one at a time.
+
+    `render(index)` returns the page as JPEG bytes ready for the read API and
+    is meant to run in a worker thread. PDFs are rasterised locally with
+    pypdfium2 (optional dependency) at PDF_RENDER_DPI; pdfium is not
+    thread-safe, so rendering is serialised while the OCR calls overlap.
+    TIFF pages are decoded one at a time from a temp file. `close` releases
+    the document and must be called once it is no longer rendered.
+    """
+
+    def __init__(self, count: int, render: Callable[[int], bytes], kind: str, close: Optional[Callable] = None):
+        self.count = count
+        self.render = render
+        self.kind = kind
+        self._close = close
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    @classmethod
+    def open(cls, raw: bytes) -> "PageSource":
+        if raw.startswith(PDF_MAGIC):
+            source = cls._open_pdf(raw)
+        elif raw[:4] in TIFF_MAGICS:
+            source = cls._open_tiff(raw)
+        else:
+            source = cls._open_image(raw)
+        if source.count == 0 or source.count > Config.OCR_MAX_PAGES:
+            source.close()
+            raise DocumentError(ErrorCode.INVALID_DOCUMENT if source.count == 0 else ErrorCode.DOCUMENT_TOO_MANY_PAGES)
+        return source
+
+    @classmethod
+    def _open_image(cls, raw: bytes) -> "PageSource":
+        img = decode_image(raw)
+        if img is None:
+            raise DocumentError(ErrorCode.INVALID_DOCUMENT)
+        return cls(1, lambda index: convert_image_to_bytes(image=img), "image")
+
+    @classmethod
+    def _open_tiff(cls, raw: bytes) -> "PageSource":
+        import cv2
+
+        # cv2 counts pages from their headers and reads a single page only from a file,
+        # so a TIFF is neither fully decoded before the page limit check nor held decoded.
+        path = str(save_bytes_tmp(raw, ".tiff"))
+        try:
+            count = cv2.imcount(path, cv2.IMREAD_UNCHANGED)
+        except cv2.error:
+            count = 0
+
+        def render(index: int) -> bytes:
+            ok, pages = cv2.imreadmulti(path, index, 1, flags=cv2.IMREAD_UNCHANGED)
+            if not ok or not pages:
+                raise DocumentError(ErrorCode.INVALID_DOCUMENT)
+            return convert_image_to_bytes(image=pages[0])
+
+        return cls(count, render, "tiff", close=lambda: remove_file_tmp(path))
+
+    @classmethod
+    def _open_pdf(cls, raw: bytes) -> "PageSource":
+        if not pdf_available():
+            raise DocumentError(ErrorCode.DOCUMENT_FORMAT_UNAVAILABLE)
+        import pypdfium2
+
+        with _pdfium_lock:
+            try:
+                pdf = pypdfium2.PdfDocument(raw)
+            except pypdfium2.PdfiumError:
+                raise DocumentError(ErrorCode.INVALID_DOCUMENT)
+            count = len(pdf)
+        scale = Config.PDF_RENDER_DPI / 72
+
+        def render(index: int) -> bytes:
+            with _pdfium_lock:
+                if pdf.raw is None:
+                    # Closed while this render waited for the lock.
+                    raise DocumentError(ErrorCode.INVALID_DOCUMENT)
+                page = pdf[index]
+                bitmap = page.render(scale=scale)
+                # pdfium renders BGR(A), which is what cv2 expects; copied out before the bitmap is freed.
+                image = bitmap.to_numpy().copy()
+                bitmap.close()
+                page.close()
+            return convert_image_to_bytes(image=image)
+
+        def close():
+            # Explicitly, rather than from a finalizer that would run outside the lock.
+            with _pdfium_lock:
+                pdf.close()
+
+        return cls(count, render, "pdf", close=close)
@@ -0,0 +1,177 @@
+import asyncio
+from bisect import bisect_left
+from typing import List, NamedTuple, Tuple
+
+import anyio
+
+from app.config.config import Config
+from app.core.azure.azure_vision import extract_text_concurrently
+from app.core.enums.content_type_enum import ContentType
+from app.core.metrics.metrics import track_stage
+from app.helpers.converter import convert_image_to_bytes
+
+
+class Tile(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+    # Region this tile is authoritative for: text centred elsewhere belongs to a neighbour.
+    core: Tuple[float, float, float, float]
+
+
+def _axis(length: int, size: int, overlap: int) -> List[Tuple[int, int]]:
+    if length <= size:
+        return [(0, length)]
+    step = size - overlap
+    starts = list(range(0, length - size, step)) + [length - size]
+    return [(start, size) for start in starts]
+
+
+def plan_tiles(width: int, height: int, size: int, overlap: int) -> List[Tile]:
+    """
+    Overlapping tiles covering the image; neighbouring cores meet in the middle of each overlap.
+    """
+    xs, ys = _axis(width, size, overlap), _axis(height, size, overlap)
+    tiles = []
+    for row, (y, h) in enumerate(ys):
+        top = 0 if row == 0 else (y + ys[row - 1][0] + ys[row - 1][1]) / 2
+        bottom = height if row == len(ys) - 1 else (ys[row + 1][0] + y + h) / 2
+        for col, (x, w) in enumerate(xs):
+            left = 0 if col == 0 else (x + xs[col - 1][0] + xs[col - 1][1]) / 2
+            right = width if col == len(xs) - 1 else (xs[col + 1][0] + x + w) / 2
+            tiles.append(Tile(x, y, w, h, (left, top, right, bottom)))
+    return tiles
+
+
+def needs_tiling(image) -> bool:
+    return max(image.shape[:2]) > Config.OCR_TILE_THRESHOLD
+
+
+def _shift(box: List[float], dx: int, dy: int) -> List[float]:
+    return [value + (dx if i % 2 == 0 else dy) for i, value in enumerate(box)]
+
+
+def _center(box: List[float]) -> Tuple[float, float]:
+    return sum(box[0::2]) / 4, sum(box[1::2]) / 4
+
+
+def _owned(box: List[float], core: Tuple[float, float, float, float]) -> bool:
+    cx, cy = _center(box)
+    left, top, right, bottom = core
+    return left <= cx < right and top <= cy < bottom
+
+
+def _covers(box: List[float], point: Tuple[float, float]) -> bool:
+    x, y = point
+    return min(box[0::2]) <= x <= max(box[0::2]) and min(box[1::2]) <= y <= max(box[1::2])
+
+
+def merge_tile_results(tiles: List[Tile], results: List[dict], width: int, height: int) -> dict:
+    """
+    Merge per-tile read results into one readResult in original image coordinates.
+
+    Every line is kept only by the tile whose core contains its centre, with
+    the words of that tile inside its span, which drops the copies seen twice
+    in the overlaps. A word whose line another tile owns is dropped when it
+    lies inside an owned line; the few left get a content line of their own.
+    Content and spans are rebuilt for the merged line order.
+    """
+    lines: List[Tuple[dict, List[dict]]] = []
+    unclaimed: List[dict] = []
+    angles = []
+    for tile, result in zip(tiles, results):
+        for page in (result.get("readResult") or {}).get("pages") or ():
+            angles.append(page.get("angle") or 0.0)
+            words = [
+                dict(word, boundingBox=_shift(word["boundingBox"], tile.x, tile.y)) for word in page.get("words") or ()
+            ]
+            words.sort(key=lambda w: w["span"]["offset"])
+            offsets = [w["span"]["offset"] for w in words]
+            claimed = set()
+            for line in page.get("lines") or ():
+                box = _shift(line["boundingBox"], tile.x, tile.y)
+                if not _owned(box, tile.core):
+                    continue
+                first = last = 0
+                if line.get("spans"):
+                    # Words of the line are this tile's words inside its span.
+                    start = line["spans"][0]["offset"]
+                    first = bisect_left(offsets, start)
+                    last = bisect_left(offsets, start + line["spans"][0]["length"])
+                claimed.update(range(first, last))
+                lines.append((dict(line, boundingBox=box), words[first:last]))
+            unclaimed.extend(w for i, w in enumerate(words) if i not in claimed and _owned(w["boundingBox"], tile.core))
+    # Words owned here whose line went to a neighbour are already in that line.
+    orphans = [
+        word
+        for word in unclaimed
+        if not any(_covers(line["boundingBox"], _center(word["boundingBox"])) for line, _ in lines)
+    ]
+
+    # Reading order: rows of roughly 20 px, then left to right.
+    def reading_order(box: List[float]):
+        return round(min(box[1::2]) / 20), min(box[0::2])
+
+    lines.sort(key=lambda item: reading_order(item[0]["boundingBox"]))
+    orphans.sort(key=lambda word: reading_order(word["boundingBox"]))
+    content_parts, merged_lines, merged_words = [], [], []
+    offset = 0
+    for line, members in lines:
+        old_offset = line["spans"][0]["offset"] if line.get("spans") else 0
+        merged_lines.append(dict(line, spans=[{"offset": offset, "length": len(line["content"])}]))
+        for word in members:
+            span = {"offset": offset + word["span"]["offset"] - old_offset, "length": word["span"]["length"]}
+            merged_words.append(dict(word, span=span))
+        content_parts.append(line["content"])
+        offset += len(line["content"]) + 1
+    for word in orphans:
+        merged_words.append(dict(word, span={"offset": offset, "length": len(word["content"])}))
+        content_parts.append(word["content"])
+        offset += len(word["content"]) + 1
+    content = "\n".join(content_parts)
+
+    return {
+        "modelVersion": next((r.get("modelVersion") for r in results if r.get("modelVersion")), None),
+        "metadata": {"width": width, "height": height, "tiles": len(tiles)},
+        "readResult": {
+            "stringIndexType": "TextElements",
+            "content": content,
+            "pages": [
+                {
+                    "height": float(height),
+                    "width": float(width),
+                    "angle": sum(angles) / len(angles) if angles else 0.0,
+                    "pageNumber": 1,
+                    "words": merged_words,
+                    "spans": [{"offset": 0, "length": len(content)}],
+                    "lines": merged_lines,
+                }
+            ],
+            "styles": [],
+        },
+    }
+
+
+async def ocr_tiled(image):
+    """
+    OCR an oversized image at full resolution as overlapping tiles read concurrently.
+
+    Returns the merged result, or the first ("Error:", status, text) a tile got.
+    """
+    height, width = image.shape[:2]
+    tiles = plan_tiles(width, height, Config.OCR_TILE_SIZE, Config.OCR_TILE_OVERLAP)
+
+    async def read_tile(tile: Tile):
+        bottom, right = tile.y + tile.height, tile.x + tile.width
+        crop = image[tile.y : bottom, tile.x : right]  # noqa: E203
+        with track_stage("tile_encode"):
+            data = await anyio.to_thread.run_sync(convert_image_to_bytes, crop)
+        return await extract_text_concurrently(data, ContentType.OCTET_STREAM)
+
+    results = await asyncio.gather(*(read_tile(tile) for tile in tiles))
+    for result in results:
+        if isinstance(result, tuple):
+            return result
+    with track_stage("tile_merge"):
+        return merge_tile_results(tiles, results, width, height)
@@ -25,10 +25,12 @@ class ReceiptItem:
     quantity: str = ""
     price: str = ""
     total_price: str = ""
+    confidences: dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
 class Receipt:
+    receipt_id: str = ""
     merchant_name: str = ""
     transaction_date: str = ""
     transaction_time: str = ""
@@ -39,6 +41,7 @@ class Receipt:
     tip: str = ""
     total: str = ""
     receipt_items: list[ReceiptItem] = field(default_factory=list)
+    confidences: dict[str, float] = field(default_factory=dict)
 
     def add_receipt_item(self, item):
         self.receipt_items.append(item)
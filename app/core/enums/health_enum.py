@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class Dependency(str, Enum):
+    REDIS = "redis"
+    DATABASE = "database"
+    AZURE = "azure"
+
+
+class DependencyStatus(str, Enum):
+    UP = "up"
+    DOWN = "down"
+    DISABLED = "disabled"
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class Projection(str, Enum):
+    # readResult.content only
+    TEXT = "text"
+    # Line texts per page
+    LINES = "lines"
+    # Line texts with their words and confidences, no polygons
+    WORDS = "words"
+    # Azure's full response
+    FULL = "full"
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class RegionMatch(str, Enum):
+    # Word centre inside the region: each word lands in exactly one of adjacent zones
+    CENTER = "center"
+    INTERSECTS = "intersects"
+    CONTAINS = "contains"
+
+
+class RegionUnit(str, Enum):
+    PIXEL = "px"
+    # Fractions of the page width and height, for templates shared by scans of any resolution
+    RELATIVE = "relative"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class RollupPeriod(str, Enum):
+    DAY = "day"
+    MONTH = "month"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class TriageMode(str, Enum):
+    # Answer failing images with an error, without calling Azure
+    REJECT = "reject"
+    # Process them anyway and report the verdict in meta.triage
+    FLAG = "flag"
+    OFF = "off"
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class WebhookEvent(str, Enum):
+    OCR_COMPLETED = "ocr.completed"
+    DOCUMENT_COMPLETED = "ocr.document.completed"
+    RECEIPT_COMPLETED = "receipt.completed"
+
+
+class DeliveryStatus(str, Enum):
+    # Accepted, the job has not finished yet.
+    RUNNING = "running"
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
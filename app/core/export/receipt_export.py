@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import csv
+import importlib.util
+import io
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import select
+
+from app.core.database import dispose_engine, get_engine
+from app.core.database.models import ReceiptItemRecord, ReceiptRecord
+from app.core.enums.export_format_enum import ExportDataset, ExportFormat
+
+# Rows fetched per round trip from the server-side cursor; also the parquet row group size.
+BATCH_SIZE = 5000
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+# (output column, selected expression, parquet type)
+RECEIPT_COLUMNS = [
+    ("receipt_id", ReceiptRecord.id, "string"),
+    ("merchant_name", ReceiptRecord.merchant_name, "string"),
+    ("transaction_date", ReceiptRecord.transaction_date, "date"),
+    ("transaction_time", ReceiptRecord.transaction_time, "string"),
+    ("phone_number", ReceiptRecord.phone_number, "string"),
+    ("subtotal", ReceiptRecord.subtotal, "decimal"),
+    ("tax", ReceiptRecord.tax, "decimal"),
+    ("tip", ReceiptRecord.tip, "decimal"),
+    ("total", ReceiptRecord.total, "decimal"),
+    ("created_at", ReceiptRecord.created_at, "timestamp"),
+]
+
+ITEM_COLUMNS = [
+    ("receipt_id", ReceiptItemRecord.receipt_id, "string"),
+    ("merchant_name", ReceiptRecord.merchant_name, "string"),
+    ("transaction_date", ReceiptRecord.transaction_date, "date"),
+    ("position", ReceiptItemRecord.position, "int"),
+    ("description", ReceiptItemRecord.description, "string"),
+    ("quantity", ReceiptItemRecord.quantity, "decimal"),
+    ("price", ReceiptItemRecord.price, "decimal"),
+    ("total_price", ReceiptItemRecord.total_price, "decimal"),
+]
+
+
+def export_columns(dataset: ExportDataset) -> List[Tuple]:
+    return ITEM_COLUMNS if dataset == ExportDataset.ITEMS else RECEIPT_COLUMNS
+
+
+def build_query(dataset: ExportDataset, date_from: Optional[date], date_to: Optional[date]):
+    columns = export_columns(dataset)
+    stmt = select(*[expr.label(name) for name, expr, _ in columns])
+    if dataset == ExportDataset.ITEMS:
+        stmt = stmt.join(ReceiptRecord, ReceiptRecord.id == ReceiptItemRecord.receipt_id)
+        stmt = stmt.order_by(ReceiptItemRecord.receipt_id, ReceiptItemRecord.position)
+    else:
+        stmt = stmt.order_by(ReceiptRecord.transaction_date, ReceiptRecord.id)
+    if date_from:
+        stmt = stmt.where(ReceiptRecord.transaction_date >= date_from)
+    if date_to:
+        stmt = stmt.where(ReceiptRecord.transaction_date <= date_to)
+    return stmt
+
+
+async def stream_batches(
+    dataset: ExportDataset,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = BATCH_SIZE,
+) -> AsyncIterator[Sequence]:
+    """
+    Yield result rows in batches from a server-side cursor.
+
+    `AsyncConnection.stream` runs the query with stream_results, which makes
+    aiomysql use an unbuffered SSCursor, so only one batch is held in memory.
+    """
+    async with get_engine().connect() as conn:
+        result = await conn.stream(build_query(dataset, date_from, date_to))
+        async for partition in result.partitions(batch_size):
+            yield partition
+
+
+def _json_default(obj):
+    # Decimals keep their exact value as strings, like the CSV output.
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+
+async def write_csv(batches: AsyncIterator[Sequence], names: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def write_ndjson(batches: AsyncIterator[Sequence], names: List[str]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(names, row)), default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in batch
+        )
+
+
+class _ChunkSink(object):
+    """
+    Minimal writable file that hands written bytes back to the caller,
+    letting pyarrow write straight into a streaming response.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_schema(columns: List[Tuple]):
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "date": pa.date32(),
+        "decimal": pa.decimal128(16, 3),
+        "int": pa.int64(),
+        "timestamp": pa.timestamp("s"),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in columns])
+
+
+async def write_parquet(batches: AsyncIterator[Sequence], columns: List[Tuple]) -> AsyncIterator[bytes]:
+    """
+    Write one parquet row group per batch and flush it to the client right away.
+
+    pyarrow is an optional dependency that is only needed for this format.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="snappy")
+    try:
+        async for batch in batches:
+            arrays = [list(col) for col in zip(*batch)] if batch else [[] for _ in columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_receipts(
+    export_format: ExportFormat,
+    dataset: ExportDataset = ExportDataset.RECEIPTS,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    columns = export_columns(dataset)
+    batches = stream_batches(dataset, date_from, date_to)
+    if export_format == ExportFormat.PARQUET:
+        return write_parquet(batches, columns)
+    names = [name for name, _, _ in columns]
+    if export_format == ExportFormat.NDJSON:
+        return write_ndjson(batches, names)
+    return write_csv(batches, names)
+
+
+async def export_to_file(path: str, **kwargs):
+    with open(path, "wb") as f:
+        async for chunk in export_receipts(**kwargs):
+            f.write(chunk)
+    await dispose_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored receipts.")
+    parser.add_argument("output", help="Destination file path.")
+    parser.add_argument("--format", choices=[f.value for f in ExportFormat], default=ExportFormat.CSV.value)
+    parser.add_argument("--dataset", choices=[d.value for d in ExportDataset], default=ExportDataset.RECEIPTS.value)
+    parser.add_argument("--date-from", type=date.fromisoformat, default=None)
+    parser.add_argument("--date-to", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    asyncio.run(
+        export_to_file(
+            args.output,
+            export_format=ExportFormat(args.format),
+            dataset=ExportDataset(args.dataset),
+            date_from=args.date_from,
+            date_to=args.date_to,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import asyncio
+import ipaddress
+import socket
+from typing import Callable, List, Optional, Sequence
+
+
+class DestinationNotAllowed(Exception):
+    def __init__(self, host: str):
+        super().__init__(f"{host} is not an allowed destination")
+        self.host = host
+
+
+def host_listed(host: str, allowed_hosts: Sequence[str]) -> bool:
+    host = host.lower().rstrip(".")
+    return any(host == name or host.endswith("." + name) for name in allowed_hosts)
+
+
+def address_public(address: str) -> bool:
+    """
+    False for loopback, private, link-local (cloud metadata), shared,
+    reserved and multicast addresses, IPv4-mapped IPv6 included.
+    """
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve(host: str) -> List[str]:
+    try:
+        return [str(ipaddress.ip_address(host.strip("[]")))]
+    except ValueError:
+        pass
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def destination_address(host: Optional[str], allowed_hosts: Sequence[str]) -> Optional[str]:
+    """
+    Where the server may connect to reach `host`, None when it may not.
+
+    Hosts in `allowed_hosts` (and their subdomains) are always allowed,
+    internal ones included, and once the list is set no other host is;
+    they are returned as they are. Otherwise a host is allowed only when
+    every address it resolves to is public, and the first one is returned
+    so the caller connects to the address that was checked rather than
+    resolving the name again. Raises OSError when the name does not resolve.
+    """
+    if not host:
+        return None
+    if allowed_hosts:
+        return host if host_listed(host, allowed_hosts) else None
+    addresses = await resolve(host)
+    if not addresses or not all(address_public(address) for address in addresses):
+        return None
+    return addresses[0]
+
+
+async def destination_allowed(host: Optional[str], allowed_hosts: Sequence[str]) -> bool:
+    return await destination_address(host, allowed_hosts) is not None
+
+
+def pinned_transport(allowed_hosts: Callable[[], Sequence[str]], **kwargs):
+    """
+    httpx transport that checks every connection with `destination_address`
+    and connects to the address it checked, so a name that resolves again
+    to an internal address (DNS rebinding) cannot slip past the check.
+    Refused hosts raise DestinationNotAllowed; TLS still verifies the name.
+    Proxies are not used: they would be the only host checked.
+    """
+    import httpx
+    from httpcore.backends.auto import AutoBackend
+
+    class PinnedBackend(AutoBackend):
+        async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None, **options):
+            try:
+                address = await asyncio.wait_for(destination_address(host, allowed_hosts()), timeout)
+            except asyncio.TimeoutError:
+                raise OSError(f"resolving {host} timed out")
+            if address is None:
+                raise DestinationNotAllowed(host)
+            return await super().connect_tcp(address, port, timeout=timeout, **options)
+
+    transport = httpx.AsyncHTTPTransport(**kwargs)
+    transport._pool._network_backend = PinnedBackend()
+    return transport
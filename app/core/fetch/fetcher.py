@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import orjson
+
+from app.config.config import Config
+from app.core.fetch.destination import DestinationNotAllowed, pinned_transport
+from app.core.metrics.metrics import URL_FETCHES
+from app.core.redis.redis import get_redis
+from app.core.schema.error_schema import ErrorCode
+from app.helpers.limits import KeyedSemaphore
+from app.utils.logger import Log
+
+log = Log("Image Fetcher")
+
+# Non-image types some servers send for images.
+GENERIC_TYPES = ("application/octet-stream", "binary/octet-stream", "")
+
+
+class FetchError(Exception):
+    def __init__(self, error: ErrorCode):
+        super().__init__(error.msg)
+        self.error = error
+
+
+class Fetched(NamedTuple):
+    # sha256 of the content, the same document id an upload of it gets.
+    document_id: str
+    # None when the server answered 304 Not Modified.
+    raw: Optional[bytes]
+    status: str
+
+    def report(self) -> dict:
+        report = {"status": self.status}
+        if self.raw is not None:
+            report["bytes"] = len(self.raw)
+        return report
+
+
+class ImageFetcher(object):
+    """
+    Downloads images for URL OCR.
+
+    One pooled httpx client per worker, at most URL_FETCH_CONCURRENCY
+    downloads in flight and URL_FETCH_HOST_CONCURRENCY per host, each bounded
+    by URL_FETCH_TIMEOUT and URL_FETCH_MAX_BYTES. The validators of the last
+    download of every URL are kept in Redis next to the content hash, so a
+    repeated URL is revalidated with If-None-Match/If-Modified-Since and an
+    unchanged image is not downloaded again. Without Redis every fetch is a
+    full download. Every connection, redirects included, goes to an address
+    checked against URL_FETCH_ALLOWED_HOSTS, see `pinned_transport`.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._hosts = KeyedSemaphore(Config.URL_FETCH_HOST_CONCURRENCY)
+
+    def _get_client(self):
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=Config.URL_FETCH_TIMEOUT,
+                follow_redirects=True,
+                max_redirects=Config.URL_FETCH_MAX_REDIRECTS,
+                transport=pinned_transport(
+                    lambda: Config.URL_FETCH_ALLOWED_HOSTS,
+                    limits=httpx.Limits(
+                        max_connections=Config.URL_FETCH_CONCURRENCY,
+                        max_keepalive_connections=Config.URL_FETCH_CONCURRENCY,
+                    ),
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return f"ocr:url:{hashlib.sha256(url.encode()).hexdigest()}"
+
+    async def _validators(self, url: str) -> Optional[dict]:
+        if not Config.REDIS_ON:
+            return None
+        try:
+            value = await get_redis().get(self.key(url))
+        except Exception as e:
+            log.warning("url validators get failed: {}", e)
+            return None
+        return None if value is None else orjson.loads(value)
+
+    async def _remember(self, url: str, document_id: str, headers):
+        validators = {"document_id": document_id}
+        if headers.get("etag"):
+            validators["etag"] = headers["etag"]
+        if headers.get("last-modified"):
+            validators["last_modified"] = headers["last-modified"]
+        if not Config.REDIS_ON or len(validators) == 1:
+            return
+        try:
+            await get_redis().set(self.key(url), orjson.dumps(validators), ex=Config.RESULT_CACHE_TTL)
+        except Exception as e:
+            log.warning("url validators put failed: {}", e)
+
+    async def fetch(self, url: str, conditional: bool = True) -> Fetched:
+        """
+        Download `url`, or only revalidate it when `conditional` and it was
+        fetched before; raises FetchError.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            URL_FETCHES.labels("refused").inc()
+            raise FetchError(ErrorCode.URL_NOT_ALLOWED)
+        validators = await self._validators(url) if conditional else None
+        try:
+            async with self._hosts(parts.netloc):
+                fetched = await asyncio.wait_for(self._download(url, validators), Config.URL_FETCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            URL_FETCHES.labels("timeout").inc()
+            raise FetchError(ErrorCode.URL_FETCH_TIMEOUT)
+        except FetchError as e:
+            URL_FETCHES.labels(e.error.code.lower()).inc()
+            raise
+        URL_FETCHES.labels(fetched.status).inc()
+        return fetched
+
+    async def _download(self, url: str, validators: Optional[dict]) -> Fetched:
+        import httpx
+
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and validators:
+                    return Fetched(validators["document_id"], None, "not_modified")
+                if response.status_code != 200:
+                    log.info("fetch {} answered {}.", url, response.status_code)
+                    raise FetchError(ErrorCode.URL_FETCH_FAILED)
+                content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                if not content_type.startswith("image/") and content_type not in GENERIC_TYPES:
+                    raise FetchError(ErrorCode.URL_NOT_AN_IMAGE)
+                length = response.headers.get("content-length", "")
+                if length.isdigit() and int(length) > Config.URL_FETCH_MAX_BYTES:
+                    raise FetchError(ErrorCode.URL_TOO_LARGE)
+
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > Config.URL_FETCH_MAX_BYTES:
+                        raise FetchError(ErrorCode.URL_TOO_LARGE)
+                raw = bytes(body)
+        except DestinationNotAllowed as e:
+            log.info("fetch {} refused: {}", url, e)
+            raise FetchError(ErrorCode.URL_NOT_ALLOWED)
+        except (httpx.HTTPError, OSError) as e:
+            log.info("fetch {} failed: {}", url, e)
+            raise FetchError(ErrorCode.URL_FETCH_FAILED)
+
+        document_id = hashlib.sha256(raw).hexdigest()
+        await self._remember(url, document_id, response.headers)
+        return Fetched(document_id, raw, "fetched")
+
+
+FETCHER = ImageFetcher()
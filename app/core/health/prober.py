@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Dict, NamedTuple, Optional
+
+import anyio
+from sqlalchemy import text
+
+from app.config.config import Config
+from app.core.azure.azure_vision import ocr_waiting
+from app.core.database import get_engine
+from app.core.enums.health_enum import Dependency, DependencyStatus
+from app.core.metrics.metrics import DEPENDENCY_UP, HTTP_IN_FLIGHT
+from app.core.redis.redis import get_redis
+from app.utils.logger import Log
+
+log = Log("Health Prober")
+
+
+class Probe(NamedTuple):
+    status: DependencyStatus
+    latency_ms: float
+    checked_at: float
+    error: str = ""
+
+    def report(self) -> dict:
+        report = {"status": self.status, "latency_ms": round(self.latency_ms, 1), "age_s": self.age()}
+        if self.error:
+            report["error"] = self.error
+        return report
+
+    def age(self) -> float:
+        return round(time.time() - self.checked_at, 1)
+
+
+class HealthProber(object):
+    """
+    Probes Redis, the database and Azure in the background of every worker.
+
+    Each round runs the probes concurrently, each bounded by
+    HEALTH_PROBE_TIMEOUT, and replaces the cached results; the endpoints only
+    read them, so however often an orchestrator polls, every dependency sees
+    one probe per worker and HEALTH_PROBE_INTERVAL. Results older than three
+    intervals count as failed, so a stuck prober cannot keep a worker ready.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._task: Optional[asyncio.Task] = None
+        self._probes: Dict[Dependency, Probe] = {}
+        self._loop_lag = 0.0
+
+    def start(self):
+        import httpx
+
+        if self._task is not None:
+            return
+        self._client = httpx.AsyncClient(timeout=Config.HEALTH_PROBE_TIMEOUT, follow_redirects=False)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await self._client.aclose()
+        self._task = self._client = None
+
+    async def _run(self):
+        while True:
+            await self.probe_all()
+            expected = time.perf_counter() + Config.HEALTH_PROBE_INTERVAL
+            await asyncio.sleep(Config.HEALTH_PROBE_INTERVAL)
+            # Oversleeping means something is blocking the event loop.
+            self._loop_lag = max(time.perf_counter() - expected, 0.0)
+
+    async def probe_all(self):
+        checks = {
+            Dependency.REDIS: self._probe_redis,
+            Dependency.DATABASE: self._probe_database,
+            Dependency.AZURE: self._probe_azure,
+        }
+        results = await asyncio.gather(*(self._probe(check) for check in checks.values()))
+        for dependency, probe in zip(checks, results):
+            previous = self._probes.get(dependency)
+            if probe.status == DependencyStatus.DOWN and (previous is None or previous.status != probe.status):
+                log.warning("{} is down: {}", dependency.value, probe.error)
+            DEPENDENCY_UP.labels(dependency.value).set(1 if probe.status == DependencyStatus.UP else 0)
+            self._probes[dependency] = probe
+
+    async def _probe(self, check) -> Probe:
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(check(), Config.HEALTH_PROBE_TIMEOUT)
+            error = ""
+        except asyncio.TimeoutError:
+            status, error = DependencyStatus.DOWN, f"no answer within {Config.HEALTH_PROBE_TIMEOUT}s"
+        except Exception as e:
+            status, error = DependencyStatus.DOWN, f"{type(e).__name__}: {e}"
+        return Probe(status, (time.perf_counter() - start) * 1000, time.time(), error[:256])
+
+    async def _probe_redis(self) -> DependencyStatus:
+        if not Config.REDIS_ON:
+            return DependencyStatus.DISABLED
+        await get_redis().ping()
+        return DependencyStatus.UP
+
+    async def _probe_database(self) -> DependencyStatus:
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return DependencyStatus.UP
+
+    async def _probe_azure(self) -> DependencyStatus:
+        # Reachability only: any answer below 500, 401 included, means the endpoint is serving.
+        if not Config.AZURE_VISION_ENDPOINT:
+            raise ValueError("AZURE_VISION_ENDPOINT is not set")
+        response = await self._client.get(Config.AZURE_VISION_ENDPOINT)
+        if response.status_code >= 500:
+            raise ValueError(f"HTTP {response.status_code}")
+        return DependencyStatus.UP
+
+    def liveness(self) -> dict:
+        return {
+            "prober": "running" if self._task is not None and not self._task.done() else "stopped",
+            "loop_lag_ms": round(self._loop_lag * 1000, 1),
+        }
+
+    def readiness(self) -> dict:
+        """
+        Cached probe results plus this worker's saturation; `ready` is False
+        when a required dependency is down or stale, or a queue is over its limit.
+        """
+        stale_after = Config.HEALTH_PROBE_INTERVAL * 3
+        dependencies = {}
+        failing = []
+        for dependency in Dependency:
+            probe = self._probes.get(dependency)
+            if probe is None:
+                dependencies[dependency.value] = {"status": "unknown"}
+            else:
+                dependencies[dependency.value] = probe.report()
+            if dependency in Config.HEALTH_REQUIRED and (
+                probe is None or probe.status != DependencyStatus.UP or probe.age() > stale_after
+            ):
+                failing.append(dependency.value)
+
+        threads = anyio.to_thread.current_default_thread_limiter().statistics()
+        saturation = {
+            "http_in_flight": int(HTTP_IN_FLIGHT.labels().value),
+            "ocr_waiting": ocr_waiting(),
+            "threads_busy": threads.borrowed_tokens,
+            "threads_waiting": threads.tasks_waiting,
+        }
+        if Config.HEALTH_MAX_OCR_WAITING and saturation["ocr_waiting"] > Config.HEALTH_MAX_OCR_WAITING:
+            failing.append("ocr_waiting")
+        if Config.HEALTH_MAX_THREAD_WAITING and saturation["threads_waiting"] > Config.HEALTH_MAX_THREAD_WAITING:
+            failing.append("threads_waiting")
+
+        return {"ready": not failing, "failing": failing, "dependencies": dependencies, "saturation": saturation}
+
+
+PROBER = HealthProber()
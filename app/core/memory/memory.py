@@ -0,0 +1,86 @@
+import random
+import tracemalloc
+from typing import Optional, Tuple
+
+from app.config.config import Config
+from app.core.memory.usage import rss_bytes, sampled, traced_bytes
+from app.core.metrics.metrics import REQUEST_ALLOC_PEAK, REQUEST_RSS_DELTA
+from app.core.tracing.tracing import current_trace
+from app.utils.logger import Log
+
+log = Log("Memory")
+
+# Sampled requests in flight; tracemalloc runs while there is one, or while snapshots are kept.
+_sampled_in_flight = 0
+_watching = False
+
+
+def _start_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(Config.MEMORY_TRACEMALLOC_FRAMES)
+
+
+def _stop_tracing():
+    if not _watching and not _sampled_in_flight and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class RequestMemory(object):
+    """
+    Memory accounting of one request: RSS delta always, and for a
+    MEMORY_TRACEMALLOC_SAMPLE_RATE share of requests the tracemalloc peak.
+
+    Both are process-wide. The RSS delta includes whatever concurrent
+    requests allocated, and the peak is only reset when no other sampled
+    request is in flight, so on a busy worker it is an upper bound; the
+    requests that reliably show up with large values are the ones to look at.
+    """
+
+    __slots__ = ("rss", "traced", "token")
+
+    def __init__(self):
+        global _sampled_in_flight
+        self.rss = rss_bytes()
+        self.traced = None
+        self.token = None
+        if Config.MEMORY_TRACEMALLOC_SAMPLE_RATE and random.random() < Config.MEMORY_TRACEMALLOC_SAMPLE_RATE:
+            _start_tracing()
+            if not _sampled_in_flight:
+                tracemalloc.reset_peak()
+            _sampled_in_flight += 1
+            self.traced = traced_bytes()
+            self.token = sampled.set(True)
+
+    def finish(self, method: str, route: str) -> Tuple[int, Optional[int]]:
+        global _sampled_in_flight
+        rss_delta = rss_bytes() - self.rss
+        peak = None
+        if self.traced is not None:
+            peak = max(tracemalloc.get_traced_memory()[1] - self.traced, 0)
+            sampled.reset(self.token)
+            _sampled_in_flight -= 1
+            _stop_tracing()
+
+        REQUEST_RSS_DELTA.labels(method, route).observe(max(rss_delta, 0))
+        trace = current_trace()
+        if trace is not None:
+            trace.root.attributes["memory.rss_delta_bytes"] = rss_delta
+        if peak is not None:
+            REQUEST_ALLOC_PEAK.labels(method, route).observe(peak)
+            if trace is not None:
+                trace.root.attributes["memory.alloc_peak_bytes"] = peak
+        if rss_delta >= Config.MEMORY_WARN_RSS_DELTA_MB * 2**20:
+            log.warning("{} {} grew RSS by {:.1f} MiB (peak allocation {}).", method, route, rss_delta / 2**20, peak)
+        return rss_delta, peak
+
+
+def watch(on: bool):
+    """
+    Keep tracemalloc running between sampled requests, for leak snapshots.
+    """
+    global _watching
+    _watching = on
+    if on:
+        _start_tracing()
+    else:
+        _stop_tracing()
@@ -0,0 +1,88 @@
+import time
+import tracemalloc
+from typing import List, NamedTuple, Optional
+
+from app.config.config import Config
+from app.core.memory import memory
+from app.core.memory.usage import rss_bytes
+from app.helpers.file import live_temp_files
+
+# tracemalloc's own bookkeeping and the import machinery are never the leak.
+IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Taken(NamedTuple):
+    id: int
+    taken_at: float
+    rss: int
+    snapshot: tracemalloc.Snapshot
+
+    def summary(self) -> dict:
+        traced = sum(stat.size for stat in self.snapshot.statistics("filename"))
+        return {"id": self.id, "taken_at": self.taken_at, "rss_bytes": self.rss, "traced_bytes": traced}
+
+
+class SnapshotStore(object):
+    """
+    tracemalloc snapshots of this worker, for finding leaks over time.
+
+    The first snapshot starts tracemalloc, which then keeps running (at its
+    usual cost on every allocation) until `clear`. Only the first snapshot,
+    the baseline, and the MEMORY_SNAPSHOTS_KEPT latest are kept.
+    """
+
+    def __init__(self):
+        self._snapshots: List[Taken] = []
+        self._next_id = 1
+
+    def take(self) -> Taken:
+        memory.watch(True)
+        taken = Taken(self._next_id, time.time(), rss_bytes(), tracemalloc.take_snapshot().filter_traces(IGNORED))
+        self._next_id += 1
+        self._snapshots.append(taken)
+        if len(self._snapshots) > Config.MEMORY_SNAPSHOTS_KEPT + 1:
+            del self._snapshots[1]
+        return taken
+
+    def get(self, snapshot_id: int) -> Optional[Taken]:
+        return next((taken for taken in self._snapshots if taken.id == snapshot_id), None)
+
+    def summaries(self) -> List[dict]:
+        return [taken.summary() for taken in self._snapshots]
+
+    def diff(self, base: Taken, current: Taken, group_by: str = "lineno", limit: int = 20) -> dict:
+        """
+        Allocation sites that grew the most from `base` to `current`, plus
+        the upload temp files still on disk.
+        """
+        stats = current.snapshot.compare_to(base.snapshot, group_by)
+        top = [
+            {
+                "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+        return {
+            "base": base.summary(),
+            "current": current.summary(),
+            "rss_diff_bytes": current.rss - base.rss,
+            "traced_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": top,
+            "temp_files": live_temp_files(),
+        }
+
+    def clear(self):
+        self._snapshots.clear()
+        memory.watch(False)
+
+
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,23 @@
+import os
+import tracemalloc
+from contextvars import ContextVar
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Set for the requests traced by tracemalloc; stages then record their memory too.
+sampled: ContextVar[bool] = ContextVar("memory_sampled", default=False)
+
+
+def rss_bytes() -> int:
+    """
+    Resident set size of this process; 0 where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def traced_bytes() -> int:
+    return tracemalloc.get_traced_memory()[0]
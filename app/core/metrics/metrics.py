@@ -0,0 +1,129 @@
+from time import perf_counter
+
+from app.core.memory import usage
+from app.core.metrics.registry import REGISTRY
+from app.core.tracing.tracing import span
+
+# 1 MiB to 2 GiB.
+MEMORY_BUCKETS = tuple(float(2**n) for n in range(20, 32))
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests currently being served.")
+REQUEST_RSS_DELTA = REGISTRY.histogram(
+    "http_request_rss_delta_bytes",
+    "Growth of the worker's resident set over a request, by route.",
+    ("method", "route"),
+    MEMORY_BUCKETS,
+)
+REQUEST_ALLOC_PEAK = REGISTRY.histogram(
+    "http_request_alloc_peak_bytes",
+    "Peak Python allocation over tracemalloc-sampled requests, by route.",
+    ("method", "route"),
+    MEMORY_BUCKETS,
+)
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "stage_duration_seconds",
+    "Latency of internal processing stages.",
+    ("stage",),
+    LATENCY_BUCKETS,
+)
+
+AZURE_RESPONSES = REGISTRY.counter(
+    "azure_responses_total",
+    "Responses received from Azure by API and status code.",
+    ("api", "status"),
+)
+AZURE_BYTES_SENT = REGISTRY.counter(
+    "azure_request_bytes_total",
+    "Payload bytes sent to Azure by API.",
+    ("api",),
+)
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+URL_FETCHES = REGISTRY.counter(
+    "url_fetches_total",
+    "Server-side image downloads by outcome (fetched/not_modified/error code).",
+    ("outcome",),
+)
+TEMP_FILES = REGISTRY.gauge(
+    "temp_files",
+    "Upload temp files not yet removed.",
+)
+TRIAGE_DECISIONS = REGISTRY.counter(
+    "triage_decisions_total",
+    "Pre-flight image triage decisions by verdict (pass/reject/flag) and reason.",
+    ("decision", "reason"),
+)
+WEBHOOK_DELIVERIES = REGISTRY.counter(
+    "webhook_deliveries_total",
+    "Webhook delivery attempts by event and outcome (delivered/retry/failed).",
+    ("event", "outcome"),
+)
+DEPENDENCY_UP = REGISTRY.gauge(
+    "dependency_up",
+    "1 when the last background probe of a dependency succeeded.",
+    ("dependency",),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "queue_depth",
+    "Items waiting in internal queues.",
+    ("queue",),
+)
+
+
+class track_stage(object):
+    """
+    Time a block into stage_duration_seconds, and record it as a span of the
+    current request trace when there is one:
+
+        with track_stage("imdecode"):
+            img = cv2.imdecode(img_arr, -1)
+    """
+
+    __slots__ = ("child", "start", "span", "memory")
+
+    def __init__(self, stage: str, **attributes):
+        self.child = STAGE_LATENCY.labels(stage)
+        self.span = span(stage, **attributes)
+        self.memory = None
+
+    def __enter__(self):
+        self.span.__enter__()
+        if usage.sampled.get():
+            # Memory-sampled requests (see RequestMemory) also record what each stage allocated.
+            self.memory = (usage.rss_bytes(), usage.traced_bytes())
+        self.start = perf_counter()
+        return self
+
+    def set(self, key: str, value):
+        self.span.set(key, value)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.child.observe(perf_counter() - self.start)
+        if self.memory is not None:
+            self.span.set("memory.rss_delta_bytes", usage.rss_bytes() - self.memory[0])
+            self.span.set("memory.traced_delta_bytes", usage.traced_bytes() - self.memory[1])
+        self.span.__exit__(exc_type, exc, tb)
+        return False
+
+
+def observe_azure_response(api: str, status: int, bytes_sent: int = 0):
+    AZURE_RESPONSES.labels(api, str(status)).inc()
+    if bytes_sent:
+        AZURE_BYTES_SENT.labels(api).inc(bytes_sent)
@@ -0,0 +1,65 @@
+from time import perf_counter
+from typing import Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import Config
+from app.core.memory.memory import RequestMemory
+from app.core.metrics.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware(object):
+    """
+    Count and time HTTP requests per route template, and account the memory
+    they take when MEMORY_TRACKING_ON.
+
+    The template is looked up from the matched endpoint, so path parameters
+    never turn into label values.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight = HTTP_IN_FLIGHT.labels()
+        self._templates: Dict[object, str] = {}
+
+    def _route_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        template = self._templates.get(endpoint)
+        if template is None:
+            template = UNMATCHED_ROUTE
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        memory = RequestMemory() if Config.MEMORY_TRACKING_ON else None
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            method, route = scope["method"], self._route_template(scope)
+            if memory is not None:
+                memory.finish(method, route)
+            HTTP_LATENCY.labels(method, route).observe(perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
@@ -0,0 +1,304 @@
+import glob
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+# Counters and histograms of workers that have exited, see Registry.retire.
+ARCHIVE = "archive.json"
+
+
+class _Metric(object):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        # Children are cached per label tuple, so hot paths can keep a reference.
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def snapshot(self) -> List:
+        return [[list(values), child.snapshot()] for values, child in list(self._children.items())]
+
+
+class _CounterChild(object):
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild(object):
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def snapshot(self):
+        return [self.counts[:], self.sum]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+class Registry(object):
+    """
+    Process-local metrics with optional cross-process aggregation.
+
+    Observations are plain attribute updates (no locks, a lost increment under
+    thread contention is accepted), which keeps them well below a microsecond.
+    When `directory` is set, every worker periodically dumps its values to
+    `<directory>/<pid>.json` and a scrape on any worker merges all files:
+    counters and histograms are summed, gauges are summed over live workers only.
+    The file of an exited worker is folded into `<directory>/archive.json` by
+    the gunicorn master, so the directory does not grow with recycled workers.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.directory: Optional[str] = None
+        self.flush_interval = 5.0
+        self._flusher_pid: Optional[int] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def configure(self, directory: Optional[str], flush_interval: float = 5.0):
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def start(self):
+        """
+        Start the flush thread of the current process; call again after fork.
+        """
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        if not self.directory:
+            return
+        data = {name: metric.snapshot() for name, metric in self.metrics.items()}
+        _write(os.path.join(self.directory, f"{os.getpid()}.json"), data)
+
+    def clear(self):
+        """
+        Remove every snapshot and the archive; the master calls this before
+        starting workers, so a restart does not inherit the previous run.
+        """
+        if not self.directory:
+            return
+        for path in glob.glob(os.path.join(self.directory, "*.json*")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def retire(self, pid: int):
+        """
+        Fold the last snapshot of an exited worker into the archive and remove
+        its file. Its gauges are dropped, and a new worker that gets the same
+        pid starts from zero.
+
+        Only the master calls this (gunicorn child_exit), one worker at a
+        time, so the archive is never written concurrently.
+        """
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{pid}.json")
+        snapshot = _read(path)
+        if snapshot is not None:
+            archive_path = os.path.join(self.directory, ARCHIVE)
+            merged: Dict[str, Dict[LabelValues, object]] = {}
+            self._merge(merged, _read(archive_path) or {}, alive=False)
+            self._merge(merged, snapshot, alive=False)
+            data = {name: [[list(key), value] for key, value in samples.items()] for name, samples in merged.items()}
+            _write(archive_path, data)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def collect(self) -> Dict[str, Dict[LabelValues, object]]:
+        # Own values are always fresh; other workers are read from their last flush.
+        own_pid = os.getpid()
+        merged: Dict[str, Dict[LabelValues, object]] = {name: {} for name in self.metrics}
+        self._merge(merged, {name: metric.snapshot() for name, metric in self.metrics.items()}, alive=True)
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                name = os.path.basename(path)[: -len(".json")]
+                if name == ARCHIVE[: -len(".json")]:
+                    pid = None
+                elif name.isdigit() and int(name) != own_pid:
+                    pid = int(name)
+                else:
+                    continue
+                snapshot = _read(path)
+                if snapshot is not None:
+                    self._merge(merged, snapshot, alive=pid is not None and _pid_alive(pid))
+        return merged
+
+    def _merge(self, merged: Dict[str, Dict[LabelValues, object]], snapshot: dict, alive: bool):
+        for name, samples in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            target = merged.setdefault(name, {})
+            for values, value in samples:
+                key = tuple(values)
+                if metric.kind == "histogram":
+                    counts, total = value
+                    current = target.get(key)
+                    if current is None:
+                        target[key] = [list(counts), total]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], counts)]
+                        current[1] += total
+                else:
+                    target[key] = target.get(key, 0.0) + value
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format 0.0.4.
+        """
+        lines: List[str] = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for values, value in sorted(samples.items()):
+                labels = list(zip(metric.labelnames, values))
+                if metric.kind == "histogram":
+                    counts, total = value  # type: ignore
+                    cumulative = 0
+                    for bound, count in zip(list(metric.buckets) + [float("inf")], counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _read(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: str, data: dict):
+    # Readers never see a partial file.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+REGISTRY = Registry()
@@ -0,0 +1,51 @@
+import asyncio
+import time
+import uuid
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admin.auth import ADMIN_TOKEN_HEADER, is_admin
+from app.core.profiling.sampler import Sampler
+
+PROFILE_HEADER = "X-Profile"
+
+
+class ProfilingMiddleware(object):
+    """
+    Profile single requests on demand.
+
+    A request carrying `X-Profile: 1` and a valid X-Admin-Token is sampled
+    for its whole lifetime, background tasks included, and written to
+    PROFILE_DIR as collapsed stacks; the file name is returned in X-Profile-File. Only registered when
+    ADMIN_TOKEN is set, and other requests pay one header lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get(PROFILE_HEADER) or not is_admin(headers.get(ADMIN_TOKEN_HEADER, "")):
+            await self.app(scope, receive, send)
+            return
+
+        name = "request-{}-{}".format(
+            time.strftime("%Y%m%dT%H%M%S"), headers.get("x-request-id", "")[:64] or uuid.uuid4().hex
+        )
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-File"] = f"{name}.folded"
+            await send(message)
+
+        sampler = Sampler(asyncio.get_running_loop(), asyncio.current_task()).start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await anyio.to_thread.run_sync(lambda: sampler.stop().write(name))
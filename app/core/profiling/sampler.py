@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+import anyio
+
+from app.config.config import Config
+from app.utils.logger import Log
+
+log = Log("Profiler")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # Semicolons separate frames in the collapsed format.
+    name = getattr(code, "co_qualname", code.co_name).replace(";", ":")
+    return f"{name} ({filename}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_stack(task: asyncio.Task) -> List[str]:
+    # The coroutine chain of a suspended task, outermost first, down to the awaited future.
+    stack = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_label(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+# Innermost frames of pool threads parked on their work queue.
+IDLE_FRAMES = {("threading.py", "wait"), ("thread.py", "_worker")}
+
+
+def _idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def profile_path(name: str) -> str:
+    return os.path.join(Config.PROFILE_DIR, f"{name}.folded")
+
+
+class Sampler(object):
+    """
+    Wall-clock sampling profiler run from a daemon thread.
+
+    Every PROFILE_INTERVAL_MS it reads the stack of every thread from
+    sys._current_frames() and counts it, so nothing is traced between
+    samples and the profiled code is not instrumented. Worker-pool threads
+    (anyio to_thread, Azure calls) show up under their thread name, idle ones
+    are skipped.
+
+    With a `task`, samples of the event loop thread are kept only while that
+    task runs, and while it is suspended its await chain is counted instead,
+    under "(awaiting)", so time spent waiting on Azure or the database shows
+    up too. Tasks the request spawns itself are not followed.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: Optional[asyncio.Task] = None):
+        self.loop = loop
+        self.task = task
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> "Sampler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self):
+        interval = Config.PROFILE_INTERVAL_MS / 1000
+        deadline = time.perf_counter() + Config.PROFILE_MAX_SECONDS
+        while not self._stop.wait(interval) and time.perf_counter() < deadline:
+            try:
+                self._sample()
+            except Exception as e:
+                # A frame can vanish between reads; lose the sample, not the profile.
+                log.debug("sample dropped: {}", e)
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if ident == self._loop_thread:
+                if self.task is not None and asyncio.current_task(self.loop) is not self.task:
+                    if not self.task.done():
+                        self.counts[";".join(["(awaiting)"] + _await_stack(self.task))] += 1
+                    continue
+                root = "(event loop)"
+            elif _idle(frame):
+                continue
+            else:
+                root = names.get(ident, str(ident))
+            self.counts[";".join([root] + _thread_stack(frame))] += 1
+
+    def collapsed(self) -> str:
+        """
+        Brendan Gregg's collapsed stacks, one "frame;frame;... count" per line;
+        flamegraph.pl and speedscope read it as is.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def write(self, name: str) -> str:
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        path = profile_path(name)
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        log.info("profile {}: {} samples over {:.2f}s.", path, self.samples, self.elapsed)
+        return path
+
+
+_worker_profile: Optional[asyncio.Task] = None
+
+
+def start_worker_profile(seconds: float, name: str) -> bool:
+    """
+    Sample every thread of this worker for `seconds`, then write the profile
+    as `name`; False when a worker profile is already running.
+    """
+    global _worker_profile
+    if _worker_profile is not None:
+        return False
+    sampler = Sampler(asyncio.get_running_loop()).start()
+    _worker_profile = asyncio.create_task(_finish_worker_profile(sampler, seconds, name))
+    return True
+
+
+async def _finish_worker_profile(sampler: Sampler, seconds: float, name: str):
+    global _worker_profile
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        _worker_profile = None
+        await anyio.to_thread.run_sync(lambda: sampler.stop().write(name))
@@ -0,0 +1,71 @@
+from bisect import bisect_left
+from typing import List
+
+from app.core.enums.projection_enum import Projection
+
+
+def _content(read_result: dict) -> str:
+    if read_result.get("content") is not None:
+        return read_result["content"]
+    # Merged document results only keep the pages.
+    return "\n".join(
+        line.get("content", "") for page in read_result.get("pages") or () for line in page.get("lines") or ()
+    )
+
+
+def _line_words(page: dict) -> List[dict]:
+    words = sorted(page.get("words") or (), key=lambda word: word.get("span", {}).get("offset", 0))
+    offsets = [word.get("span", {}).get("offset", 0) for word in words]
+    lines = []
+    for line in page.get("lines") or ():
+        members = []
+        if line.get("spans"):
+            start = line["spans"][0]["offset"]
+            first = bisect_left(offsets, start)
+            members = words[first : bisect_left(offsets, start + line["spans"][0]["length"])]  # noqa: E203
+        lines.append(
+            {
+                "content": line.get("content", ""),
+                "words": [
+                    {"content": word.get("content", ""), "confidence": word.get("confidence")} for word in members
+                ],
+            }
+        )
+    return lines
+
+
+def project_read_result(result, projection: Projection = Projection.FULL):
+    """
+    Trim an Image Analysis read result to `projection` before it is encoded.
+
+    Only the requested parts are copied into a new dict, so polygons a
+    client did not ask for are never walked by the encoder. Anything that
+    is not a read result (error tuples, receipts) is returned unchanged.
+    """
+    if projection == Projection.FULL or not isinstance(result, dict) or "readResult" not in result:
+        return result
+    read_result = result.get("readResult") or {}
+    projected = {key: result[key] for key in ("modelVersion", "metadata") if key in result}
+    if projection == Projection.TEXT:
+        projected["readResult"] = {"content": _content(read_result)}
+        return projected
+
+    pages = []
+    for page in read_result.get("pages") or ():
+        trimmed = {key: page[key] for key in ("pageNumber", "width", "height", "angle") if key in page}
+        if projection == Projection.LINES:
+            trimmed["lines"] = [line.get("content", "") for line in page.get("lines") or ()]
+        else:
+            trimmed["lines"] = _line_words(page)
+        pages.append(trimmed)
+    projected["readResult"] = {"content": _content(read_result), "pages": pages}
+    return projected
+
+
+def project_entry(entry: dict, projection: Projection = Projection.FULL) -> dict:
+    """
+    A per-page document entry with its result trimmed to `projection`.
+    """
+    if projection == Projection.FULL or not entry.get("result"):
+        return entry
+    return dict(entry, result=project_read_result(entry["result"], projection))
@@ -0,0 +1,112 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import ReceiptItemRecord, ReceiptRecord
+from app.core.entities.receipt.receipt import Receipt
+from app.core.rollup.rollup import apply_rollup_delta, contribution_of
+
+ZERO = Decimal(0)
+
+
+def to_decimal(value) -> Optional[Decimal]:
+    """
+    Azure returns floats (CurrencyValue amounts for money), the Receipt
+    entity keeps them as strings. Missing values are None; anything else that
+    is not a finite number raises ValueError instead of being stored as 0.
+    """
+    value = getattr(value, "amount", value)
+    if value is None or value == "":
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"not an amount: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"not an amount: {value!r}")
+    return number
+
+
+def to_amount(value) -> Decimal:
+    # Receipt money columns are NOT NULL: a field Azure did not find counts as 0.
+    number = to_decimal(value)
+    return ZERO if number is None else number
+
+
+def to_date(value) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+async def store_receipt(session: AsyncSession, receipt_id: str, receipt: Receipt) -> ReceiptRecord:
+    """
+    Insert or replace a receipt and move its rollup contribution in one transaction.
+
+    Storing the same receipt id again is a correction: the rollups are adjusted
+    by the difference between the previous and the new values only.
+    """
+    try:
+        record = await session.get(ReceiptRecord, receipt_id, with_for_update=True)
+        old = contribution_of(record)
+        if record is None:
+            record = ReceiptRecord(id=receipt_id)
+            session.add(record)
+
+        record.merchant_name = receipt.merchant_name or ""
+        record.transaction_date = to_date(receipt.transaction_date)
+        record.transaction_time = str(receipt.transaction_time or "")
+        record.phone_number = str(receipt.phone_number or "")
+        record.subtotal = to_amount(receipt.subtotal)
+        record.tax = to_amount(receipt.tax)
+        record.tip = to_amount(receipt.tip)
+        record.total = to_amount(receipt.total)
+        record.items = [
+            ReceiptItemRecord(
+                position=position,
+                description=item.description or "",
+                quantity=to_decimal(item.quantity),
+                price=to_decimal(item.price),
+                total_price=to_decimal(item.total_price),
+            )
+            for position, item in enumerate(receipt.receipt_items)
+        ]
+
+        await apply_rollup_delta(session, old, contribution_of(record))
+        await session.commit()
+        return record
+    except Exception:
+        await session.rollback()
+        raise
+
+
+async def correct_receipt(session: AsyncSession, receipt_id: str, changes: dict) -> Optional[ReceiptRecord]:
+    """
+    Apply field corrections to a stored receipt.
+
+    Returns None when the receipt does not exist.
+    """
+    try:
+        record = await session.get(ReceiptRecord, receipt_id, with_for_update=True)
+        if record is None:
+            return None
+        old = contribution_of(record)
+
+        for name, value in changes.items():
+            if name in ("subtotal", "tax", "tip", "total"):
+                value = to_amount(value)
+            setattr(record, name, value)
+
+        await apply_rollup_delta(session, old, contribution_of(record))
+        await session.commit()
+        return record
+    except Exception:
+        await session.rollback()
+        raise
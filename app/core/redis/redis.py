@@ -1,17 +1,32 @@
+from typing import Optional
+
 import redis.asyncio
 
 from app.config.config import Config
 
-redis_connection = redis.asyncio.from_url(
-    f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}",
-    decode_responses=True,
-)
+redis_connection: Optional[redis.asyncio.Redis] = None
 
 
 def get_redis():
     """
-    @brief Get the redis connection.
+    @brief Get the redis connection, created on first use.
     @return a : class : ` ~redis.
     Connection ` or : data : ` None ` if there is no
     """
+    global redis_connection
+    if redis_connection is None:
+        redis_connection = redis.asyncio.from_url(
+            f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}",
+            decode_responses=True,
+        )
     return redis_connection
+
+
+async def close_redis():
+    """
+    @brief Close the redis connection if one was opened.
+    """
+    global redis_connection
+    if redis_connection is not None:
+        await redis_connection.close()
+    redis_connection = None
@@ -0,0 +1,18 @@
+import asyncio
+
+from app.core.database import dispose_engine, get_async_session
+from app.core.rollup.rollup import rebuild_rollups
+from app.utils.logger import Log
+
+log = Log("Rollup Rebuild")
+
+
+async def main():
+    async with get_async_session()() as session:
+        await rebuild_rollups(session)
+    await dispose_engine()
+    log.info("receipt rollups rebuilt.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
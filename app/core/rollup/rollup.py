@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.models import ReceiptRecord, ReceiptRollup
+from app.core.enums.rollup_period_enum import RollupPeriod
+
+ZERO = Decimal(0)
+
+
+@dataclass(frozen=True)
+class Contribution:
+    merchant_name: str
+    transaction_date: date
+    total: Decimal
+    tax: Decimal
+
+
+def period_start(period: RollupPeriod, day: date) -> date:
+    # Returns the first day of the bucket the given day falls into.
+    if period == RollupPeriod.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def contribution_of(record: Optional[ReceiptRecord]) -> Optional[Contribution]:
+    # Receipts without a transaction date cannot be placed in any period.
+    if record is None or record.transaction_date is None:
+        return None
+    return Contribution(
+        merchant_name=record.merchant_name or "",
+        transaction_date=record.transaction_date,
+        total=Decimal(record.total or ZERO),
+        tax=Decimal(record.tax or ZERO),
+    )
+
+
+async def apply_rollup_delta(
+    session: AsyncSession,
+    old: Optional[Contribution],
+    new: Optional[Contribution],
+):
+    """
+    Move a receipt's contribution from its old buckets to its new buckets.
+
+    Deltas for the same bucket are merged before writing, so storing the same
+    receipt twice (old == new) leaves every rollup untouched. Must run in the
+    same transaction that writes the receipt row.
+    """
+    deltas: dict = {}
+    for contribution, sign in ((old, -1), (new, 1)):
+        if contribution is None:
+            continue
+        for period in RollupPeriod:
+            key = (contribution.merchant_name, period.value, period_start(period, contribution.transaction_date))
+            total, tax, count = deltas.get(key, (ZERO, ZERO, 0))
+            deltas[key] = (total + sign * contribution.total, tax + sign * contribution.tax, count + sign)
+
+    for (merchant_name, period, start), (total, tax, count) in deltas.items():
+        # Skip buckets whose net change is zero.
+        if not total and not tax and not count:
+            continue
+        stmt = mysql_insert(ReceiptRollup).values(
+            merchant_name=merchant_name,
+            period=period,
+            period_start=start,
+            total=total,
+            tax=tax,
+            receipt_count=count,
+        )
+        stmt = stmt.on_duplicate_key_update(
+            total=ReceiptRollup.total + stmt.inserted.total,
+            tax=ReceiptRollup.tax + stmt.inserted.tax,
+            receipt_count=ReceiptRollup.receipt_count + stmt.inserted.receipt_count,
+        )
+        await session.execute(stmt)
+
+
+async def get_rollup(session: AsyncSession, merchant_name: str, period: RollupPeriod, day: date) -> dict:
+    # Primary-key lookup, independent of the number of stored receipts.
+    start = period_start(period, day)
+    row = await session.get(ReceiptRollup, (merchant_name, period.value, start))
+    return dict(
+        merchant_name=merchant_name,
+        period=period.value,
+        period_start=start.isoformat(),
+        total=row.total if row else ZERO,
+        tax=row.tax if row else ZERO,
+        receipt_count=row.receipt_count if row else 0,
+    )
+
+
+async def rebuild_rollups(session: AsyncSession):
+    """
+    Recompute every rollup bucket from the receipts table.
+
+    Intended for backfills and for repairing drift; the regular write path
+    keeps the buckets up to date incrementally.
+    """
+    columns = [
+        ReceiptRollup.merchant_name,
+        ReceiptRollup.period,
+        ReceiptRollup.period_start,
+        ReceiptRollup.total,
+        ReceiptRollup.tax,
+        ReceiptRollup.receipt_count,
+    ]
+    buckets = {
+        RollupPeriod.DAY: ReceiptRecord.transaction_date,
+        RollupPeriod.MONTH: func.date_format(ReceiptRecord.transaction_date, "%Y-%m-01"),
+    }
+    try:
+        await session.execute(delete(ReceiptRollup))
+        for period, bucket in buckets.items():
+            query = (
+                select(
+                    ReceiptRecord.merchant_name,
+                    literal(period.value),
+                    bucket,
+                    func.sum(ReceiptRecord.total),
+                    func.sum(ReceiptRecord.tax),
+                    func.count(),
+                )
+                .where(ReceiptRecord.transaction_date.isnot(None))
+                .group_by(ReceiptRecord.merchant_name, bucket)
+            )
+            await session.execute(insert(ReceiptRollup).from_select(columns, query))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
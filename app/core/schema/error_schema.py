@@ -48,6 +48,138 @@ class ErrorCode(str, Enum):
         400,
     )
 
+    DOCUMENT_FORMAT_UNAVAILABLE = (
+        "DOCUMENT_FORMAT_UNAVAILABLE",
+        "This document format is not available on this server.",
+        400,
+    )
+
+    INVALID_DOCUMENT = (
+        "INVALID_DOCUMENT",
+        "The uploaded file is not a readable image, TIFF or PDF.",
+        400,
+    )
+
+    DOCUMENT_TOO_MANY_PAGES = (
+        "DOCUMENT_TOO_MANY_PAGES",
+        "The document has more pages than this server accepts.",
+        400,
+    )
+
+    IMAGE_TOO_SMALL = (
+        "IMAGE_TOO_SMALL",
+        "The image is too small to read.",
+        400,
+    )
+
+    IMAGE_BLANK = (
+        "IMAGE_BLANK",
+        "The image is blank.",
+        400,
+    )
+
+    IMAGE_TOO_DARK = (
+        "IMAGE_TOO_DARK",
+        "The image is too dark to read.",
+        400,
+    )
+
+    IMAGE_TOO_BLURRY = (
+        "IMAGE_TOO_BLURRY",
+        "The image is too blurry to read.",
+        400,
+    )
+
+    IMAGE_NO_TEXT = (
+        "IMAGE_NO_TEXT",
+        "The image does not appear to contain text.",
+        400,
+    )
+
+    URL_NOT_ALLOWED = (
+        "URL_NOT_ALLOWED",
+        "Images are not fetched from this URL.",
+        400,
+    )
+
+    URL_FETCH_FAILED = (
+        "URL_FETCH_FAILED",
+        "The image URL could not be downloaded.",
+        502,
+    )
+
+    URL_FETCH_TIMEOUT = (
+        "URL_FETCH_TIMEOUT",
+        "Downloading the image URL timed out.",
+        504,
+    )
+
+    URL_TOO_LARGE = (
+        "URL_TOO_LARGE",
+        "The image at the URL is larger than this server accepts.",
+        413,
+    )
+
+    URL_NOT_AN_IMAGE = (
+        "URL_NOT_AN_IMAGE",
+        "The URL does not point to an image.",
+        415,
+    )
+
+    OCR_RESULT_NOT_FOUND = (
+        "OCR_RESULT_NOT_FOUND",
+        "No cached OCR result for this document; OCR it again.",
+        404,
+    )
+
+    WEBHOOK_UNAVAILABLE = (
+        "WEBHOOK_UNAVAILABLE",
+        "Callbacks are not enabled on this server.",
+        400,
+    )
+
+    WEBHOOK_URL_NOT_ALLOWED = (
+        "WEBHOOK_URL_NOT_ALLOWED",
+        "Callbacks are not sent to this URL.",
+        400,
+    )
+
+    JOB_INTERRUPTED = (
+        "JOB_INTERRUPTED",
+        "The job was interrupted before it finished; submit it again.",
+        500,
+    )
+
+    SERVICE_NOT_READY = (
+        "SERVICE_NOT_READY",
+        "A required dependency is down or the server is saturated.",
+        503,
+    )
+
+    PROFILE_RUNNING = (
+        "PROFILE_RUNNING",
+        "A worker profile is already running on this worker.",
+        409,
+    )
+
+    SNAPSHOT_NOT_FOUND = (
+        "SNAPSHOT_NOT_FOUND",
+        "Memory snapshot not found; take one with POST /admin/memory/snapshots.",
+        404,
+    )
+
+    RECEIPT_NOT_FOUND = (
+        "RECEIPT_NOT_FOUND",
+        "Receipt not found.",
+        404,
+    )
+
+    EXPORT_FORMAT_UNAVAILABLE = (
+        "EXPORT_FORMAT_UNAVAILABLE",
+        "The requested export format is not available on this server.",
+        400,
+    )
+
     USER_DELETED = (
         "USER_DELETED",
         "User has been deleted.",
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field, conlist
+
+from app.core.enums.region_enum import RegionMatch, RegionUnit
+
+
+class Zone(BaseModel):
+    name: str = Field(title="zone name", example="invoice_number")
+    box: conlist(float, min_items=4, max_items=4) = Field(title="x0, y0, x1, y1", example=[0.6, 0.05, 0.95, 0.1])
+    page: int = Field(1, ge=1, title="page number")
+
+
+class RegionQuery(BaseModel):
+    zones: conlist(Zone, min_items=1, max_items=200)
+    units: RegionUnit = Field(RegionUnit.PIXEL, title="unit of the zone boxes")
+    match: RegionMatch = Field(RegionMatch.CENTER, title="which words belong to a zone")
+
+    class Config:
+        schema_extra = {
+            "description": "Zones to read from a cached OCR result",
+            "example": {
+                "units": "relative",
+                "zones": [
+                    {"name": "invoice_number", "box": [0.6, 0.05, 0.95, 0.1]},
+                    {"name": "total", "box": [0.6, 0.8, 0.95, 0.9]},
+                ],
+            },
+        }
@@ -0,0 +1,69 @@
+import dataclasses
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import PurePath
+from types import GeneratorType
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from pydantic.json import ENCODERS_BY_TYPE, decimal_encoder
+from starlette.responses import JSONResponse
+
+DATETIME_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def orjson_default(obj: Any) -> Any:
+    """
+    Encode the types orjson does not handle the way BaseResponse.encode_json does.
+
+    dict/list/str/int/float/Enum/UUID/dataclass values are serialized natively
+    by orjson, only the remaining types reach this hook.
+    """
+    # Datetimes are passed through so they keep the response format of encode_json.
+    if isinstance(obj, datetime):
+        return obj.strftime(DATETIME_FORMAT)
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return decimal_encoder(obj)
+    if isinstance(obj, (set, frozenset, GeneratorType)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        obj_dict = obj.dict(by_alias=True)
+        return obj_dict["__root__"] if "__root__" in obj_dict else obj_dict
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    # Fall back to the pydantic encoders jsonable_encoder uses.
+    for base in type(obj).__mro__[:-1]:
+        encoder = ENCODERS_BY_TYPE.get(base)
+        if encoder is not None:
+            return encoder(obj)
+    # Same last resort as jsonable_encoder, e.g. for Azure SDK value objects.
+    try:
+        return dict(obj)
+    except Exception:
+        try:
+            return vars(obj)
+        except TypeError:
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson in a single pass.
+
+    Returning it from a route also skips FastAPI's own jsonable_encoder walk,
+    which otherwise runs on every dict a route returns.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,23 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReceiptCorrectionRequest(BaseModel):
+    merchant_name: Optional[str] = Field(title="merchant name", example="セブン-イレブン")
+    transaction_date: Optional[date] = Field(title="transaction date", example="2023-10-01")
+    subtotal: Optional[Decimal] = Field(title="subtotal", example="1000")
+    tax: Optional[Decimal] = Field(title="total tax", example="100")
+    tip: Optional[Decimal] = Field(title="tip", example="0")
+    total: Optional[Decimal] = Field(title="total", example="1100")
+
+    class Config:
+        schema_extra = {
+            "description": "Corrected receipt fields, omitted fields are left unchanged",
+            "example": {
+                "merchant_name": "セブン-イレブン",
+                "total": "1100",
+            },
+        }
@@ -0,0 +1,111 @@
+import unicodedata
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_session
+from app.core.database.models import OcrDocument
+from app.utils.logger import Log
+
+log = Log("OCR Search")
+
+SNIPPET_RADIUS = 40
+
+# Default innodb_ft_min_token_size for the ngram parser (ngram_token_size).
+NGRAM_TOKEN_SIZE = 2
+
+
+def normalize_text(text: str) -> str:
+    # NFKC folds full-width latin/digits and half-width katakana so that
+    # "ＩＮＶ１２３" and "INV123" index to the same ngrams.
+    return unicodedata.normalize("NFKC", text)
+
+
+def extract_text_lines(result: dict) -> List[str]:
+    """
+    Collect the line texts of an Image Analysis `read` result, page by page.
+    """
+    read_result = result.get("readResult") or {}
+    lines = []
+    for page in read_result.get("pages") or ():
+        for line in page.get("lines") or ():
+            content = line.get("content")
+            if content:
+                lines.append(content)
+    # Older payloads only expose the flattened content.
+    if not lines and read_result.get("content"):
+        lines = read_result["content"].splitlines()
+    return lines
+
+
+async def index_document(document_id: str, source: str, result: dict):
+    """
+    Persist the OCR text of a document so it becomes searchable.
+
+    Runs as a background task after the response has been sent; failures are
+    logged and never surface to the client.
+    """
+    lines = extract_text_lines(result) if isinstance(result, dict) else []
+    if not lines:
+        return
+    content = normalize_text("\n".join(lines))
+
+    session = get_async_session().session_factory()
+    try:
+        stmt = mysql_insert(OcrDocument).values(id=document_id, source=source[:2048], content=content)
+        stmt = stmt.on_duplicate_key_update(content=stmt.inserted.content, updated_at=func.now())
+        await session.execute(stmt)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        log.error("index_document failed: {}", e)
+    finally:
+        await session.close()
+
+
+def make_snippet(content: str, query: str) -> str:
+    # Anchor on the full query first, then on its first ngram that occurs.
+    position = content.find(query)
+    if position < 0:
+        for start in range(max(len(query) - NGRAM_TOKEN_SIZE + 1, 1)):
+            end = start + NGRAM_TOKEN_SIZE
+            position = content.find(query[start:end])
+            if position >= 0:
+                break
+    position = max(position, 0)
+    start = max(position - SNIPPET_RADIUS, 0)
+    end = min(position + len(query) + SNIPPET_RADIUS, len(content))
+    snippet = content[start:end].replace("\n", " ")
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(content) else "")
+
+
+async def search_documents(session: AsyncSession, query: str, limit: int = 20) -> List[dict]:
+    """
+    Rank stored documents against `query` with the ngram FULLTEXT index.
+
+    Queries shorter than the ngram token size cannot match and return nothing.
+    """
+    query = normalize_text(query).strip()
+    if len(query) < NGRAM_TOKEN_SIZE:
+        return []
+
+    score = match(OcrDocument.content, against=query).in_natural_language_mode()
+    stmt = (
+        select(OcrDocument.id, OcrDocument.source, OcrDocument.content, score.label("score"))
+        .where(score)
+        .order_by(score.desc())
+        .limit(limit)
+    )
+    rows = (await session.execute(stmt)).all()
+    return [
+        dict(
+            document_id=row.id,
+            source=row.source,
+            score=float(row.score),
+            snippet=make_snippet(row.content, query),
+        )
+        for row in rows
+    ]
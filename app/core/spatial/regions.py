@@ -0,0 +1,38 @@
+from collections import OrderedDict
+from typing import Optional
+
+from app.config.config import Config
+from app.core.cache.result_cache import OCR_RESULTS
+from app.core.enums.region_enum import RegionUnit
+from app.core.metrics.metrics import track_stage
+from app.core.schema.ocr.region_schema import RegionQuery
+from app.core.spatial.word_index import WordIndex
+
+# Most recently queried documents, so template runs over one document parse its result once.
+_indexes: "OrderedDict[str, WordIndex]" = OrderedDict()
+
+
+async def get_word_index(document_id: str) -> Optional[WordIndex]:
+    index = _indexes.get(document_id)
+    if index is not None:
+        _indexes.move_to_end(document_id)
+        return index
+
+    result = await OCR_RESULTS.get(document_id)
+    if result is None:
+        return None
+    with track_stage("word_index_build"):
+        index = WordIndex.from_result(result)
+    _indexes[document_id] = index
+    while len(_indexes) > Config.REGION_INDEX_CACHE_SIZE:
+        _indexes.popitem(last=False)
+    return index
+
+
+def query_regions(index: WordIndex, query: RegionQuery) -> dict:
+    """
+    Answer of every zone by name; None for a zone on a page the document does not have.
+    """
+    relative = query.units == RegionUnit.RELATIVE
+    with track_stage("region_query"):
+        return {zone.name: index.query(zone.page, zone.box, query.match, relative) for zone in query.zones}
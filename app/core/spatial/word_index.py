@@ -0,0 +1,166 @@
+import math
+from typing import Dict, List, Optional, Sequence
+
+from app.core.enums.region_enum import RegionMatch
+
+# Target mean number of words per grid cell.
+WORDS_PER_CELL = 4
+
+
+class PageIndex(object):
+    """
+    Words of one page as parallel numpy arrays with a uniform grid over their centres.
+
+    Boxes are the axis-aligned bounds of Azure's quadrilaterals. Each word is
+    filed under the cell of its centre and cells are laid out row-major in
+    one sorted array (CSR), so the words of a run of cells in a grid row are
+    one contiguous slice. A query widens its rectangle by the largest half
+    word size, takes one slice per grid row and filters those candidates
+    exactly; no per-word Python runs until the answer is built.
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "text",
+        "boxes",
+        "centers",
+        "confidence",
+        "cell",
+        "cols",
+        "rows",
+        "starts",
+        "order",
+        "pad",
+    )
+
+    def __init__(self, width: float, height: float, text: List[str], boxes, confidence):
+        import numpy as np
+
+        self.width, self.height = width, height
+        self.text = text
+        # x0, y0, x1, y1 per word, in Azure's reading order.
+        self.boxes = boxes
+        self.centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        self.confidence = confidence
+
+        count = len(text)
+        span = max(width, height, 1.0)
+        self.cell = max(math.sqrt(max(width, 1.0) * max(height, 1.0) * WORDS_PER_CELL / count), 1.0) if count else span
+        self.cols = max(int(math.ceil(max(width, 1.0) / self.cell)), 1)
+        self.rows = max(int(math.ceil(max(height, 1.0) / self.cell)), 1)
+        if count:
+            cx = np.clip((self.centers[:, 0] // self.cell).astype(np.int32), 0, self.cols - 1)
+            cy = np.clip((self.centers[:, 1] // self.cell).astype(np.int32), 0, self.rows - 1)
+            cells = cy * self.cols + cx
+            self.order = np.argsort(cells, kind="stable").astype(np.int32)
+            # A list: slicing it per query is cheaper than slicing an array.
+            self.starts = np.searchsorted(cells[self.order], np.arange(self.rows * self.cols + 1)).tolist()
+            self.pad = (float((boxes[:, 2] - boxes[:, 0]).max()) / 2, float((boxes[:, 3] - boxes[:, 1]).max()) / 2)
+        else:
+            self.order = np.zeros(0, np.int32)
+            self.starts = [0] * (self.rows * self.cols + 1)
+            self.pad = (0.0, 0.0)
+
+    @classmethod
+    def from_page(cls, page: dict) -> "PageIndex":
+        import numpy as np
+
+        words = page.get("words") or ()
+        text = [word.get("content", "") for word in words]
+        if words:
+            quads = np.array([word["boundingBox"] for word in words], dtype=np.float32).reshape(-1, 4, 2)
+            boxes = np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1)
+        else:
+            boxes = np.zeros((0, 4), np.float32)
+        confidence = np.array([word.get("confidence", 0.0) for word in words], dtype=np.float32)
+        return cls(float(page.get("width") or 0.0), float(page.get("height") or 0.0), text, boxes, confidence)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, match: RegionMatch = RegionMatch.CENTER):
+        """
+        Indices, in reading order, of the words in the rectangle under `match`.
+        """
+        import numpy as np
+
+        if not len(self.text) or x1 <= x0 or y1 <= y0:
+            return np.zeros(0, np.int32)
+        # A word intersecting the rectangle has its centre at most half its size outside it.
+        pad_x, pad_y = self.pad if match == RegionMatch.INTERSECTS else (0.0, 0.0)
+        col_a = min(max(int((x0 - pad_x) // self.cell), 0), self.cols - 1)
+        col_b = min(max(int((x1 + pad_x) // self.cell), 0), self.cols - 1)
+        row_a = min(max(int((y0 - pad_y) // self.cell), 0), self.rows - 1)
+        row_b = min(max(int((y1 + pad_y) // self.cell), 0), self.rows - 1)
+        first = self.starts[row_a * self.cols + col_a : row_b * self.cols + col_a + 1 : self.cols]  # noqa: E203
+        last = self.starts[row_a * self.cols + col_b + 1 : row_b * self.cols + col_b + 2 : self.cols]  # noqa: E203
+        if len(first) == 1:
+            candidates = self.order[first[0] : last[0]]  # noqa: E203
+        else:
+            candidates = np.concatenate([self.order[a:b] for a, b in zip(first, last)])
+        if not len(candidates):
+            return candidates
+
+        # Whole-row comparisons against (x, y) pairs: few ufunc calls, which dominate at this size.
+        low, high = np.array((x0, y0), np.float32), np.array((x1, y1), np.float32)
+        if match == RegionMatch.CONTAINS:
+            boxes = self.boxes[candidates]
+            keep = ((boxes[:, :2] >= low) & (boxes[:, 2:] <= high)).all(axis=1)
+        elif match == RegionMatch.INTERSECTS:
+            boxes = self.boxes[candidates]
+            keep = ((boxes[:, :2] < high) & (boxes[:, 2:] > low)).all(axis=1)
+        else:
+            centers = self.centers[candidates]
+            keep = ((centers >= low) & (centers < high)).all(axis=1)
+        return np.sort(candidates[keep])
+
+    def words(self, indices) -> dict:
+        """
+        Text, words and mean confidence of a query answer.
+        """
+        import numpy as np
+
+        text = [self.text[i] for i in indices.tolist()]
+        confidence = self.confidence[indices]
+        # Round in float64, float32 values do not round-trip to short decimals.
+        boxes = self.boxes[indices].astype(np.float64).round(1).tolist()
+        scores = confidence.astype(np.float64).round(4).tolist()
+        words = [
+            {"content": content, "box": box, "confidence": score} for content, box, score in zip(text, boxes, scores)
+        ]
+        mean = round(float(confidence.mean()), 4) if len(text) else None
+        return {"text": " ".join(text), "confidence": mean, "words": words}
+
+
+class WordIndex(object):
+    """
+    Spatial index over the words of a read result, one PageIndex per page.
+    """
+
+    def __init__(self, pages: Dict[int, PageIndex]):
+        self.pages = pages
+
+    @classmethod
+    def from_result(cls, result: dict) -> "WordIndex":
+        pages = {}
+        for number, page in enumerate((result.get("readResult") or {}).get("pages") or (), start=1):
+            pages[page.get("pageNumber") or number] = PageIndex.from_page(page)
+        return cls(pages)
+
+    def query(
+        self,
+        page: int,
+        box: Sequence[float],
+        match: RegionMatch = RegionMatch.CENTER,
+        relative: bool = False,
+    ) -> Optional[dict]:
+        """
+        Words of `page` inside `box` (x0, y0, x1, y1), in pixels or as
+        fractions of the page size; None when the page does not exist.
+        """
+        index = self.pages.get(page)
+        if index is None:
+            return None
+        x0, y0, x1, y1 = box
+        if relative:
+            x0, x1 = x0 * index.width, x1 * index.width
+            y0, y1 = y0 * index.height, y1 * index.height
+        return index.words(index.query(x0, y0, x1, y1, match))
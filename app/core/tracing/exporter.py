@@ -0,0 +1,125 @@
+import atexit
+import os
+import threading
+from collections import deque
+from typing import List, Optional
+
+import orjson
+
+from app.config.config import Config
+from app.core.tracing.tracing import Trace
+
+
+def to_otlp(traces: List[Trace]) -> dict:
+    """
+    Encode traces as an OTLP/JSON ExportTraceServiceRequest.
+    """
+    spans = []
+    for trace in traces:
+        for span in trace.spans:
+            attributes = [{"key": "request.id", "value": {"stringValue": trace.request_id}}]
+            for key, value in span.attributes.items():
+                if isinstance(value, bool):
+                    attributes.append({"key": key, "value": {"boolValue": value}})
+                elif isinstance(value, int):
+                    attributes.append({"key": key, "value": {"intValue": str(value)}})
+                elif isinstance(value, float):
+                    attributes.append({"key": key, "value": {"doubleValue": value}})
+                else:
+                    attributes.append({"key": key, "value": {"stringValue": str(value)}})
+            spans.append(
+                {
+                    "traceId": trace.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 2 if span is trace.root else 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": attributes,
+                    "status": {"code": 2 if span.error else 1},
+                }
+            )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": "azure-vision"}},
+                        {"key": "service.version", "value": {"stringValue": Config.VERSION}},
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class TraceExporter(object):
+    """
+    Batch completed traces and ship them from a background thread.
+
+    With TRACE_EXPORT_URL set the batch is POSTed to an OTLP/HTTP JSON
+    endpoint (collector or stand-in), otherwise it is appended as one JSON
+    line to TRACE_EXPORT_FILE. The request path only appends to a deque.
+    """
+
+    def __init__(self, path: str, url: str = "", flush_interval: float = 2.0, max_pending: int = 10_000):
+        self.path = path
+        self.url = url
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pending: deque = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def export(self, trace: Trace):
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(trace)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _after_fork(self):
+        # Each worker starts its own thread on first export.
+        self._pending.clear()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._session = None
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Exporting must never take the worker down.
+                pass
+
+    def flush(self):
+        traces = []
+        while self._pending:
+            traces.append(self._pending.popleft())
+        if not traces:
+            return
+        body = orjson.dumps(to_otlp(traces))
+        if self.url:
+            if self._session is None:
+                import requests
+
+                self._session = requests.Session()
+            self._session.post(self.url, data=body, headers={"Content-Type": "application/json"}, timeout=5)
+        else:
+            with open(self.path, "ab") as f:
+                f.write(body + b"\n")
+
+
+EXPORTER = TraceExporter(Config.TRACE_EXPORT_FILE, Config.TRACE_EXPORT_URL)
@@ -0,0 +1,65 @@
+import re
+import time
+import uuid
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing.exporter import EXPORTER
+from app.core.tracing.tracing import Trace, end_trace, start_trace
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class TracingMiddleware(object):
+    """
+    Open a trace per HTTP request.
+
+    The correlation id comes from X-Request-ID (or is generated), is bound to
+    every Log record of the request and echoed back together with a
+    Server-Timing header built from the recorded spans. An incoming W3C
+    traceparent is continued, including its sampled flag.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        trace_id = parent_id = sampled = None
+        match = TRACEPARENT.match(headers.get(b"traceparent", b"").decode("latin-1"))
+        if match:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = bool(int(match.group(3), 16) & 1)
+
+        trace = Trace(request_id, trace_id, parent_id, sampled)
+        trace.root.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                trace.root.attributes["http.status_code"] = message["status"]
+                # Handled failures answer 200 and were already recorded, see record_failure.
+                trace.root.error = trace.root.error or message["status"] >= 500
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = request_id
+                response_headers["Server-Timing"] = trace.server_timing()
+            await send(message)
+
+        token = start_trace(trace)
+        try:
+            with logger.contextualize(request_id=request_id):
+                await self.app(scope, receive, send_wrapper)
+        except Exception:
+            trace.root.error = True
+            raise
+        finally:
+            trace.root.end_ns = time.time_ns()
+            end_trace(token)
+            if trace.should_export():
+                EXPORTER.export(trace)
@@ -0,0 +1,131 @@
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.config.config import Config
+
+
+class Span(object):
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, object] = {}
+        self.error = False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Trace(object):
+    """
+    Spans collected for one request.
+
+    Spans are always recorded (a few attribute writes each) so that the
+    Server-Timing header and tail sampling can use them; whether the trace is
+    exported is decided when the request finishes.
+    """
+
+    __slots__ = ("trace_id", "request_id", "root", "spans", "head_sampled")
+
+    def __init__(self, request_id: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, sampled=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.request_id = request_id
+        self.root = Span("request", parent_id)
+        self.spans: List[Span] = [self.root]
+        self.head_sampled = sampled if sampled is not None else random.random() < Config.TRACE_SAMPLE_RATE
+
+    def should_export(self) -> bool:
+        # Tail sampling keeps every slow or failed request regardless of the head decision.
+        if self.head_sampled or self.root.error:
+            return True
+        return self.root.duration_ms >= Config.TRACE_TAIL_LATENCY_MS
+
+    def server_timing(self) -> str:
+        entries = [f"{span.name};dur={span.duration_ms:.1f}" for span in self.spans[1:] if span.end_ns]
+        entries.append(f"total;dur={(time.time_ns() - self.root.start_ns) / 1e6:.1f}")
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+# The innermost open span. A context variable rather than trace state, so concurrent
+# page/tile tasks and to_thread calls of one request each parent their own spans.
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def record_failure(code: str, status: Optional[int]):
+    """
+    Note a handled failure on the current request. Routes answer those with
+    HTTP 200 and a failed body, so the status code alone does not show them;
+    server-side ones (status >= 500) mark the request as an error.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.root.attributes["error.code"] = code
+        trace.root.attributes["error.status"] = status
+        if status is not None and status >= 500:
+            trace.root.error = True
+
+
+def start_trace(trace: Trace):
+    return _current_trace.set(trace), _current_span.set(trace.root)
+
+
+def end_trace(token):
+    trace_token, span_token = token
+    _current_span.reset(span_token)
+    _current_trace.reset(trace_token)
+
+
+class span(object):
+    """
+    Record a child span of the current request; a no-op outside a request.
+
+        with span("azure_read", bytes=len(data)):
+            ...
+    """
+
+    __slots__ = ("name", "attributes", "trace", "span", "token")
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.trace = None
+
+    def __enter__(self):
+        trace = self.trace = _current_trace.get()
+        if trace is not None:
+            parent = _current_span.get() or trace.root
+            self.span = Span(self.name, parent.span_id)
+            if self.attributes:
+                self.span.attributes.update(self.attributes)
+            trace.spans.append(self.span)
+            self.token = _current_span.set(self.span)
+        return self
+
+    def set(self, key: str, value):
+        if self.trace is not None:
+            self.span.attributes[key] = value
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            self.span.end_ns = time.time_ns()
+            self.span.error = exc_type is not None
+            _current_span.reset(self.token)
+        return False
@@ -0,0 +1,106 @@
+from typing import NamedTuple, Optional
+
+from app.config.config import Config
+from app.core.enums.triage_mode_enum import TriageMode
+from app.core.metrics.metrics import TRIAGE_DECISIONS, track_stage
+from app.core.schema.error_schema import ErrorCode
+from app.helpers.converter import to_gray
+from app.utils.logger import Log
+
+log = Log("Triage")
+
+
+class Verdict(NamedTuple):
+    # None when the image passed every check
+    reason: Optional[ErrorCode]
+    scores: dict
+
+    @property
+    def passed(self) -> bool:
+        return self.reason is None
+
+    @property
+    def rejected(self) -> bool:
+        return not self.passed and Config.TRIAGE_MODE == TriageMode.REJECT
+
+    def meta(self) -> Optional[dict]:
+        """
+        `meta.triage` of a flagged image, None when there is nothing to report.
+        """
+        if self.passed:
+            return None
+        return {"reason": self.reason.code, "msg": self.reason.msg, "scores": self.scores}
+
+
+PASSED = Verdict(None, {})
+
+
+def _content(gray, ink):
+    """
+    The part of `gray` holding ink: the 0.5-99.5 percentile box of the ink
+    pixels, padded, so lone specks do not stretch it over the page.
+    """
+    import numpy as np
+
+    ys, xs = np.nonzero(ink)
+    pad = max(4, min(gray.shape) // 64)
+    top, bottom = (int(v) for v in np.percentile(ys, (0.5, 99.5)))
+    left, right = (int(v) for v in np.percentile(xs, (0.5, 99.5)))
+    return gray[max(0, top - pad) : bottom + pad + 1, max(0, left - pad) : right + pad + 1]  # noqa: E203
+
+
+def assess(image) -> Verdict:
+    """
+    Score an image on a TRIAGE_SAMPLE_SIDE copy and return the first failed check.
+
+    Checks run cheapest first: size of the original, mean grey level (black
+    frames), share of ink pixels, those far from the median paper level
+    (blank pages), then, on the box around the ink only, variance of the
+    Laplacian (blur) and the share of Canny edge pixels (text-likeness).
+    Scoring the ink box keeps a sparse page, a cover sheet or a one-line
+    note, from being judged by its empty paper.
+    """
+    import cv2
+    import numpy as np
+
+    height, width = image.shape[:2]
+    scores = {"width": width, "height": height}
+    if min(height, width) < Config.TRIAGE_MIN_SIDE:
+        return Verdict(ErrorCode.IMAGE_TOO_SMALL, scores)
+
+    gray = to_gray(image, Config.TRIAGE_SAMPLE_SIDE)
+    scores["mean"] = round(float(gray.mean()), 2)
+    if scores["mean"] < Config.TRIAGE_MIN_MEAN:
+        return Verdict(ErrorCode.IMAGE_TOO_DARK, scores)
+    paper = np.median(gray)
+    ink = np.abs(gray.astype(np.int16) - paper) > Config.TRIAGE_INK_CONTRAST
+    scores["ink"] = round(np.count_nonzero(ink) / gray.size, 5)
+    if scores["ink"] < Config.TRIAGE_MIN_INK:
+        return Verdict(ErrorCode.IMAGE_BLANK, scores)
+
+    content = _content(gray, ink)
+    scores["sharpness"] = round(float(cv2.Laplacian(content, cv2.CV_32F).var()), 2)
+    if scores["sharpness"] < Config.TRIAGE_MIN_SHARPNESS:
+        return Verdict(ErrorCode.IMAGE_TOO_BLURRY, scores)
+
+    scores["edge_density"] = round(np.count_nonzero(cv2.Canny(content, 50, 150)) / content.size, 5)
+    if scores["edge_density"] < Config.TRIAGE_MIN_EDGE_DENSITY:
+        return Verdict(ErrorCode.IMAGE_NO_TEXT, scores)
+    return Verdict(None, scores)
+
+
+def triage(image) -> Verdict:
+    """
+    Run `assess` unless TRIAGE_MODE is off, and count the decision in triage_decisions_total.
+    """
+    if Config.TRIAGE_MODE == TriageMode.OFF:
+        return PASSED
+    with track_stage("triage"):
+        verdict = assess(image)
+    if verdict.passed:
+        TRIAGE_DECISIONS.labels("pass", "").inc()
+    else:
+        decision = "reject" if verdict.rejected else "flag"
+        TRIAGE_DECISIONS.labels(decision, verdict.reason.code).inc()
+        log.info("triage {}: {} {}", decision, verdict.reason.code, verdict.scores)
+    return verdict
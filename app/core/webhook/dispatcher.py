@@ -0,0 +1,230 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Set
+from urllib.parse import urlsplit
+
+from sqlalchemy import select, update
+
+from app.config.config import Config
+from app.core.database import get_async_session
+from app.core.database.models import WebhookDelivery
+from app.core.enums.webhook_enum import DeliveryStatus
+from app.core.fetch.destination import DestinationNotAllowed, pinned_transport
+from app.core.metrics.metrics import QUEUE_DEPTH, WEBHOOK_DELIVERIES
+from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.core.schema.orjson_response import dumps
+from app.core.webhook.signing import signed_headers
+from app.helpers.limits import KeyedSemaphore
+from app.utils.logger import Log
+
+log = Log("Webhook Dispatcher")
+
+# Client errors that a retry can fix; any other 4xx fails the delivery at once.
+RETRYABLE_CLIENT_ERRORS = {408, 409, 425, 429}
+
+# Callback body of a job whose worker died before it finished.
+INTERRUPTED = dumps(BaseResponse.failed(Error(ErrorCode.JOB_INTERRUPTED))).decode()
+
+
+class Claimed(NamedTuple):
+    id: str
+    url: str
+    event: str
+    payload: str
+    attempts: int
+
+
+def backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds before retry `attempt` (1-based): exponential, capped, jittered
+    down to half so a receiver coming back is not hit by every retry at once.
+    A numeric Retry-After from the receiver is honoured when longer.
+    """
+    delay = min(Config.WEBHOOK_BACKOFF_BASE * 2 ** (attempt - 1), Config.WEBHOOK_BACKOFF_MAX)
+    delay *= random.uniform(0.5, 1.0)
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(float(retry_after), Config.WEBHOOK_BACKOFF_MAX))
+    return delay
+
+
+class WebhookDispatcher(object):
+    """
+    Delivers the webhook outbox from every API worker.
+
+    Due rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased by
+    pushing next_attempt_at past the request timeout, so workers never send
+    the same row concurrently and a worker that dies mid-delivery only delays
+    it by the lease. Accepted jobs still RUNNING past WEBHOOK_JOB_TIMEOUT are
+    claimed the same way and called back as JOB_INTERRUPTED. Deliveries share one pooled httpx client; at most
+    WEBHOOK_CONCURRENCY are in flight per worker and WEBHOOK_HOST_CONCURRENCY
+    per receiving host.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._hosts = KeyedSemaphore(Config.WEBHOOK_HOST_CONCURRENCY)
+
+    def start(self):
+        import httpx
+
+        if self._task is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=Config.WEBHOOK_TIMEOUT,
+            follow_redirects=False,
+            # Connects only to addresses WEBHOOK_ALLOWED_HOSTS allows, checked at connect time.
+            transport=pinned_transport(
+                lambda: Config.WEBHOOK_ALLOWED_HOSTS,
+                limits=httpx.Limits(
+                    max_connections=Config.WEBHOOK_CONCURRENCY,
+                    max_keepalive_connections=Config.WEBHOOK_CONCURRENCY,
+                ),
+            ),
+        )
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop claiming and wait for in-flight deliveries; unsent rows stay in the outbox.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        if self._in_flight:
+            await asyncio.wait(self._in_flight, timeout=Config.WEBHOOK_TIMEOUT)
+        await self._client.aclose()
+        self._task = self._client = None
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            free = Config.WEBHOOK_CONCURRENCY - len(self._in_flight)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                except Exception as e:
+                    log.error("outbox claim failed: {}", e)
+            for delivery in claimed:
+                task = asyncio.create_task(self._deliver(delivery))
+                self._in_flight.add(task)
+                task.add_done_callback(self._done)
+            QUEUE_DEPTH.labels("webhook").set(len(self._in_flight))
+            if not claimed or len(claimed) == free:
+                # Idle, or saturated until a delivery finishes (which wakes us).
+                try:
+                    await asyncio.wait_for(self._wake.wait(), Config.WEBHOOK_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        QUEUE_DEPTH.labels("webhook").set(len(self._in_flight))
+        self.wake()
+
+    async def _claim(self, limit: int):
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=Config.WEBHOOK_TIMEOUT * 2 + 5)
+        session = get_async_session().session_factory()
+        try:
+            rows = (
+                await session.execute(
+                    select(WebhookDelivery)
+                    .where(
+                        WebhookDelivery.status.in_([DeliveryStatus.PENDING.value, DeliveryStatus.RUNNING.value]),
+                        WebhookDelivery.next_attempt_at <= now,
+                    )
+                    .order_by(WebhookDelivery.next_attempt_at)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalars()
+            claimed = []
+            for row in rows:
+                if row.status == DeliveryStatus.RUNNING.value:
+                    # Accepted but past WEBHOOK_JOB_TIMEOUT: its worker died mid-job.
+                    log.warning("job {} never finished; calling back {}.", row.id, ErrorCode.JOB_INTERRUPTED.name)
+                    row.status = DeliveryStatus.PENDING.value
+                    row.payload = INTERRUPTED
+                claimed.append(Claimed(row.id, row.url, row.event, row.payload, row.attempts))
+                row.next_attempt_at = lease
+            await session.commit()
+            return claimed
+        finally:
+            await session.close()
+
+    async def _deliver(self, delivery: Claimed):
+        import httpx
+
+        body = delivery.payload.encode()
+        status_code, error, retry_after, refused = None, "", None, False
+        async with self._hosts(urlsplit(delivery.url).netloc):
+            try:
+                response = await self._client.post(
+                    delivery.url, content=body, headers=signed_headers(delivery.id, delivery.event, body)
+                )
+                status_code, retry_after = response.status_code, response.headers.get("Retry-After")
+            except DestinationNotAllowed as e:
+                # The name may resolve elsewhere since the job was accepted.
+                error, refused = str(e), True
+            except (httpx.HTTPError, OSError) as e:
+                error = f"{type(e).__name__}: {e}"
+        try:
+            await self._record(delivery, status_code, error, retry_after, permanent=refused)
+        except Exception as e:
+            # The lease expires and the row is retried; receivers dedupe on X-Webhook-Id.
+            log.error("delivery {} result not saved: {}", delivery.id, e)
+
+    async def _record(
+        self,
+        delivery: Claimed,
+        status_code: Optional[int],
+        error: str,
+        retry_after: Optional[str],
+        permanent: bool = False,
+    ):
+        attempts = delivery.attempts + 1
+        values = {"attempts": attempts, "last_status_code": status_code, "last_error": error[:512]}
+        if status_code is not None and 200 <= status_code < 300:
+            outcome = "delivered"
+            values["status"] = DeliveryStatus.DELIVERED.value
+        elif (
+            permanent
+            or (status_code is not None and 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS)
+            or attempts >= Config.WEBHOOK_MAX_ATTEMPTS
+        ):
+            outcome = "failed"
+            values["status"] = DeliveryStatus.FAILED.value
+            log.warning(
+                "delivery {} to {} failed after {} attempts: {} {}",
+                delivery.id,
+                delivery.url,
+                attempts,
+                status_code,
+                error,
+            )
+        else:
+            outcome = "retry"
+            values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=backoff(attempts, retry_after))
+        WEBHOOK_DELIVERIES.labels(delivery.event, outcome).inc()
+
+        session = get_async_session().session_factory()
+        try:
+            await session.execute(update(WebhookDelivery).where(WebhookDelivery.id == delivery.id).values(**values))
+            await session.commit()
+        finally:
+            await session.close()
+
+
+DISPATCHER = WebhookDispatcher()
@@ -0,0 +1,50 @@
+import hashlib
+import hmac
+import time
+from typing import Dict
+
+from app.config.config import Config
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+
+
+def webhook_secret() -> str:
+    return Config.WEBHOOK_SECRET or Config.JWT_SECRET_KEY
+
+
+def webhooks_available() -> bool:
+    return Config.WEBHOOK_ON and bool(webhook_secret())
+
+
+def sign(body: bytes, timestamp: int, secret: str) -> str:
+    """
+    `sha256=<hex>` HMAC of "<timestamp>.<body>"; the timestamp lets receivers reject replays.
+    """
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify(body: bytes, timestamp: str, signature: str, secret: str, tolerance: float = 300.0) -> bool:
+    """
+    Receiver side of `sign`, for clients and the local stand-in.
+    """
+    try:
+        sent_at = int(timestamp)
+    except (TypeError, ValueError):
+        return False
+    if abs(time.time() - sent_at) > tolerance:
+        return False
+    return hmac.compare_digest(sign(body, sent_at, secret), signature or "")
+
+
+def signed_headers(delivery_id: str, event: str, body: bytes) -> Dict[str, str]:
+    timestamp = int(time.time())
+    return {
+        "Content-Type": "application/json",
+        "User-Agent": f"azure-vision-webhook/{Config.VERSION}",
+        "X-Webhook-Id": delivery_id,
+        "X-Webhook-Event": event,
+        TIMESTAMP_HEADER: str(timestamp),
+        SIGNATURE_HEADER: sign(body, timestamp, webhook_secret()),
+    }
@@ -0,0 +1,130 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Union
+from urllib.parse import urlsplit
+
+from sqlalchemy import update
+from starlette.background import BackgroundTasks
+from starlette.responses import Response
+
+from app.config.config import Config
+from app.core.database import get_async_session
+from app.core.database.models import WebhookDelivery
+from app.core.enums.webhook_enum import DeliveryStatus, WebhookEvent
+from app.core.fetch.destination import destination_allowed
+from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.core.schema.orjson_response import ORJSONResponse, dumps
+from app.core.webhook.dispatcher import DISPATCHER
+from app.core.webhook.signing import webhooks_available
+from app.utils.logger import Log
+
+log = Log("Webhook")
+
+
+async def open_job(url: str, event: WebhookEvent) -> str:
+    """
+    Write the outbox row of an accepted job before it runs. Until the job
+    completes the row is RUNNING with a WEBHOOK_JOB_TIMEOUT deadline, after
+    which the dispatcher calls back JOB_INTERRUPTED for it, so a job lost to
+    a worker restart still fails visibly.
+    """
+    delivery_id = uuid.uuid4().hex
+    session = get_async_session().session_factory()
+    try:
+        session.add(
+            WebhookDelivery(
+                id=delivery_id,
+                url=url,
+                event=event.value,
+                payload="",
+                status=DeliveryStatus.RUNNING.value,
+                attempts=0,
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=Config.WEBHOOK_JOB_TIMEOUT),
+            )
+        )
+        await session.commit()
+    finally:
+        await session.close()
+    return delivery_id
+
+
+async def enqueue_webhook(delivery_id: str, body: bytes) -> bool:
+    """
+    Queue the callback of a running job and wake this worker's dispatcher.
+    False when the job is no longer running, i.e. it was already called back as interrupted.
+    """
+    session = get_async_session().session_factory()
+    try:
+        result = await session.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id == delivery_id, WebhookDelivery.status == DeliveryStatus.RUNNING.value)
+            .values(payload=body.decode(), status=DeliveryStatus.PENDING.value, next_attempt_at=datetime.utcnow())
+        )
+        await session.commit()
+    finally:
+        await session.close()
+    DISPATCHER.wake()
+    return result.rowcount > 0
+
+
+def response_body(response: Union[Response, dict]) -> bytes:
+    # Routes return ORJSONResponse on success and the BaseResponse.failed dict on errors.
+    if isinstance(response, Response):
+        return bytes(response.body)
+    return dumps(response)
+
+
+async def run_job(
+    delivery_id: str,
+    handler: Callable[[BackgroundTasks], Awaitable[Union[Response, dict]]],
+):
+    """
+    Run a route body after its 202 answer and deliver what it would have
+    answered synchronously to the callback URL of `delivery_id`.
+
+    `handler` gets its own BackgroundTasks, run once the callback is queued.
+    """
+    tasks = BackgroundTasks()
+    try:
+        response = await handler(tasks)
+    except Exception:
+        log.exception("job {} failed.", delivery_id)
+        response = BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+    try:
+        if not await enqueue_webhook(delivery_id, response_body(response)):
+            log.warning("job {} finished after WEBHOOK_JOB_TIMEOUT; its result is dropped.", delivery_id)
+    except Exception:
+        log.exception("job {} callback could not be queued.", delivery_id)
+    await tasks()
+
+
+async def callback_allowed(url: str) -> bool:
+    try:
+        return await destination_allowed(urlsplit(url).hostname, Config.WEBHOOK_ALLOWED_HOSTS)
+    except OSError:
+        return False
+
+
+async def accept_job(
+    background_tasks: BackgroundTasks,
+    url: str,
+    event: WebhookEvent,
+    handler: Callable[[BackgroundTasks], Awaitable[Union[Response, dict]]],
+    **meta,
+):
+    """
+    Answer 202 with the delivery id at once and run `handler` after the response, see `run_job`.
+    """
+    if not webhooks_available():
+        return BaseResponse.failed(Error(ErrorCode.WEBHOOK_UNAVAILABLE))
+    if not await callback_allowed(url):
+        return BaseResponse.failed(Error(ErrorCode.WEBHOOK_URL_NOT_ALLOWED))
+    try:
+        delivery_id = await open_job(url, event)
+    except Exception:
+        log.exception("job could not be accepted.")
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+    background_tasks.add_task(run_job, delivery_id, handler)
+    body = dict(code=202, msg="Accepted", data=None, meta=dict(meta, delivery_id=delivery_id))
+    return ORJSONResponse(body, status_code=202)
@@ -0,0 +1,44 @@
+"""
+Alembic environment: migrates the database configured by the MYSQL_* settings.
+
+Schema changes are applied by this one-off step, never at API startup, so
+workers boot without DDL and do not race each other.
+"""
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import models  # noqa: F401  # register tables on Base.metadata
+from app.core.database import MYSQL_URL, Base, get_engine
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    # `alembic upgrade head --sql` renders the DDL without a connection.
+    context.configure(url=MYSQL_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    engine = get_engine()
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,96 @@
+"""initial schema
+
+Receipts with their items and rollups, stored OCR text and the webhook outbox.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 12:00:00
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "receipts",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("merchant_name", sa.String(255), nullable=False),
+        sa.Column("transaction_date", sa.Date(), nullable=True),
+        sa.Column("transaction_time", sa.String(32), nullable=False),
+        sa.Column("phone_number", sa.String(64), nullable=False),
+        sa.Column("subtotal", sa.Numeric(14, 2), nullable=False),
+        sa.Column("tax", sa.Numeric(14, 2), nullable=False),
+        sa.Column("tip", sa.Numeric(14, 2), nullable=False),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_receipts_transaction_date", "receipts", ["transaction_date"])
+
+    op.create_table(
+        "receipt_items",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("receipt_id", sa.String(64), sa.ForeignKey("receipts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("description", sa.String(255), nullable=False),
+        sa.Column("quantity", sa.Numeric(14, 3), nullable=True),
+        sa.Column("price", sa.Numeric(14, 2), nullable=True),
+        sa.Column("total_price", sa.Numeric(14, 2), nullable=True),
+    )
+    op.create_index("ix_receipt_items_receipt_id", "receipt_items", ["receipt_id"])
+
+    op.create_table(
+        "receipt_rollups",
+        sa.Column("merchant_name", sa.String(255), primary_key=True),
+        sa.Column("period", sa.String(8), primary_key=True),
+        sa.Column("period_start", sa.Date(), primary_key=True),
+        sa.Column("total", sa.Numeric(16, 2), nullable=False),
+        sa.Column("tax", sa.Numeric(16, 2), nullable=False),
+        sa.Column("receipt_count", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "ocr_documents",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("source", sa.String(2048), nullable=False),
+        sa.Column("content", MEDIUMTEXT(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ft_ocr_documents_content",
+        "ocr_documents",
+        ["content"],
+        mysql_prefix="FULLTEXT",
+        mysql_with_parser="ngram",
+    )
+
+    op.create_table(
+        "webhook_deliveries",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("url", sa.String(2048), nullable=False),
+        sa.Column("event", sa.String(64), nullable=False),
+        sa.Column("payload", MEDIUMTEXT(), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_status_code", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.String(512), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_webhook_deliveries_due", "webhook_deliveries", ["status", "next_attempt_at"])
+
+
+def downgrade():
+    op.drop_table("webhook_deliveries")
+    op.drop_table("ocr_documents")
+    op.drop_table("receipt_rollups")
+    op.drop_table("receipt_items")
+    op.drop_table("receipts")
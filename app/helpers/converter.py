@@ -1,7 +1,36 @@
-import cv2
+# cv2 and numpy take ~100 ms to import, so they are loaded on first use.
 
 
 def convert_image_to_bytes(image) -> bytes:
+    import cv2
+
     retval, buffer = cv2.imencode(".jpg", image)
     img_bytes = buffer.tobytes()
     return img_bytes
+
+
+def decode_image(raw: bytes):
+    import cv2
+    import numpy as np
+
+    return cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def to_gray(image, max_side: int = 0):
+    """
+    8-bit single-channel copy of a decoded image, shrunk by a whole factor
+    so its longer side is at most `max_side` when given (whole factors take
+    the fast path of INTER_AREA).
+    """
+    import cv2
+    import numpy as np
+
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    if image.dtype == np.uint16:
+        image = (image >> 8).astype(np.uint8)
+    factor = -(-max(image.shape) // max_side) if max_side else 1
+    if factor > 1:
+        size = (max(1, image.shape[1] // factor), max(1, image.shape[0] // factor))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return image
@@ -36,9 +36,7 @@ class JsonEncoder(json.JSONEncoder):
 def generate_encoders_by_class_tuples(
     type_encoder_map: Dict[Any, Callable[[Any], Any]]
 ) -> Dict[Callable[[Any], Any], Tuple[Any, ...]]:
-    encoders_by_class_tuples: Dict[
-        Callable[[Any], Any], Tuple[Any, ...]
-    ] = defaultdict(tuple)
+    encoders_by_class_tuples: Dict[Callable[[Any], Any], Tuple[Any, ...]] = defaultdict(tuple)
     # Add the type_encoder_map to the map of encoders_by_class_tuples.
     for type_, encoder in type_encoder_map.items():
         encoders_by_class_tuples[encoder] += (type_,)
@@ -48,6 +46,112 @@ def generate_encoders_by_class_tuples(
 encoders_by_class_tuples = generate_encoders_by_class_tuples(ENCODERS_BY_TYPE)
 
 
+# Node kinds, resolved once per concrete type in the same order as the
+# isinstance chain of the original recursive implementation.
+_PRIMITIVE = 0
+_DICT = 1
+_SEQUENCE = 2
+_MODEL = 3
+_DATACLASS = 4
+_ENUM = 5
+_PATH = 6
+_ENCODER = 7
+_FALLBACK = 8
+
+_SEQUENCE_TYPES = (list, set, frozenset, GeneratorType, tuple)
+
+# Types that are emitted as-is without any lookup.
+_INLINE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+_dispatch_cache: Dict[type, Tuple[int, Optional[Callable[[Any], Any]]]] = {}
+
+_FINALIZE = object()
+_MISSING = object()
+
+
+def _resolve_kind(cls: type) -> Tuple[int, Optional[Callable[[Any], Any]]]:
+    if issubclass(cls, BaseModel):
+        return _MODEL, None
+    if dataclasses.is_dataclass(cls):
+        return _DATACLASS, None
+    if issubclass(cls, Enum):
+        return _ENUM, None
+    if issubclass(cls, PurePath):
+        return _PATH, None
+    if issubclass(cls, (str, int, float, type(None))):
+        return _PRIMITIVE, None
+    if issubclass(cls, dict):
+        return _DICT, None
+    if issubclass(cls, _SEQUENCE_TYPES):
+        return _SEQUENCE, None
+    if cls in ENCODERS_BY_TYPE:
+        return _ENCODER, ENCODERS_BY_TYPE[cls]
+    for encoder, classes_tuple in encoders_by_class_tuples.items():
+        if issubclass(cls, classes_tuple):
+            return _ENCODER, encoder
+    return _FALLBACK, None
+
+
+def _dispatch(cls: type) -> Tuple[int, Optional[Callable[[Any], Any]]]:
+    # Returns the cached kind for cls, resolving it on first sight.
+    entry = _dispatch_cache.get(cls)
+    if entry is None:
+        entry = _dispatch_cache[cls] = _resolve_kind(cls)
+    return entry
+
+
+def clear_dispatch_cache() -> None:
+    """
+    Forget resolved types, needed only after ENCODERS_BY_TYPE is changed at runtime.
+    """
+    _dispatch_cache.clear()
+
+
+def _custom_encoder_for(cls: type, custom_encoder: Dict[Any, Callable[[Any], Any]]) -> Optional[Callable[[Any], Any]]:
+    # Exact type first, then the first matching base class in dict order.
+    if cls in custom_encoder:
+        return custom_encoder[cls]
+    for encoder_type, encoder_instance in custom_encoder.items():
+        if issubclass(cls, encoder_type):
+            return encoder_instance
+    return None
+
+
+def _encode_model(
+    obj: BaseModel,
+    include,
+    exclude,
+    by_alias: bool,
+    exclude_unset: bool,
+    exclude_defaults: bool,
+    exclude_none: bool,
+    custom_encoder: Dict[Any, Callable[[Any], Any]],
+    sqlalchemy_safe: bool,
+) -> Any:
+    # Model encoders apply below the model, merged without mutating its config.
+    encoder = getattr(obj.__config__, "json_encoders", {})
+    if custom_encoder:
+        encoder = {**encoder, **custom_encoder}
+    obj_dict = obj.dict(
+        include=include,  # type: ignore # in Pydantic
+        exclude=exclude,  # type: ignore # in Pydantic
+        by_alias=by_alias,
+        exclude_unset=exclude_unset,
+        exclude_none=exclude_none,
+        exclude_defaults=exclude_defaults,
+    )
+    # Return the root of the object dictionary.
+    if "__root__" in obj_dict:
+        obj_dict = obj_dict["__root__"]
+    return jsonable_encoder(
+        obj_dict,
+        exclude_none=exclude_none,
+        exclude_defaults=exclude_defaults,
+        custom_encoder=encoder,
+        sqlalchemy_safe=sqlalchemy_safe,
+    )
+
+
 def jsonable_encoder(
     obj: Any,
     include: Optional[Union[SetIntStr, DictIntStrAny, TupleIntStr]] = None,
@@ -59,144 +163,144 @@ def jsonable_encoder(
     custom_encoder: Optional[Dict[Any, Callable[[Any], Any]]] = None,
     sqlalchemy_safe: bool = True,
 ) -> Any:
+    """
+    Convert obj into a structure of JSON-compatible builtins.
+
+    The tree is walked iteratively with an explicit stack, so deep payloads do
+    not hit the recursion limit, and each node type is resolved through a
+    per-type dispatch table instead of an isinstance chain. Plain str/int/float/
+    bool/None children are copied inline without being pushed on the stack.
+
+    Only `include` and `exclude_defaults` change while descending (dict values
+    drop both, as the recursive version did), every other option is fixed for
+    the whole walk.
+    """
     custom_encoder = custom_encoder or {}
-    # Returns the encoder instance for the given object.
-    if custom_encoder:
-        # Returns the encoder for the given object.
-        if type(obj) in custom_encoder:
-            return custom_encoder[type(obj)](obj)
-        else:
-            # Returns the encoder instance for the given encoder type.
-            for encoder_type, encoder_instance in custom_encoder.items():
-                # Return the encoder instance of obj.
-                if isinstance(obj, encoder_type):
-                    return encoder_instance(obj)
     # Set of include values to include.
     if include is not None and not isinstance(include, (set, dict)):
         include = set(include)
     # Set exclude to exclude if exclude is not None.
     if exclude is not None and not isinstance(exclude, (set, dict)):
         exclude = set(exclude)
-    # Returns a jsonable encoder for the given model.
-    if isinstance(obj, BaseModel):
-        encoder = getattr(obj.__config__, "json_encoders", {})
-        # Update the encoder if any.
+
+    custom_cache: Dict[type, Any] = {}
+    # Builtins a custom encoder applies to must take the slow path.
+    inline_types = frozenset(
+        t for t in _INLINE_TYPES if not custom_encoder or not _custom_encoder_for(t, custom_encoder)
+    )
+    inline_keys = str in inline_types
+    filter_keys = bool(exclude) or exclude_none
+
+    root: List[Any] = [None]
+    # Entries: (value, target, slot, include, exclude_defaults) or
+    # (_FINALIZE, target, slot, keys, values) to assemble a dict after its values.
+    stack: List[Tuple[Any, Any, Any, Any, Any]] = [(obj, root, 0, include, exclude_defaults)]
+    pop = stack.pop
+    push = stack.append
+
+    while stack:
+        value, target, slot, node_include, node_exclude_defaults = pop()
+
+        if value is _FINALIZE:
+            target[slot] = dict(zip(node_include, node_exclude_defaults))
+            continue
+
+        cls = type(value)
         if custom_encoder:
-            encoder.update(custom_encoder)
-        obj_dict = obj.dict(
-            include=include,  # type: ignore # in Pydantic
-            exclude=exclude,  # type: ignore # in Pydantic
-            by_alias=by_alias,
-            exclude_unset=exclude_unset,
-            exclude_none=exclude_none,
-            exclude_defaults=exclude_defaults,
-        )
-        # Return the root of the object dictionary.
-        if "__root__" in obj_dict:
-            obj_dict = obj_dict["__root__"]
-        return jsonable_encoder(
-            obj_dict,
-            exclude_none=exclude_none,
-            exclude_defaults=exclude_defaults,
-            custom_encoder=encoder,
-            sqlalchemy_safe=sqlalchemy_safe,
-        )
-    # Returns a dictionary of data classes.
-    if dataclasses.is_dataclass(obj):
-        return dataclasses.asdict(obj)
-    # Return the value of the enum.
-    if isinstance(obj, Enum):
-        return obj.value
-    # Returns the string representation of the object.
-    if isinstance(obj, PurePath):
-        return str(obj)
-    # Return the object if it is a string int float or None.
-    if isinstance(obj, (str, int, float, type(None))):
-        return obj
-    # Returns a JSON encoded dictionary.
-    if isinstance(obj, dict):
-        encoded_dict = {}
-        # Encode the keys and values in the dictionary.
-        for key, value in obj.items():
-            if (
-                (
-                    not sqlalchemy_safe
-                    or (not isinstance(key, str))
-                    or (not key.startswith("_sa"))
-                )
-                and (value is not None or not exclude_none)
-                and (
-                    (include and key in include)
-                    or not exclude
-                    or key not in exclude
-                )
-            ):
-                encoded_key = jsonable_encoder(
-                    key,
-                    exclude=exclude,
-                    by_alias=by_alias,
-                    exclude_unset=exclude_unset,
-                    exclude_none=exclude_none,
-                    custom_encoder=custom_encoder,
-                    sqlalchemy_safe=sqlalchemy_safe,
-                )
-                encoded_value = jsonable_encoder(
-                    value,
-                    by_alias=by_alias,
-                    exclude=exclude,
-                    exclude_unset=exclude_unset,
-                    exclude_none=exclude_none,
-                    custom_encoder=custom_encoder,
-                    sqlalchemy_safe=sqlalchemy_safe,
-                )
-                encoded_dict[encoded_key] = encoded_value
-        return encoded_dict
-    # Returns a JSON encoded list of objects.
-    if isinstance(obj, (list, set, frozenset, GeneratorType, tuple)):
-        encoded_list = []
-        # Encode the JSON encoded list of items in the object.
-        for item in obj:
-            encoded_list.append(
-                jsonable_encoder(
-                    item,
-                    include=include,
-                    exclude=exclude,
-                    by_alias=by_alias,
-                    exclude_unset=exclude_unset,
-                    exclude_defaults=exclude_defaults,
-                    exclude_none=exclude_none,
-                    custom_encoder=custom_encoder,
-                    sqlalchemy_safe=sqlalchemy_safe,
-                )
+            encoder = custom_cache.get(cls, _MISSING)
+            if encoder is _MISSING:
+                encoder = custom_cache[cls] = _custom_encoder_for(cls, custom_encoder)
+            if encoder is not None:
+                target[slot] = encoder(value)
+                continue
+
+        kind, encoder = _dispatch(cls)
+
+        if kind == _PRIMITIVE:
+            target[slot] = value
+
+        elif kind == _DICT:
+            keys: List[Any] = []
+            values: List[Any] = []
+            pending = []
+            for key, item in value.items():
+                if sqlalchemy_safe and isinstance(key, str) and key.startswith("_sa"):
+                    continue
+                if filter_keys:
+                    if item is None and exclude_none:
+                        continue
+                    if not ((node_include and key in node_include) or not exclude or key not in exclude):
+                        continue
+                if inline_keys and type(key) is str:
+                    keys.append(key)
+                else:
+                    keys.append(
+                        jsonable_encoder(
+                            key,
+                            exclude=exclude,
+                            by_alias=by_alias,
+                            exclude_unset=exclude_unset,
+                            exclude_none=exclude_none,
+                            custom_encoder=custom_encoder,
+                            sqlalchemy_safe=sqlalchemy_safe,
+                        )
+                    )
+                if type(item) in inline_types:
+                    values.append(item)
+                else:
+                    pending.append((item, values, len(values), None, False))
+                    values.append(None)
+            push((_FINALIZE, target, slot, keys, values))
+            pending.reverse()
+            stack.extend(pending)
+
+        elif kind == _SEQUENCE:
+            items = value if cls is list or cls is tuple else list(value)
+            encoded_list = [None] * len(items)
+            target[slot] = encoded_list
+            for index in range(len(items) - 1, -1, -1):
+                item = items[index]
+                if type(item) in inline_types:
+                    encoded_list[index] = item
+                else:
+                    push((item, encoded_list, index, node_include, node_exclude_defaults))
+
+        elif kind == _ENUM:
+            target[slot] = value.value
+
+        elif kind == _ENCODER:
+            target[slot] = encoder(value)  # type: ignore
+
+        elif kind == _DATACLASS:
+            target[slot] = dataclasses.asdict(value)
+
+        elif kind == _PATH:
+            target[slot] = str(value)
+
+        elif kind == _MODEL:
+            target[slot] = _encode_model(
+                value,
+                node_include,
+                exclude,
+                by_alias,
+                exclude_unset,
+                node_exclude_defaults,
+                exclude_none,
+                custom_encoder,
+                sqlalchemy_safe,
             )
-        return encoded_list
 
-    # Returns the encoding of the given object.
-    if type(obj) in ENCODERS_BY_TYPE:
-        return ENCODERS_BY_TYPE[type(obj)](obj)
-    # Returns the encoder for the given object.
-    for encoder, classes_tuple in encoders_by_class_tuples.items():
-        # Return the encoder for obj.
-        if isinstance(obj, classes_tuple):
-            return encoder(obj)
-
-    errors: List[Exception] = []
-    try:
-        data = dict(obj)
-    except Exception as e:
-        errors.append(e)
-        try:
-            data = vars(obj)
-        except Exception as e:
-            errors.append(e)
-            raise ValueError(errors)
-    return jsonable_encoder(
-        data,
-        by_alias=by_alias,
-        exclude=exclude,
-        exclude_unset=exclude_unset,
-        exclude_defaults=exclude_defaults,
-        exclude_none=exclude_none,
-        custom_encoder=custom_encoder,
-        sqlalchemy_safe=sqlalchemy_safe,
-    )
+        else:
+            errors: List[Exception] = []
+            try:
+                data = dict(value)
+            except Exception as e:
+                errors.append(e)
+                try:
+                    data = vars(value)
+                except Exception as e:
+                    errors.append(e)
+                    raise ValueError(errors)
+            push((data, target, slot, None, node_exclude_defaults))
+
+    return root[0]
@@ -1,10 +1,18 @@
+import hashlib
 import os
 import shutil
+import time
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import Dict, List
 
 from fastapi import UploadFile
 
+from app.core.metrics.metrics import TEMP_FILES
+
+# Upload temp files of this worker not yet removed, with their creation time.
+_temp_files: Dict[str, float] = {}
+
 
 def save_upload_file(upload_file: UploadFile, destination: Path) -> None:
     try:
@@ -18,17 +26,65 @@ def save_upload_file_tmp(upload_file: UploadFile) -> Path:
     try:
         suffix = Path(upload_file.filename).suffix
         with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            shutil.copyfileobj(upload_file.file, tmp)
             tmp_path = Path(tmp.name)
+            _temp_files[tmp.name] = time.time()
+            TEMP_FILES.labels().set(len(_temp_files))
+            try:
+                shutil.copyfileobj(upload_file.file, tmp)
+            except Exception:
+                remove_file_tmp(tmp_path)
+                raise
     finally:
         upload_file.file.close()
     return tmp_path
 
 
+def save_bytes_tmp(raw: bytes, suffix: str = "") -> Path:
+    with NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp_path = Path(tmp.name)
+        _temp_files[tmp.name] = time.time()
+        TEMP_FILES.labels().set(len(_temp_files))
+        try:
+            tmp.write(raw)
+        except Exception:
+            remove_file_tmp(tmp_path)
+            raise
+    return tmp_path
+
+
 def handle_upload_file(upload_file: UploadFile) -> Path:
     tmp_path = save_upload_file_tmp(upload_file)
     return tmp_path
 
 
 def remove_file_tmp(tmp_path: Path):
-    os.remove(os.path.join(tmp_path))
+    try:
+        os.remove(os.path.join(tmp_path))
+    except FileNotFoundError:
+        pass
+    finally:
+        _temp_files.pop(str(tmp_path), None)
+        TEMP_FILES.labels().set(len(_temp_files))
+
+
+def live_temp_files() -> List[dict]:
+    """
+    Upload temp files of this worker still on disk, oldest first.
+    """
+    now = time.time()
+    files = []
+    for path, created_at in sorted(_temp_files.items(), key=lambda item: item[1]):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        files.append({"path": path, "bytes": size, "age_s": round(now - created_at, 1)})
+    return files
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
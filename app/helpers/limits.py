@@ -0,0 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+
+class KeyedSemaphore(object):
+    """
+    One semaphore of `value` per key, e.g. per host of client-supplied URLs.
+
+    A key's semaphore only exists while somebody holds or waits for it, so
+    arbitrary keys do not grow the map.
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+        # key -> [semaphore, holders and waiters]
+        self._entries: Dict[str, List] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def __call__(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [asyncio.Semaphore(self.value), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
@@ -0,0 +1,39 @@
+import math
+import os
+from pathlib import Path
+
+
+def _cgroup_cpu_limit():
+    # cgroup v2: "max 100000" or "<quota> <period>"
+    cpu_max = Path("/sys/fs/cgroup/cpu.max")
+    if cpu_max.exists():
+        quota, _, period = cpu_max.read_text().strip().partition(" ")
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    # cgroup v1: quota of -1 means unlimited
+    quota_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota_file.exists() and period_file.exists():
+        quota = int(quota_file.read_text())
+        if quota > 0:
+            return quota / int(period_file.read_text())
+    return None
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may actually use: the container's CFS quota when one is
+    set, otherwise the scheduler affinity mask, never less than 1.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        limit = _cgroup_cpu_limit()
+    except (OSError, ValueError):
+        limit = None
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
@@ -12,6 +12,7 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.errors import ServerErrorMiddleware
 
 from app.config.config import Config
+from app.core.compression.middleware import CompressionMiddleware
 from app.core.exceptions import (
     DataConflictException,
     ForbiddenException,
@@ -20,6 +21,11 @@ from app.core.exceptions import (
     ServiceUnavailableException,
     UnauthorizedException,
 )
+from app.core.metrics.middleware import MetricsMiddleware
+from app.core.profiling.middleware import ProfilingMiddleware
+from app.core.tracing.middleware import TracingMiddleware
+from app.utils.json_sink import JsonSink
+from app.utils.logger import Log
 
 if os.getenv("APP_ENV") == "production":
     azureVision = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
@@ -28,16 +34,16 @@ else:
 
 INFO_FORMAT = (
     "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> "
-    "| <level>{level: <8}</level> | <cyan>File: {extra[filename]}</cyan> "
-    "| Module: <cyan>{extra[business]}</cyan> | Function: <cyan>{extra[func]}</cyan> "
-    "| Line: <cyan>{extra[line]}</cyan> | - <level>{message}</level>"
+    "| <level>{level: <8}</level> | <cyan>File: {file.path}</cyan> "
+    "| Module: <cyan>{extra[business]}</cyan> | Function: <cyan>{function}</cyan> "
+    "| Line: <cyan>{line}</cyan> | Request: <cyan>{extra[request_id]}</cyan> | - <level>{message}</level>"
 )
 
 ERROR_FORMAT = (
     "<red>{time:YYYY-MM-DD HH:mm:ss.SSS}</red> "
-    "| <level>{level: <8}</level> | <cyan>File: {extra[filename]}</cyan> "
-    "| Module: <cyan>{extra[business]}</cyan> | Function: <cyan>{extra[func]}</cyan> "
-    "| Line: <cyan>{extra[line]}</cyan> | - <level>{message}</level>"
+    "| <level>{level: <8}</level> | <cyan>File: {file.path}</cyan> "
+    "| Module: <cyan>{extra[business]}</cyan> | Function: <cyan>{function}</cyan> "
+    "| Line: <cyan>{line}</cyan> | Request: <cyan>{extra[request_id]}</cyan> | - <level>{message}</level>"
 )
 
 
@@ -55,9 +61,7 @@ async def unexpected_exception_error(request: Request, exc: ForbiddenException):
 
 
 @azureVision.exception_handler(UnauthorizedException)
-async def unauthorized_error_handler(
-    request: Request, exc: UnauthorizedException
-):
+async def unauthorized_error_handler(request: Request, exc: UnauthorizedException):
     meta = {
         "code": exc.error_code,
         "msg": exc.message,
@@ -70,9 +74,7 @@ async def unauthorized_error_handler(
 
 
 @azureVision.exception_handler(DataConflictException)
-async def data_conflict_error_handler(
-    request: Request, exc: DataConflictException
-):
+async def data_conflict_error_handler(request: Request, exc: DataConflictException):
     meta = {
         "code": exc.error_code,
         "msg": exc.message,
@@ -97,9 +99,7 @@ async def not_supported_error_handler(request: Request, exc: NotFoundException):
 
 
 @azureVision.exception_handler(ServiceUnavailableException)
-async def service_unavailable_error_handler(
-    request: Request, exc: ServiceUnavailableException
-):
+async def service_unavailable_error_handler(request: Request, exc: ServiceUnavailableException):
     meta = {
         "code": exc.error_code,
         "msg": exc.message,
@@ -136,6 +136,21 @@ azureVision.add_middleware(
     allow_headers=["*"],
 )
 
+# ADD COMPRESSION
+if Config.COMPRESSION_ON:
+    azureVision.add_middleware(CompressionMiddleware)
+
+# ADD METRICS
+azureVision.add_middleware(MetricsMiddleware)
+
+# ADD PROFILING
+if Config.ADMIN_TOKEN:
+    azureVision.add_middleware(ProfilingMiddleware)
+
+# ADD TRACING
+if Config.TRACING_ON:
+    azureVision.add_middleware(TracingMiddleware)
+
 
 class InterceptHandler(logging.Handler):
     """
@@ -156,9 +171,7 @@ class InterceptHandler(logging.Handler):
             frame = frame.f_back  # type: ignore
             depth += 1
 
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level, record.getMessage()
-        )
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
 def format_record(record: dict) -> str:
@@ -166,9 +179,7 @@ def format_record(record: dict) -> str:
     # Check if the log record has a "payload" in its "extra" dictionary
     if record["extra"].get("payload") is not None:
         # Format the "payload" using pformat with specific parameters
-        record["extra"]["payload"] = pformat(
-            record["extra"]["payload"], indent=4, compact=True, width=88
-        )
+        record["extra"]["payload"] = pformat(record["extra"]["payload"], indent=4, compact=True, width=88)
         # Add the formatted payload to the format string
         format_string += "\n<level>{extra[payload]}</level>"
 
@@ -186,58 +197,48 @@ def make_filter(name):
 
 
 def init_logging():
-    loggers = (
-        logging.getLogger(name)
-        for name in logging.root.manager.loggerDict
-        if name.startswith("uvicorn.")
-    )
+    loggers = (logging.getLogger(name) for name in logging.root.manager.loggerDict if name.startswith("uvicorn."))
     for uvicorn_logger in loggers:
         uvicorn_logger.handlers = []
 
     # change handler for default uvicorn logger
     intercept_handler = InterceptHandler()
     logging.getLogger("uvicorn").handlers = [intercept_handler]
+    os.makedirs(Config.LOG_DIR, exist_ok=True)
+    Log.set_level(Config.LOG_LEVEL)
     # set logs output, level and format
     # logger.add(sys.stdout, level=logging.DEBUG, format=format_record, filter=make_filter('stdout'))
-    azure_vision_info = os.path.join(
-        Config.LOG_DIR, f"{Config.AZURE_VISION_INFO}.log"
-    )
-    azure_vision_error = os.path.join(
-        Config.LOG_DIR, f"{Config.AZURE_VISION_ERROR}.log"
-    )
-    logger.add(
-        azure_vision_info,
-        enqueue=True,
-        rotation="20 MB",
-        level="DEBUG",
-        filter=make_filter(Config.AZURE_VISION_INFO),
-    )
-    logger.add(
-        azure_vision_error,
-        enqueue=True,
-        rotation="10 MB",
-        level="WARNING",
-        filter=make_filter(Config.AZURE_VISION_ERROR),
-    )
-    logger.configure(
-        handlers=[
-            {
-                "sink": sys.stdout,
-                "level": logging.DEBUG,
-                "format": format_record,
-            },
+    azure_vision_info = os.path.join(Config.LOG_DIR, f"{Config.AZURE_VISION_INFO}.log")
+    azure_vision_error = os.path.join(Config.LOG_DIR, f"{Config.AZURE_VISION_ERROR}.log")
+    handlers = [
+        {
+            "sink": sys.stdout,
+            "level": Config.LOG_LEVEL,
+            "format": format_record,
+        },
+        {
+            "sink": azure_vision_info,
+            "rotation": "20 MB",
+            "level": logging.INFO,
+            "format": INFO_FORMAT,
+            "filter": make_filter(Config.AZURE_VISION_INFO),
+        },
+        {
+            "sink": azure_vision_error,
+            "rotation": "10 MB",
+            "level": logging.WARNING,
+            "format": ERROR_FORMAT,
+            "filter": make_filter(Config.AZURE_VISION_ERROR),
+        },
+    ]
+    if Config.LOG_JSON_ON:
+        handlers.append(
             {
-                "sink": azure_vision_info,
-                "level": logging.INFO,
-                "format": INFO_FORMAT,
-                "filter": make_filter(Config.AZURE_VISION_INFO),
-            },
-            {
-                "sink": azure_vision_error,
-                "level": logging.WARNING,
-                "format": ERROR_FORMAT,
-                "filter": make_filter(Config.AZURE_VISION_ERROR),
-            },
-        ]
-    )
+                "sink": JsonSink(Config.LOG_JSON_NAME, sampling=Config.LOG_JSON_SAMPLING),
+                "level": Config.LOG_LEVEL,
+                "format": "{message}",
+            }
+        )
+    # request_id is bound per request by TracingMiddleware; "-" outside a request
+    logger.configure(handlers=handlers, extra={"request_id": "-"})
     return logger
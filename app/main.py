@@ -1,13 +1,31 @@
 from fastapi import Request
 
 from app.config.config import BANNER, AZURE_VISION_ENV, Config
+from app.core.database import dispose_engine
+from app.core.fetch.fetcher import FETCHER
+from app.core.health.prober import PROBER
+from app.core.metrics.registry import REGISTRY
+from app.core.webhook.dispatcher import DISPATCHER
+from app.core.webhook.signing import webhooks_available
 
 # from app.core.redis.redis import get_redis
 from app.initialize import init_logging, azureVision
+from app.routers.admin import (
+    admin,
+)
+
 from app.routers.health import (
     health,
 )
 
+from app.routers.export import (
+    export,
+)
+
+from app.routers.metrics import (
+    metrics,
+)
+
 from app.routers.ocr import (
     ocr,
 )
@@ -41,6 +59,9 @@ async def request_info(request: Request):
 azureVision.include_router(health.router)
 azureVision.include_router(ocr.router)
 azureVision.include_router(receipt.router)
+azureVision.include_router(export.router)
+azureVision.include_router(metrics.router)
+azureVision.include_router(admin.router)
 
 
 @azureVision.get("/", tags=["root"])
@@ -60,9 +81,46 @@ def root():
 
 
 @azureVision.on_event("startup")
-async def init_database():
-    try:
-        logger.bind(name=None).success("Database and tables created success: ✅")
-    except Exception as e:
-        logger.bind(name=None).error(f"Database and tables  created failed: ❌\nError: {e}")
-        raise
+async def init_metrics():
+    # Runs in every worker, so each one flushes its own snapshot file.
+    REGISTRY.configure(Config.METRICS_DIR, Config.METRICS_FLUSH_INTERVAL)
+    REGISTRY.start()
+
+
+@azureVision.on_event("startup")
+async def start_webhooks():
+    if webhooks_available():
+        DISPATCHER.start()
+    elif Config.WEBHOOK_ON:
+        logger.bind(name=None).warning("Webhooks disabled: set WEBHOOK_SECRET or JWT_SECRET_KEY to sign them")
+
+
+@azureVision.on_event("startup")
+async def start_prober():
+    PROBER.start()
+
+
+@azureVision.on_event("shutdown")
+async def flush_metrics():
+    # Last snapshot of this worker; the gunicorn master folds it into the archive after exit.
+    REGISTRY.flush()
+
+
+@azureVision.on_event("shutdown")
+async def stop_prober():
+    await PROBER.stop()
+
+
+@azureVision.on_event("shutdown")
+async def close_fetcher():
+    await FETCHER.close()
+
+
+@azureVision.on_event("shutdown")
+async def stop_webhooks():
+    await DISPATCHER.stop()
+
+
+@azureVision.on_event("shutdown")
+async def close_database():
+    await dispose_engine()
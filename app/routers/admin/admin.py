@@ -0,0 +1,94 @@
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.config.config import Config
+from app.core.admin.auth import require_admin
+from app.core.memory.snapshots import SNAPSHOTS
+from app.core.profiling.sampler import start_worker_profile
+from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.utils.logger import Log
+
+log = Log("Admin Route")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post(
+    "/profile",
+    summary="Sample every thread of the worker serving this call for a time window",
+    status_code=status.HTTP_200_OK,
+)
+async def profile_worker(
+    seconds: float = Query(30.0, gt=0, description="Window length, capped at PROFILE_MAX_SECONDS"),
+):
+    try:
+        seconds = min(seconds, Config.PROFILE_MAX_SECONDS)
+        name = "worker-{}".format(time.strftime("%Y%m%dT%H%M%S"))
+        if not start_worker_profile(seconds, name):
+            return BaseResponse.failed(Error(ErrorCode.PROFILE_RUNNING))
+
+        log.info("worker profile {} for {}s.", name, seconds)
+        return BaseResponse.success_response(
+            code=202, msg="Accepted", meta={"file": f"{name}.folded", "seconds": seconds}
+        )
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.post(
+    "/memory/snapshots",
+    summary="Take a tracemalloc snapshot of this worker; the first one starts tracing",
+    status_code=status.HTTP_200_OK,
+)
+async def take_memory_snapshot():
+    try:
+        taken = SNAPSHOTS.take()
+
+        return BaseResponse.success_response(data=taken.summary(), meta={"snapshots": SNAPSHOTS.summaries()})
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.get(
+    "/memory/diff",
+    summary="Allocation growth between two snapshots of this worker, and live upload temp files",
+    status_code=status.HTTP_200_OK,
+)
+async def memory_diff(
+    base: Optional[int] = Query(None, description="Snapshot id, defaults to the first one"),
+    current: Optional[int] = Query(None, description="Snapshot id, defaults to a new snapshot"),
+    group_by: str = Query("lineno", regex="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    try:
+        if base is None:
+            snapshots = SNAPSHOTS.summaries()
+            base = snapshots[0]["id"] if snapshots else 0
+        base_snapshot = SNAPSHOTS.get(base)
+        if base_snapshot is None:
+            return BaseResponse.failed(Error(ErrorCode.SNAPSHOT_NOT_FOUND))
+        current_snapshot = SNAPSHOTS.get(current) if current is not None else SNAPSHOTS.take()
+        if current_snapshot is None:
+            return BaseResponse.failed(Error(ErrorCode.SNAPSHOT_NOT_FOUND))
+
+        result = SNAPSHOTS.diff(base_snapshot, current_snapshot, group_by, limit)
+
+        return BaseResponse.success_response(data=result)
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.delete(
+    "/memory/snapshots",
+    summary="Drop the snapshots and stop tracemalloc",
+    status_code=status.HTTP_200_OK,
+)
+async def clear_memory_snapshots():
+    SNAPSHOTS.clear()
+    return BaseResponse.success_response()
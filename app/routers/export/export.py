@@ -0,0 +1,39 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, status
+from fastapi.responses import StreamingResponse
+
+from app.core.enums.export_format_enum import ExportDataset, ExportFormat
+from app.core.export.receipt_export import MEDIA_TYPES, export_receipts, parquet_available
+from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.utils.logger import Log
+
+log = Log("Export Route")
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get(
+    "/receipts",
+    summary="Stream stored receipts as CSV, NDJSON or Parquet",
+    status_code=status.HTTP_200_OK,
+)
+async def export_receipt_rows(
+    format: ExportFormat = ExportFormat.CSV,
+    dataset: ExportDataset = ExportDataset.RECEIPTS,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    if format == ExportFormat.PARQUET and not parquet_available():
+        return BaseResponse.failed(Error(ErrorCode.EXPORT_FORMAT_UNAVAILABLE))
+
+    log.info("export: {} {} {} - {}.", dataset.value, format.value, date_from, date_to)
+
+    filename = f"{dataset.value}-{date_from or 'all'}-{date_to or 'all'}.{format.value}"
+    return StreamingResponse(
+        export_receipts(format, dataset, date_from, date_to),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,5 +1,8 @@
 from fastapi import APIRouter, status
+from app.core.health.prober import PROBER
 from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.core.schema.orjson_response import ORJSONResponse
 
 from app.utils.logger import Log
 
@@ -14,4 +17,27 @@ router = APIRouter(prefix="/health", tags=["health"])
     status_code=status.HTTP_200_OK,
 )
 async def health_check():
-    return BaseResponse.success()
+    return BaseResponse.success_response()
+
+
+@router.get(
+    "/live",
+    summary="Liveness: the worker serves requests",
+    status_code=status.HTTP_200_OK,
+)
+async def liveness():
+    return BaseResponse.success_response(data=PROBER.liveness())
+
+
+@router.get(
+    "/ready",
+    summary="Readiness from cached dependency probes and saturation, 503 when not ready",
+    status_code=status.HTTP_200_OK,
+)
+async def readiness():
+    report = PROBER.readiness()
+    if report["ready"]:
+        return BaseResponse.success_response(data=report)
+
+    error = Error(ErrorCode.SERVICE_NOT_READY)
+    return ORJSONResponse(BaseResponse.failed(error, data=report), status_code=error.get_status())
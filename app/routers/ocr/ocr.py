@@ -1,13 +1,36 @@
-import cv2
-import numpy as np
+import hashlib
+from functools import partial
+from typing import Optional
 
-from fastapi import APIRouter, File, UploadFile, status
-from app.core.azure.azure_vision import extract_text_from_images
+import anyio
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import AnyHttpUrl
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from app.core.azure.azure_vision import extract_text_concurrently
+from app.core.cache.result_cache import OCR_RESULTS
+from app.core.database import get_db
+from app.core.dedup.near_duplicate import OCR_NEAR_DUPLICATES, fingerprint
+from app.core.document.document_ocr import index_pages, ocr_pages, stream_document
+from app.core.document.pages import DocumentError, PageSource
+from app.core.document.tiling import needs_tiling, ocr_tiled
 from app.core.enums.content_type_enum import ContentType
+from app.core.enums.projection_enum import Projection
+from app.core.enums.webhook_enum import WebhookEvent
+from app.core.fetch.fetcher import FETCHER, FetchError
+from app.core.metrics.metrics import track_stage
+from app.core.projection.projection import project_entry, project_read_result
 from app.core.schema.base_response import BaseResponse
 from app.core.schema.error_schema import Error, ErrorCode
 from app.core.schema.ocr.ocr_schema import OCRRequest
-from app.helpers.converter import convert_image_to_bytes
+from app.core.schema.ocr.region_schema import RegionQuery
+from app.core.search.ocr_search import index_document, search_documents
+from app.core.spatial.regions import get_word_index, query_regions
+from app.core.triage.triage import triage
+from app.core.webhook.webhook import accept_job
+from app.helpers.converter import convert_image_to_bytes, decode_image
 
 from app.utils.logger import Log
 
@@ -23,19 +46,69 @@ router = APIRouter(prefix="/ocr", tags=["ocr"])
 )
 async def extract_text(
     ocr_request: OCRRequest,
+    background_tasks: BackgroundTasks,
+    projection: Projection = Query(Projection.FULL, description="Level of detail of the returned read result"),
+    fetch: bool = Query(False, description="Download the image here and run it through the upload pipeline"),
+    callback_url: Optional[AnyHttpUrl] = Query(None, description="Answer 202 and POST the result here when done"),
 ):
     image_url = ocr_request.url_image
 
-    log.info(f"ocr_request: {ocr_request}.")
+    log.info("ocr_request: {}.", ocr_request)
+
+    if fetch:
+        if callback_url:
+            handler = partial(_fetch_text, image_url, projection)
+            return await accept_job(background_tasks, callback_url, WebhookEvent.OCR_COMPLETED, handler)
+        return await _fetch_text(image_url, projection, background_tasks)
+
+    if callback_url:
+        handler = partial(_extract_text, image_url, projection)
+        document_id = hashlib.sha256(image_url.encode()).hexdigest()
+        return await accept_job(
+            background_tasks, callback_url, WebhookEvent.OCR_COMPLETED, handler, document_id=document_id
+        )
+    return await _extract_text(image_url, projection, background_tasks)
+
+
+async def _extract_text(image_url: str, projection: Projection, background_tasks: BackgroundTasks):
+    try:
+        result = await extract_text_concurrently({"url": image_url}, ContentType.JSON)
+
+        document_id = hashlib.sha256(image_url.encode()).hexdigest()
+        background_tasks.add_task(index_document, document_id, image_url, result)
+        background_tasks.add_task(OCR_RESULTS.put, document_id, result)
+
+        with track_stage("serialization"):
+            data = project_read_result(result, projection)
+            return BaseResponse.success_response(data=data, meta={"document_id": document_id})
 
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+async def _fetch_text(image_url: str, projection: Projection, background_tasks: BackgroundTasks):
     try:
-        result = extract_text_from_images({"url": image_url}, ContentType.JSON)
+        with track_stage("url_fetch"):
+            fetched = await FETCHER.fetch(image_url)
 
-        return BaseResponse.success(data=result)
+        # Unchanged (304) or already seen content: answered from the result cache, without Azure.
+        result = await OCR_RESULTS.get(fetched.document_id)
+        if result is not None:
+            meta = {"document_id": fetched.document_id, "fetch": dict(fetched.report(), cached=True)}
+            with track_stage("serialization"):
+                return BaseResponse.success_response(data=project_read_result(result, projection), meta=meta)
+        if fetched.raw is None:
+            # Not modified, but the result has expired since.
+            with track_stage("url_fetch"):
+                fetched = await FETCHER.fetch(image_url, conditional=False)
 
+    except FetchError as e:
+        return BaseResponse.failed(Error(e.error))
     except Exception:
         return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
 
+    return await _upload_file(fetched.raw, image_url, False, projection, background_tasks, fetch=fetched.report())
+
 
 @router.post(
     "/upload",
@@ -43,16 +116,171 @@ async def extract_text(
     status_code=status.HTTP_200_OK,
 )
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    tiling: bool = Query(False, description="Read as overlapping full-resolution tiles"),
+    projection: Projection = Query(Projection.FULL, description="Level of detail of the returned read result"),
+    callback_url: Optional[AnyHttpUrl] = Query(None, description="Answer 202 and POST the result here when done"),
+):
+    try:
+        with track_stage("upload_read"):
+            raw = await file.read()
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+    if callback_url:
+        handler = partial(_upload_file, raw, file.filename or "", tiling, projection)
+        document_id = hashlib.sha256(raw).hexdigest()
+        return await accept_job(
+            background_tasks, callback_url, WebhookEvent.OCR_COMPLETED, handler, document_id=document_id
+        )
+    return await _upload_file(raw, file.filename or "", tiling, projection, background_tasks)
+
+
+async def _upload_file(
+    raw: bytes,
+    filename: str,
+    tiling: bool,
+    projection: Projection,
+    background_tasks: BackgroundTasks,
+    fetch: Optional[dict] = None,
+):
+    try:
+        with track_stage("imdecode"):
+            img = decode_image(raw)
+        document_id = hashlib.sha256(raw).hexdigest()
+
+        verdict = triage(img)
+        if verdict.rejected:
+            return BaseResponse.failed(Error(verdict.reason))
+        meta = {"document_id": document_id}
+        if fetch is not None:
+            meta["fetch"] = fetch
+        if not verdict.passed:
+            meta["triage"] = verdict.meta()
+
+        with track_stage("fingerprint"):
+            fp = fingerprint(img)
+        match = await OCR_NEAR_DUPLICATES.lookup(fp)
+        if match is not None:
+            log.info("near duplicate of {} at distance {}.", match.document_id, match.distance)
+            # meta.document_id names this upload: /ocr/{document_id}/regions and search must find it too.
+            background_tasks.add_task(index_document, document_id, filename, match.result)
+            background_tasks.add_task(OCR_RESULTS.put, document_id, match.result)
+            with track_stage("serialization"):
+                data = project_read_result(match.result, projection)
+                return BaseResponse.success_response(data=data, meta=dict(meta, near_duplicate=match.report()))
+
+        if tiling or needs_tiling(img):
+            result = await ocr_tiled(img)
+        else:
+            with track_stage("convert_image_to_bytes"):
+                img_bytes = convert_image_to_bytes(image=img)
+
+            result = await extract_text_concurrently(img_bytes, ContentType.OCTET_STREAM)
+
+        background_tasks.add_task(index_document, document_id, filename, result)
+        background_tasks.add_task(OCR_RESULTS.put, document_id, result)
+        if not isinstance(result, tuple):
+            background_tasks.add_task(OCR_NEAR_DUPLICATES.add, document_id, fp)
+
+        with track_stage("serialization"):
+            return BaseResponse.success_response(data=project_read_result(result, projection), meta=meta)
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.post(
+    "/document",
+    summary="OCR a multi-page PDF/TIFF, streamed per page as NDJSON",
+    status_code=status.HTTP_200_OK,
+)
+async def upload_document(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    projection: Projection = Query(Projection.FULL, description="Level of detail of the returned read result"),
+    callback_url: Optional[AnyHttpUrl] = Query(None, description="Answer 202 and POST all pages here when done"),
+):
+    try:
+        with track_stage("upload_read"):
+            raw = await file.read()
+        with track_stage("document_open"):
+            source = await anyio.to_thread.run_sync(PageSource.open, raw)
+
+    except DocumentError as e:
+        return BaseResponse.failed(Error(e.error))
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+    document_id = hashlib.sha256(raw).hexdigest()
+    log.info("document: {} {} pages.", source.kind, source.count)
+
+    if callback_url:
+        handler = partial(_collect_document, document_id, file.filename or "", source, projection)
+        response = await accept_job(
+            background_tasks, callback_url, WebhookEvent.DOCUMENT_COMPLETED, handler, document_id=document_id
+        )
+        if isinstance(response, dict):
+            # Refused: the job that would have read the pages never runs.
+            source.close()
+        return response
+
+    entries = []
+    return StreamingResponse(
+        stream_document(document_id, source, entries, projection),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(index_pages, document_id, file.filename or "", entries),
+    )
+
+
+async def _collect_document(
+    document_id: str, filename: str, source: PageSource, projection: Projection, background_tasks: BackgroundTasks
+):
+    entries = [entry async for entry in ocr_pages(source)]
+    background_tasks.add_task(index_pages, document_id, filename, entries)
+    return BaseResponse.success_response(
+        data=[project_entry(entry, projection) for entry in entries],
+        meta={"document_id": document_id, "kind": source.kind, "pages": source.count},
+    )
+
+
+@router.get(
+    "/search",
+    summary="Full-text search over stored OCR text",
+    status_code=status.HTTP_200_OK,
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        result = await search_documents(db, q, limit)
+
+        return BaseResponse.success_response(data=result)
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.post(
+    "/{document_id}/regions",
+    summary="Text of named regions of a cached OCR result",
+    status_code=status.HTTP_200_OK,
+)
+async def read_regions(
+    document_id: str,
+    region_query: RegionQuery,
 ):
     try:
-        img_arr = np.fromstring(await file.read(), np.uint8)
-        img = cv2.imdecode(img_arr, -1)
-        img_bytes = convert_image_to_bytes(image=img)
+        index = await get_word_index(document_id)
+        if index is None:
+            return BaseResponse.failed(Error(ErrorCode.OCR_RESULT_NOT_FOUND))
 
-        result = extract_text_from_images(img_bytes, ContentType.OCTET_STREAM)
+        result = query_regions(index, region_query)
 
-        return BaseResponse.success(data=result)
+        return BaseResponse.success_response(data=result, meta={"document_id": document_id})
 
     except Exception:
         return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
@@ -1,8 +1,29 @@
-from fastapi import APIRouter, File, UploadFile, status
-from app.core.azure.azure_receipt import analyze_receipt
+from datetime import date
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile, status
+from pydantic import AnyHttpUrl
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.azure.azure_receipt import analyze_receipt_concurrently
+from app.core.cache.result_cache import RECEIPT_RESULTS
+from app.core.database import get_async_session, get_db
+from app.core.dedup.near_duplicate import RECEIPT_NEAR_DUPLICATES, fingerprint
+from app.core.entities.receipt.receipt import Receipt
+from app.core.enums.rollup_period_enum import RollupPeriod
+from app.core.enums.webhook_enum import WebhookEvent
+from app.core.metrics.metrics import track_stage
+from app.core.receipt.receipt_store import correct_receipt, store_receipt
+from app.core.rollup.rollup import get_rollup
 from app.core.schema.base_response import BaseResponse
 from app.core.schema.error_schema import Error, ErrorCode
-from app.helpers.file import handle_upload_file, remove_file_tmp
+from app.core.schema.receipt.receipt_schema import ReceiptCorrectionRequest
+from app.core.triage.triage import PASSED, triage
+from app.core.webhook.webhook import accept_job
+from app.helpers.converter import decode_image
+from app.helpers.file import handle_upload_file, hash_file, remove_file_tmp
 
 from app.utils.logger import Log
 
@@ -17,13 +38,122 @@ router = APIRouter(prefix="/receipt", tags=["receipt"])
     status_code=status.HTTP_200_OK,
 )
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    callback_url: Optional[AnyHttpUrl] = Query(None, description="Answer 202 and POST the result here when done"),
+    db: AsyncSession = Depends(get_db),
 ):
+    file_location = None
+    try:
+        with track_stage("upload_read"):
+            file_location = handle_upload_file(file)
+            receipt_id = hash_file(file_location)
+    except Exception:
+        if file_location is not None:
+            remove_file_tmp(file_location)
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+    if callback_url:
+        handler = partial(_upload_file_job, file_location, receipt_id)
+        response = await accept_job(
+            background_tasks, callback_url, WebhookEvent.RECEIPT_COMPLETED, handler, receipt_id=receipt_id
+        )
+        if isinstance(response, dict):
+            # Refused: the job that owns the temp file will not run.
+            remove_file_tmp(file_location)
+        return response
+    return await _upload_file(file_location, receipt_id, db, background_tasks)
+
+
+async def _upload_file_job(file_location: Path, receipt_id: str, background_tasks: BackgroundTasks):
+    # The request's session is gone by the time a job runs.
+    session = get_async_session().session_factory()
+    try:
+        return await _upload_file(file_location, receipt_id, session, background_tasks)
+    finally:
+        await session.close()
+
+
+async def _upload_file(file_location: Path, receipt_id: str, db: AsyncSession, background_tasks: BackgroundTasks):
+    # Owns the temp file: removed on every path, errors included.
     try:
-        file_location = handle_upload_file(file)
-        result = analyze_receipt(file_location)
+        # PDFs and other non-image receipts do not decode and skip triage and the index.
+        with track_stage("imdecode"):
+            img = decode_image(file_location.read_bytes())
+        verdict = triage(img) if img is not None else PASSED
+        if verdict.rejected:
+            return BaseResponse.failed(Error(verdict.reason))
+        meta = None if verdict.passed else {"triage": verdict.meta()}
+
+        fp = None
+        if img is not None:
+            with track_stage("fingerprint"):
+                fp = fingerprint(img)
+        match = await RECEIPT_NEAR_DUPLICATES.lookup(fp) if fp is not None else None
+        if match is not None:
+            log.info("near duplicate of {} at distance {}.", match.document_id, match.distance)
+            with track_stage("serialization"):
+                return BaseResponse.success_response(
+                    data=match.result, meta=dict(meta or {}, near_duplicate=match.report())
+                )
+
+        result = await analyze_receipt_concurrently(file_location)
+
+        if isinstance(result, Receipt):
+            result.receipt_id = receipt_id
+            await store_receipt(db, receipt_id, result)
+            background_tasks.add_task(RECEIPT_RESULTS.put, receipt_id, result)
+            if fp is not None:
+                background_tasks.add_task(RECEIPT_NEAR_DUPLICATES.add, receipt_id, fp)
+
+        with track_stage("serialization"):
+            return BaseResponse.success_response(data=result, meta=meta)
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+    finally:
         remove_file_tmp(file_location)
-        return BaseResponse.success(data=result)
+
+
+@router.put(
+    "/{receipt_id}",
+    summary="Correct a stored receipt",
+    status_code=status.HTTP_200_OK,
+)
+async def update_receipt(
+    receipt_id: str,
+    correction: ReceiptCorrectionRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        record = await correct_receipt(db, receipt_id, correction.dict(exclude_unset=True))
+        if record is None:
+            return BaseResponse.failed(Error(ErrorCode.RECEIPT_NOT_FOUND))
+        # Near-duplicates of this receipt must not be served the uncorrected copy.
+        await RECEIPT_NEAR_DUPLICATES.discard(receipt_id)
+
+        return BaseResponse.success_response(data=BaseResponse.model_to_dict(record))
+
+    except Exception:
+        return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
+
+
+@router.get(
+    "/rollups/{period}",
+    summary="Spend rollup per merchant and period",
+    status_code=status.HTTP_200_OK,
+)
+async def receipt_rollup(
+    period: RollupPeriod,
+    merchant_name: str,
+    period_start: date,
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        result = await get_rollup(db, merchant_name, period, period_start)
+
+        return BaseResponse.success_response(data=result)
 
     except Exception:
         return BaseResponse.failed(Error(ErrorCode.INTERNAL_SERVER_ERROR))
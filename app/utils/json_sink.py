@@ -0,0 +1,102 @@
+import atexit
+import os
+import random
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import orjson
+
+
+class JsonSink(object):
+    """
+    Loguru sink that writes one JSON object per record, in batches, from a
+    background thread.
+
+    The logging call only snapshots a few record fields into a bounded deque,
+    so it never blocks on disk; when the writer falls behind the oldest
+    entries are dropped and counted. Records are sampled per message type
+    (the Log business name), warnings and errors are always kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sampling: Optional[Dict[str, float]] = None,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        max_pending: int = 100_000,
+    ):
+        self.path = path
+        self.sampling = sampling or {}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pending: deque = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._start()
+        atexit.register(self.stop)
+        # Threads do not survive fork (gunicorn preload): give each worker its own writer.
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="log-json-sink", daemon=True)
+        self._thread.start()
+
+    def _after_fork(self):
+        # The parent still owns and writes whatever was pending at fork time.
+        self._pending.clear()
+        self._wakeup = threading.Event()
+        if not self._stopped:
+            self._start()
+
+    def __call__(self, message):
+        record = message.record
+        extra = record["extra"]
+        level_no = record["level"].no
+        if level_no < 30 and self.sampling:
+            rate = self.sampling.get(extra.get("business") or record["name"], 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                return
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        exception = record["exception"]
+        self._pending.append(
+            {
+                "time": record["time"].isoformat(),
+                "level": record["level"].name,
+                "message": record["message"],
+                "business": extra.get("business"),
+                "request_id": extra.get("request_id"),
+                "file": record["file"].path,
+                "function": record["function"],
+                "line": record["line"],
+                "exception": repr(exception.value) if exception else None,
+            }
+        )
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self, f):
+        pending = self._pending
+        while pending:
+            batch = []
+            for _ in range(min(self.batch_size, len(pending))):
+                batch.append(orjson.dumps(pending.popleft(), default=str, option=orjson.OPT_APPEND_NEWLINE))
+            f.write(b"".join(batch))
+        f.flush()
+
+    def _run(self):
+        with open(self.path, "ab") as f:
+            while not self._stopped:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._drain(f)
+            self._drain(f)
+
+    def stop(self):
+        if not self._stopped:
+            self._stopped = True
+            self._wakeup.set()
+            self._thread.join(timeout=5)
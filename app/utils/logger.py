@@ -1,75 +1,61 @@
-import inspect
-import os
-
 from loguru import logger
 
 from app.config.config import Config
 
+LEVEL_NUMBERS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
 
-class Log(object):
-    business = None
-
-    def __init__(self, name="azureVision"):
-        if not os.path.exists(Config.LOG_DIR):
-            os.mkdir(Config.LOG_DIR)
-        self.business = name
 
-    def info(self, message: str):
-        file_name, line, func, _, _ = inspect.getframeinfo(
-            inspect.currentframe().f_back
-        )
-        logger.bind(
-            name=Config.AZURE_VISION_INFO,
-            func=func,
-            line=line,
-            business=self.business,
-            filename=file_name,
-        ).debug(message)
+class Log(object):
+    """
+    Thin per-module facade over loguru.
 
-    def error(self, message: str):
-        file_name, line, func, _, _ = inspect.getframeinfo(
-            inspect.currentframe().f_back
-        )
-        logger.bind(
-            name=Config.AZURE_VISION_ERROR,
-            func=func,
-            line=line,
-            business=self.business,
-            filename=file_name,
-        ).error(message)
+    The bound loggers are built once per instance with opt(depth=1), so loguru
+    records the caller's file, function and line straight from the frame's code
+    object. Calls below `Log.min_level` return before touching loguru, and
+    messages are formatted by loguru only when emitted:
 
-    def warning(self, message: str):
-        file_name, line, func, _, _ = inspect.getframeinfo(
-            inspect.currentframe().f_back
-        )
-        logger.bind(
-            name=Config.AZURE_VISION_ERROR,
-            func=func,
-            line=line,
-            business=self.business,
-            filename=file_name,
-        ).warning(message)
+        log.info("ocr_request: {}.", ocr_request)
+    """
 
-    def debug(self, message: str):
-        file_name, line, func, _, _ = inspect.getframeinfo(
-            inspect.currentframe().f_back
-        )
-        logger.bind(
-            name=Config.AZURE_VISION_INFO,
-            func=func,
-            line=line,
-            business=self.business,
-            filename=file_name,
-        ).debug(message)
+    business = None
+    min_level = LEVEL_NUMBERS.get(Config.LOG_LEVEL.upper(), LEVEL_NUMBERS["DEBUG"])
 
-    def exception(self, message: str):
-        file_name, line, func, _, _ = inspect.getframeinfo(
-            inspect.currentframe().f_back
-        )
-        logger.bind(
-            name=Config.AZURE_VISION_ERROR,
-            func=func,
-            line=line,
-            business=self.business,
-            filename=file_name,
-        ).exception(message)
+    def __init__(self, name="azureVision"):
+        self.business = name
+        info = logger.bind(name=Config.AZURE_VISION_INFO, business=name)
+        error = logger.bind(name=Config.AZURE_VISION_ERROR, business=name)
+        self._info = info.opt(depth=1)
+        self._error = error.opt(depth=1)
+        self._exception = error.opt(depth=1, exception=True)
+
+    @classmethod
+    def set_level(cls, level: str):
+        cls.min_level = LEVEL_NUMBERS[level.upper()]
+
+    def info(self, message: str, *args, **kwargs):
+        if self.min_level <= 20:
+            self._info.info(message, *args, **kwargs)
+
+    def error(self, message: str, *args, **kwargs):
+        if self.min_level <= 40:
+            self._error.error(message, *args, **kwargs)
+
+    def warning(self, message: str, *args, **kwargs):
+        if self.min_level <= 30:
+            self._error.warning(message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs):
+        if self.min_level <= 10:
+            self._info.debug(message, *args, **kwargs)
+
+    def exception(self, message: str, *args, **kwargs):
+        if self.min_level <= 40:
+            self._exception.error(message, *args, **kwargs)
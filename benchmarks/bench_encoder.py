@@ -0,0 +1,158 @@
+"""
+Parity check and micro-benchmarks for app.helpers.encoder.jsonable_encoder.
+
+    python -m benchmarks.bench_encoder
+
+Every case is encoded with the dispatch-table encoder and with the previous
+recursive implementation (benchmarks/legacy/encoder.py); any difference in
+output or in the raised exception type fails the run.
+"""
+import dataclasses
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum, IntEnum
+from pathlib import PurePosixPath
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.core.schema.base_response import BaseResponse
+from app.helpers.encoder import jsonable_encoder
+from benchmarks.fixtures import load_read_result
+from benchmarks.legacy.encoder import jsonable_encoder as legacy_jsonable_encoder
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Level(IntEnum):
+    LOW = 1
+
+
+@dataclasses.dataclass
+class Item:
+    name: str = "item"
+    price: Decimal = Decimal("1.10")
+    when: date = date(2023, 10, 1)
+
+
+class Child(BaseModel):
+    name: str = "child"
+    value: Optional[int] = None
+
+
+class Parent(BaseModel):
+    title: str = "parent"
+    created: datetime = datetime(2023, 10, 1, 12, 30)
+    children: List[Child] = [Child(), Child(value=2)]
+    optional: Optional[str] = None
+
+    class Config:
+        json_encoders = {datetime: lambda d: d.timestamp()}
+
+
+class Slotted(object):
+    def __init__(self):
+        self.a = 1
+        self._sa_instance_state = "hidden"
+        self.nested = {"k": Color.RED}
+
+
+def nested(depth: int):
+    node: dict = {"leaf": 1}
+    for _ in range(depth):
+        node = {"child": node, "list": [node["leaf"] if "leaf" in node else 0]}
+    return node
+
+
+DATETIME = {datetime: lambda x: x.strftime("%d-%m-%Y %H:%M:%S")}
+
+CASES = [
+    ("primitives", lambda: [1, 2.5, "s", None, True, False], {}),
+    ("dict", lambda: {"a": 1, "b": [1, {"c": None}], "_sa_x": 1, 3: "int key"}, {}),
+    ("enum keys", lambda: {Color.RED: 1, Level.LOW: 2, PurePosixPath("/p"): 3}, {}),
+    ("types", lambda: [Decimal("1.5"), Decimal("2"), uuid.UUID(int=1), b"bytes", time(1, 2), timedelta(3)], {}),
+    ("datetimes", lambda: {"d": date(2023, 1, 2), "dt": datetime(2023, 1, 2, 3, 4)}, {}),
+    (
+        "custom datetime",
+        lambda: {"dt": datetime(2023, 1, 2, 3, 4), "l": [datetime(2020, 1, 1)]},
+        dict(custom_encoder=DATETIME),
+    ),
+    ("custom base class", lambda: {"i": 1, "b": True, "f": 1.5}, dict(custom_encoder={int: lambda x: x * 10})),
+    ("containers", lambda: {"t": (1, 2), "s": {3}, "fs": frozenset({4}), "g": (x for x in range(3))}, {}),
+    ("enums and paths", lambda: [Color.RED, Level.LOW, PurePosixPath("/tmp/x")], {}),
+    ("dataclass", lambda: {"item": Item(), "items": [Item(), Item(name="b")]}, {}),
+    ("model", lambda: Parent(), {}),
+    ("model include", lambda: Parent(), dict(include={"title", "children"})),
+    ("model exclude none", lambda: Parent(), dict(exclude_none=True)),
+    ("model exclude defaults", lambda: [Parent(title="x")], dict(exclude_defaults=True)),
+    ("models in dict", lambda: {"p": Parent(), "c": [Child(value=1)]}, dict(exclude_defaults=True)),
+    ("exclude keys", lambda: {"a": 1, "b": {"a": 2, "c": 3}, "c": [{"a": 4}]}, dict(exclude=("a",))),
+    ("include and exclude", lambda: [{"a": 1, "b": 2, "c": 3}], dict(include={"a"}, exclude={"a", "b"})),
+    ("exclude none", lambda: {"a": None, "b": {"c": None, "d": 1}, "l": [None]}, dict(exclude_none=True)),
+    ("sqlalchemy unsafe", lambda: {"_sa_state": 1, "a": 2}, dict(sqlalchemy_safe=False)),
+    ("fallback objects", lambda: [Slotted(), {"o": Slotted()}], {}),
+    ("success envelope", lambda: BaseResponse.success(data={"dt": datetime(2023, 1, 1), "x": [Item()]}), {}),
+    ("nested", lambda: nested(50), {}),
+    ("unencodable", lambda: {"x": object()}, {}),
+]
+
+
+def run(encoder, factory, kwargs):
+    try:
+        return encoder(factory(), **kwargs)
+    except Exception as e:
+        return ("raised", type(e).__name__)
+
+
+def check_parity() -> int:
+    failures = 0
+    for name, factory, kwargs in CASES:
+        expected, actual = run(legacy_jsonable_encoder, factory, kwargs), run(jsonable_encoder, factory, kwargs)
+        if expected != actual or type(expected) is not type(actual):
+            failures += 1
+            print(f"MISMATCH {name}:\n  legacy : {expected!r}\n  current: {actual!r}")
+    print(f"parity: {len(CASES) - failures}/{len(CASES)} cases match")
+    return failures
+
+
+def best_of(fn, repeat: int = 5, number: int = 10) -> float:
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def main():
+    failures = check_parity()
+
+    deep = nested(5000)
+    jsonable_encoder(deep)
+    print("depth 5000: encoded without hitting the recursion limit")
+
+    payload = load_read_result()
+    envelope = dict(code=200, msg="Successfully", data=payload)
+    for label, fn_legacy, fn_current in [
+        (
+            "read payload",
+            lambda: legacy_jsonable_encoder(envelope, custom_encoder=DATETIME),
+            lambda: jsonable_encoder(envelope, custom_encoder=DATETIME),
+        ),
+        (
+            "read payload, no custom encoder",
+            lambda: legacy_jsonable_encoder(payload),
+            lambda: jsonable_encoder(payload),
+        ),
+    ]:
+        legacy_time, current_time = best_of(fn_legacy, number=3), best_of(fn_current, number=3)
+        print(
+            f"{label:34}: legacy {legacy_time * 1000:8.2f} ms  current {current_time * 1000:8.2f} ms"
+            f"  ({legacy_time / current_time:.1f}x)"
+        )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
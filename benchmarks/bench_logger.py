@@ -0,0 +1,49 @@
+"""
+Per-call overhead of app.utils.logger.Log against the previous implementation.
+
+    python -m benchmarks.bench_logger
+
+Both loggers write to the same in-memory sink, so the numbers isolate the
+cost of the Log facade plus loguru's record building.
+"""
+import timeit
+
+from loguru import logger
+
+from app.utils.logger import Log
+from benchmarks.legacy.logger import Log as LegacyLog
+
+PAYLOAD = {"url_image": "https://example.png", "size": 1024}
+
+
+def best_of(fn, number: int = 20000) -> float:
+    return min(timeit.repeat(fn, repeat=5, number=number)) / number
+
+
+def main():
+    logger.remove()
+    logger.add(lambda message: None, level="DEBUG", format="{extra[business]} {message}")
+    Log.set_level("DEBUG")
+
+    legacy, current = LegacyLog("Bench"), Log("Bench")
+    emitted = [
+        ("legacy   info (f-string)", lambda: legacy.info(f"ocr_request: {PAYLOAD}.")),
+        ("current  info (lazy)", lambda: current.info("ocr_request: {}.", PAYLOAD)),
+    ]
+    for label, fn in emitted:
+        print(f"{label:28}: {best_of(fn) * 1e6:7.2f} us/call")
+
+    # Level filtered out: the legacy class still inspects the frame and formats.
+    logger.remove()
+    logger.add(lambda message: None, level="WARNING")
+    Log.set_level("WARNING")
+    filtered = [
+        ("legacy   debug (filtered)", lambda: legacy.debug(f"ocr_request: {PAYLOAD}.")),
+        ("current  debug (filtered)", lambda: current.debug("ocr_request: {}.", PAYLOAD)),
+    ]
+    for label, fn in filtered:
+        print(f"{label:28}: {best_of(fn) * 1e6:7.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
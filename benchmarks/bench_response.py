@@ -0,0 +1,43 @@
+"""
+Compare the legacy success path with the orjson response class.
+
+    python -m benchmarks.bench_response
+"""
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder as fastapi_jsonable_encoder
+from starlette.responses import JSONResponse
+
+from app.core.schema.base_response import BaseResponse
+from benchmarks.fixtures import load_read_result
+
+
+def legacy_render(payload) -> bytes:
+    # What a route returning BaseResponse.success(...) went through.
+    body = fastapi_jsonable_encoder(BaseResponse.success(data=payload))
+    return JSONResponse(body).body
+
+
+def orjson_render(payload) -> bytes:
+    return BaseResponse.success_response(data=payload).body
+
+
+def best_of(fn, payload, repeat: int = 5, number: int = 5) -> float:
+    return min(timeit.repeat(lambda: fn(payload), repeat=repeat, number=number)) / number
+
+
+def main():
+    payload = load_read_result()
+    legacy, current = legacy_render(payload), orjson_render(payload)
+    assert json.loads(legacy) == json.loads(current), "orjson output differs from the legacy response"
+
+    words = sum(len(page["words"]) for page in payload["readResult"]["pages"])
+    legacy_time, orjson_time = best_of(legacy_render, payload), best_of(orjson_render, payload)
+    print(f"payload: {len(payload['readResult']['pages'])} pages, {words} words, {len(current) / 1024:.0f} KiB")
+    print(f"legacy  : {legacy_time * 1000:8.2f} ms")
+    print(f"orjson  : {orjson_time * 1000:8.2f} ms  ({legacy_time / orjson_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import json
+import random
+from pathlib import Path
+from typing import List
+
+FIXTURE_DIR = Path(__file__).parent
+
+VOCABULARY = (
+    "請求書 御中 株式会社 合計 小計 消費税 お支払い 金額 品名 数量 単価 東京都 千代田区 丸の内 "
+    "振込先 銀行 支店 普通 口座 番号 INV-2023-0001 ¥1,100 2023年10月1日 TEL 03-1234-5678 備考 納品書 税込"
+).split()
+
+
+def _box(x: float, y: float, w: float, h: float) -> List[float]:
+    return [x, y, x + w, y, x + w, y + h, x, y + h]
+
+
+def build_read_result(pages: int = 3, lines_per_page: int = 60, words_per_line: int = 12, seed: int = 7) -> dict:
+    """
+    Build an Image Analysis 2023-02-01-preview `read` payload.
+
+    Shape and key names follow the real service output (readResult.pages[].words/lines
+    with flat 8-float bounding boxes and TextElements spans). The default size is
+    roughly a dense 3-page A4 invoice: ~2,000 words per page.
+    """
+    rng = random.Random(seed)
+    width, height = 2480.0, 3508.0
+    content_parts: List[str] = []
+    offset = 0
+    result_pages = []
+    for page_number in range(1, pages + 1):
+        page_offset = offset
+        words, lines = [], []
+        for line_index in range(lines_per_page):
+            y = 80.0 + line_index * (height - 160.0) / lines_per_page
+            x = 100.0
+            line_words = [rng.choice(VOCABULARY) for _ in range(words_per_line)]
+            line_offset = offset
+            for word_index, text in enumerate(line_words):
+                w = 28.0 * len(text)
+                words.append(
+                    {
+                        "content": text,
+                        "boundingBox": _box(round(x, 1), round(y, 1), w, 40.0),
+                        "confidence": round(rng.uniform(0.6, 0.999), 3),
+                        "span": {"offset": offset, "length": len(text)},
+                    }
+                )
+                offset += len(text) + (1 if word_index < len(line_words) - 1 else 0)
+                x += w + 12.0
+            line_text = " ".join(line_words)
+            lines.append(
+                {
+                    "content": line_text,
+                    "boundingBox": _box(100.0, round(y, 1), round(x - 112.0, 1), 40.0),
+                    "spans": [{"offset": line_offset, "length": len(line_text)}],
+                }
+            )
+            content_parts.append(line_text)
+            offset += 1
+        result_pages.append(
+            {
+                "height": height,
+                "width": width,
+                "angle": round(rng.uniform(-0.5, 0.5), 4),
+                "pageNumber": page_number,
+                "words": words,
+                "spans": [{"offset": page_offset, "length": offset - page_offset}],
+                "lines": lines,
+            }
+        )
+    return {
+        "modelVersion": "2023-02-01-preview",
+        "metadata": {"width": int(width), "height": int(height)},
+        "readResult": {
+            "stringIndexType": "TextElements",
+            "content": "\n".join(content_parts),
+            "pages": result_pages,
+            "styles": [],
+        },
+    }
+
+
+def load_read_result() -> dict:
+    """
+    Prefer a recorded service response when one has been dropped in as
+    `read_result.json`, otherwise fall back to the generated payload.
+    """
+    recorded = FIXTURE_DIR / "read_result.json"
+    if recorded.exists():
+        return json.loads(recorded.read_text(encoding="utf-8"))
+    return build_read_result()
+
+
+def _field(value_type: str, value, content: str = None, confidence: float = 0.98) -> dict:
+    return {
+        "value_type": value_type,
+        "value": value,
+        "content": content if content is not None else str(value),
+        "bounding_regions": [{"page_number": 1, "polygon": [{"x": 1.0, "y": 1.0}, {"x": 2.0, "y": 1.0}]}],
+        "spans": [{"offset": 0, "length": len(str(value))}],
+        "confidence": confidence,
+    }
+
+
+def _currency(amount: float) -> dict:
+    return _field("currency", {"amount": amount, "symbol": "¥", "code": "JPY"}, f"¥{amount:,.0f}")
+
+
+def build_receipt_result(items: int = 40, seed: int = 7) -> dict:
+    """
+    Build a prebuilt-receipt AnalyzeResult in the SDK's `to_dict()` shape.
+
+    A long supermarket receipt: one document with merchant, totals and
+    `items` line items, each a dictionary field of Description/Quantity/Price/TotalPrice.
+    """
+    rng = random.Random(seed)
+    line_items = []
+    subtotal = 0.0
+    for _ in range(items):
+        quantity = rng.randint(1, 4)
+        price = float(rng.randrange(80, 2000, 10))
+        subtotal += quantity * price
+        line_items.append(
+            _field(
+                "dictionary",
+                {
+                    "Description": _field("string", rng.choice(VOCABULARY)),
+                    "Quantity": _field("float", float(quantity)),
+                    "Price": _currency(price),
+                    "TotalPrice": _currency(quantity * price),
+                },
+                confidence=round(rng.uniform(0.8, 0.99), 3),
+            )
+        )
+    tax = round(subtotal * 0.1)
+    fields = {
+        "MerchantName": _field("string", "株式会社サンプルストア"),
+        "MerchantPhoneNumber": _field("phoneNumber", "+81312345678", "03-1234-5678"),
+        "MerchantAddress": _field(
+            "address",
+            {"house_number": "1-1", "road": "丸の内", "city": "千代田区", "state": "東京都", "postal_code": "100-0005"},
+            "東京都千代田区丸の内1-1",
+        ),
+        "TransactionDate": _field("date", "2023-10-01"),
+        "TransactionTime": _field("time", "12:34:00"),
+        "Subtotal": _currency(subtotal),
+        "TotalTax": _currency(tax),
+        "Total": _currency(subtotal + tax),
+        "Items": _field("list", line_items),
+    }
+    return {
+        "api_version": "2023-07-31",
+        "model_id": "prebuilt-receipt",
+        "content": "",
+        "pages": [],
+        "documents": [
+            {
+                "doc_type": "receipt.retailMeal",
+                "bounding_regions": [],
+                "spans": [],
+                "fields": fields,
+                "confidence": 0.98,
+            }
+        ],
+    }
+
+
+def load_receipt_result():
+    """
+    Prebuilt-receipt AnalyzeResult, from a recorded `receipt_result.json`
+    (`AnalyzeResult.to_dict()` output) when present, otherwise generated.
+    """
+    from azure.ai.formrecognizer import AnalyzeResult
+
+    recorded = FIXTURE_DIR / "receipt_result.json"
+    if recorded.exists():
+        return AnalyzeResult.from_dict(json.loads(recorded.read_text(encoding="utf-8")))
+    return AnalyzeResult.from_dict(build_receipt_result())
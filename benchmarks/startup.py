@@ -0,0 +1,129 @@
+"""
+Cold-start report: import-time profile of the app and time to first request.
+
+    python -m benchmarks.startup                       # both reports
+    python -m benchmarks.startup --skip-ttfr --top 30  # import profile only
+    python -m benchmarks.startup --budget-ms 500       # exit 1 when time to first request exceeds the budget
+
+The import profile is the `python -X importtime` output of `import app.main`,
+summarised by cumulative and self time. Time to first request spawns
+uvicorn and polls --path until it answers 200, so it covers interpreter
+start, imports and the startup events (the database must be reachable).
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).parent.parent
+
+
+def import_profile(module: str = "app.main") -> List[Dict]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        rows.append(_parse(line))
+    return rows
+
+
+def _parse(line: str) -> Dict:
+    head, cumulative, name = line.split("|")
+    return {
+        "module": name.strip(),
+        "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        "self_ms": int(head.split(":")[1]) / 1000,
+        "cumulative_ms": int(cumulative) / 1000,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(app: str, path: str, timeout: float = 30.0) -> Optional[float]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                return None
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--app", default="app.main:azureVision")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="time-to-first-request runs, best is reported")
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    parser.add_argument("--skip-ttfr", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    rows = import_profile(args.module)
+    total = next(row["cumulative_ms"] for row in rows if row["module"] == args.module)
+    report = {
+        "import_ms": total,
+        "top_cumulative": sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[: args.top],
+        "top_self": sorted(rows, key=lambda row: row["self_ms"], reverse=True)[: args.top],
+    }
+    print(f"import {args.module}: {total:.1f} ms ({len(rows)} modules)\n")
+    for title, key in (("cumulative", "cumulative_ms"), ("self", "self_ms")):
+        print(f"top {args.top} by {title} time")
+        for row in report[f"top_{title}"]:
+            print(f"  {row[key]:8.1f} ms  {'  ' * row['depth']}{row['module']}")
+        print()
+
+    status = 0
+    if not args.skip_ttfr:
+        runs = [time_to_first_request(args.app, args.path) for _ in range(args.runs)]
+        served = [run for run in runs if run is not None]
+        report["time_to_first_request_ms"] = min(served) if served else None
+        if not served:
+            print("time to first request: server never answered (is the database reachable?)")
+            status = 1
+        else:
+            verdict = "ok" if min(served) <= args.budget_ms else "OVER BUDGET"
+            print(f"time to first request: {min(served):.0f} ms (budget {args.budget_ms:.0f} ms, {verdict})")
+            status = 0 if min(served) <= args.budget_ms else 1
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Micro-benchmarks for the CPU-bound hot paths, with JSON baselines.
+
+    python -m benchmarks.suite run                      # print timings
+    python -m benchmarks.suite run -k image --output out.json
+    python -m benchmarks.suite save                     # (re)record benchmarks/baselines/baseline.json
+    python -m benchmarks.suite save -k spatial          # re-record only these cases in the baseline
+    python -m benchmarks.suite compare                  # run and compare against the baseline
+    python -m benchmarks.suite compare out.json --threshold 0.15
+
+`compare` exits with status 1 when any case is slower than the baseline by
+more than the threshold (relative, on the best-of-N time). Baselines are only
+meaningful on the machine that recorded them: re-record after changing
+hardware, Python or dependency versions.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_BASELINE = BASELINE_DIR / "baseline.json"
+
+# (label, width, height): thumbnail, full HD screenshot, 12 MP phone photo.
+IMAGE_SIZES = (("small", 640, 480), ("medium", 1920, 1080), ("large", 4032, 3024))
+
+
+class Case(NamedTuple):
+    name: str
+    # Called once, returns the zero-argument callable that is timed.
+    setup: Callable[[], Callable[[], object]]
+
+
+CASES: List[Case] = []
+
+
+def case(name: str):
+    def register(setup):
+        CASES.append(Case(name, setup))
+        return setup
+
+    return register
+
+
+def document_image(width: int, height: int):
+    """
+    A synthetic scanned page: light background, noise and lines of text, so
+    JPEG has realistic work to do (flat images compress unrealistically fast).
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    image = np.full((height, width, 3), 235, dtype=np.uint8)
+    image += rng.integers(0, 20, size=image.shape, dtype=np.uint8)
+    scale = width / 1600
+    for row, y in enumerate(range(int(60 * scale), height, max(int(48 * scale), 12))):
+        text = f"INV-{row:04d}  TOTAL 1,100 JPY  2023-10-01  TEL 03-1234-5678"
+        cv2.putText(image, text, (int(40 * scale), y), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), 2)
+    return image
+
+
+def _register_image_cases():
+    for label, width, height in IMAGE_SIZES:
+
+        @case(f"image.encode.{label}")
+        def encode(width=width, height=height):
+            from app.helpers.converter import convert_image_to_bytes
+
+            image = document_image(width, height)
+            return lambda: convert_image_to_bytes(image)
+
+        @case(f"image.decode.{label}")
+        def decode(width=width, height=height):
+            # What /ocr/upload does with the uploaded bytes.
+            import cv2
+            import numpy as np
+
+            from app.helpers.converter import convert_image_to_bytes
+
+            raw = convert_image_to_bytes(document_image(width, height))
+            return lambda: cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+_register_image_cases()
+
+
+@case("encoder.read_result")
+def encoder_read_result():
+    from app.helpers.encoder import jsonable_encoder
+    from benchmarks.fixtures import load_read_result
+
+    payload = load_read_result()
+    return lambda: jsonable_encoder(payload)
+
+
+@case("response.success")
+def response_success():
+    from app.core.schema.base_response import BaseResponse
+    from benchmarks.fixtures import load_read_result
+
+    payload = load_read_result()
+    return lambda: BaseResponse.success(data=payload)
+
+
+@case("response.success_response")
+def response_success_response():
+    from app.core.schema.base_response import BaseResponse
+    from benchmarks.fixtures import load_read_result
+
+    payload = load_read_result()
+    return lambda: BaseResponse.success_response(data=payload).body
+
+
+@case("response.success_response.words")
+def response_success_response_words():
+    # The same payload projected to lines and words before encoding.
+    from app.core.enums.projection_enum import Projection
+    from app.core.projection.projection import project_read_result
+    from app.core.schema.base_response import BaseResponse
+    from benchmarks.fixtures import load_read_result
+
+    payload = load_read_result()
+    return lambda: BaseResponse.success_response(data=project_read_result(payload, Projection.WORDS)).body
+
+
+@case("response.gzip")
+def response_gzip():
+    from app.core.compression.middleware import _Compressor
+    from app.core.schema.orjson_response import dumps
+    from benchmarks.fixtures import load_read_result
+
+    body = dumps(load_read_result())
+    return lambda: _Compressor("gzip").compress(body, final=True)
+
+
+@case("receipt.extract_fields")
+def receipt_extract_fields():
+    # The mapping half of analyze_receipt, on a recorded/generated SDK result.
+    from app.core.azure.document_mapping import RECEIPT_MODEL, extract_fields
+    from benchmarks.fixtures import load_receipt_result
+
+    result = load_receipt_result()
+
+    def run():
+        entity = RECEIPT_MODEL.entity()
+        for document in result.documents:
+            extract_fields(document.fields, RECEIPT_MODEL.index, entity)
+        return entity
+
+    return run
+
+
+@case("spatial.build")
+def spatial_build():
+    # A dense page: 250 lines of 12 words.
+    from app.core.spatial.word_index import WordIndex
+    from benchmarks.fixtures import build_read_result
+
+    result = build_read_result(pages=1, lines_per_page=250)
+    return lambda: WordIndex.from_result(result)
+
+
+@case("spatial.region_query")
+def spatial_region_query():
+    # An invoice-number sized zone on the same page, answer included.
+    from app.core.spatial.word_index import WordIndex
+    from benchmarks.fixtures import build_read_result
+
+    index = WordIndex.from_result(build_read_result(pages=1, lines_per_page=250))
+    return lambda: index.query(1, (0.55, 0.1, 0.95, 0.13), relative=True)
+
+
+def _quiet_logger(level: str):
+    from loguru import logger
+
+    from app.utils.logger import Log
+
+    logger.remove()
+    logger.add(lambda message: None, level=level, format="{extra[business]} {message}")
+    Log.set_level(level)
+    return Log("Bench")
+
+
+@case("log.info.emitted")
+def log_info_emitted():
+    log = _quiet_logger("DEBUG")
+    payload = {"url_image": "https://example.png", "size": 1024}
+    return lambda: log.info("ocr_request: {}.", payload)
+
+
+@case("log.debug.filtered")
+def log_debug_filtered():
+    log = _quiet_logger("WARNING")
+    payload = {"url_image": "https://example.png", "size": 1024}
+    return lambda: log.debug("ocr_request: {}.", payload)
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    fn()  # warm caches, lazy imports and dispatch tables
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    # autorange targets ~0.2 s per repeat; scale to the requested budget.
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(times), "median": statistics.median(times), "number": number, "repeat": repeat}
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "commit": commit,
+    }
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5, min_time: float = 0.2) -> dict:
+    results = {}
+    for bench in CASES:
+        if pattern and pattern not in bench.name:
+            continue
+        results[bench.name] = measure(bench.setup(), repeat, min_time)
+        print(f"{bench.name:32} {results[bench.name]['best'] * 1e6:12.2f} us", file=sys.stderr)
+    return {"environment": environment(), "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    Print a comparison table and return the names of regressed cases.
+    """
+    regressions = []
+    print(f"{'case':32} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:32} {'-':>12} {result['best'] * 1e6:12.2f} {'new':>8}")
+            continue
+        change = result["best"] / base["best"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32} {base['best'] * 1e6:12.2f} {result['best'] * 1e6:12.2f} {change:+8.1%}{flag}")
+    if baseline["environment"].get("platform") != current["environment"].get("platform"):
+        print("warning: baseline was recorded on a different platform", file=sys.stderr)
+    return regressions
+
+
+def load(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def merge(path: Path, report: dict) -> dict:
+    """
+    `report` on top of the baseline at `path`, so `save -k` keeps the other cases.
+    """
+    if not Path(path).exists():
+        return report
+    results = dict(load(path)["results"], **report["results"])
+    return {"environment": report["environment"], "results": results}
+
+
+def write(path: Path, report: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "save", "compare"):
+        command = commands.add_parser(name)
+        command.add_argument("-k", dest="pattern", help="only cases whose name contains this")
+        command.add_argument("--repeat", type=int, default=5)
+        command.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    commands.choices["run"].add_argument("--output", type=Path)
+    commands.choices["save"].add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    commands.choices["compare"].add_argument("current", nargs="?", type=Path, help="report from `run --output`")
+    commands.choices["compare"].add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    commands.choices["compare"].add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare" and args.current:
+        report = load(args.current)
+    else:
+        report = run(args.pattern, args.repeat, args.min_time)
+
+    if args.command == "run":
+        if args.output:
+            write(args.output, report)
+        else:
+            print(json.dumps(report, indent=2))
+    elif args.command == "save":
+        write(args.baseline, merge(args.baseline, report))
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+    else:
+        regressions = compare(load(args.baseline), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
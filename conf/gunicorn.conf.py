@@ -0,0 +1,54 @@
+"""
+Production launcher: gunicorn master with uvicorn workers.
+
+    gunicorn -c conf/gunicorn.conf.py app.main:azureVision
+
+The app is imported once in the master (preload) and the heap frozen before
+forking, so workers share the imported modules copy-on-write. Anything that
+owns sockets or threads is created per worker after the fork.
+"""
+import gc
+import os
+
+# Workers serve one process each; aggregate /metrics through a shared snapshot directory.
+os.environ.setdefault("METRICS_DIR", "/tmp/azure-vision-metrics")
+
+from app.config.config import Config  # noqa: E402
+from app.core.metrics.registry import REGISTRY  # noqa: E402
+from app.helpers.system import available_cpus  # noqa: E402
+
+bind = f"{Config.SERVER_HOST}:{Config.SERVER_PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Azure calls run in worker threads, so one event loop per core keeps them all busy.
+workers = Config.SERVER_WORKERS or available_cpus()
+
+preload_app = True
+max_requests = Config.SERVER_MAX_REQUESTS
+# Stagger recycling so workers do not restart together.
+max_requests_jitter = Config.SERVER_MAX_REQUESTS_JITTER
+keepalive = Config.SERVER_KEEPALIVE
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+
+# DB engine, Redis and the Azure clients are created lazily inside each worker,
+# never in the preloading master.
+forwarded_allow_ips = "*"
+accesslog = None
+
+
+def when_ready(server):
+    # Runs in the master after the preload, right before the first fork.
+    gc.collect()
+    gc.freeze()
+    server.log.info("preloaded app, %d objects frozen, starting %d workers", gc.get_freeze_count(), workers)
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be summed into this one.
+    REGISTRY.configure(Config.METRICS_DIR)
+    REGISTRY.clear()
+
+
+def child_exit(server, worker):
+    # Runs in the master for every exited worker, recycled (max_requests) or killed.
+    REGISTRY.retire(worker.pid)
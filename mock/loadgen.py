@@ -0,0 +1,212 @@
+"""
+Open-loop load generator for the OCR and receipt endpoints.
+
+    python -m mock.loadgen --rps 20 --duration 60
+    python -m mock.loadgen --base-url http://localhost:8082 --rps 50 --mix ocr_upload=3,ocr_url=1,receipt_upload=1 \
+        --output report.json
+
+Requests are started on a fixed schedule regardless of how fast responses
+come back, and latency is measured from the scheduled start, so a server that
+falls behind shows up in the percentiles instead of silently lowering the
+offered load. Pair with `python -m mock.server` and MOCK_ON=True to test
+without Azure.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.config.config import Config
+
+SCENARIOS = ("ocr_upload", "ocr_url", "receipt_upload")
+
+
+@dataclass
+class ScenarioStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+    def record(self, latency: float, error: Optional[str]):
+        self.latencies.append(latency)
+        if error:
+            self.errors[error] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        errors = sum(self.errors.values())
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "errors": dict(self.errors),
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": round(latencies[-1] * 1000, 1) if latencies else None,
+            },
+        }
+
+
+def percentile(ordered: List[float], pct: float) -> Optional[float]:
+    # Nearest-rank, in milliseconds.
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[rank] * 1000, 1)
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def classify(response: httpx.Response) -> Optional[str]:
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    try:
+        body = response.json()
+    except ValueError:
+        return "invalid_json"
+    data = body.get("data") if isinstance(body, dict) else None
+    # extract_text_from_images hands back ("Error:", status, text) when Azure rejects the call.
+    if isinstance(data, list) and data[:1] == ["Error:"]:
+        return f"azure_{data[1]}"
+    return None
+
+
+def build_requests(image: bytes, image_url: str) -> Dict[str, Callable[[httpx.AsyncClient], object]]:
+    return {
+        "ocr_upload": lambda client: client.post("/ocr/upload", files={"file": ("document.jpg", image, "image/jpeg")}),
+        "ocr_url": lambda client: client.post("/ocr/", json={"url_image": image_url}),
+        "receipt_upload": lambda client: client.post(
+            "/receipt/upload", files={"file": ("receipt.jpg", image, "image/jpeg")}
+        ),
+    }
+
+
+async def run(
+    base_url: str,
+    rps: float,
+    duration: float,
+    mix: Dict[str, int],
+    image: bytes,
+    image_url: str,
+    timeout: float = 60.0,
+    max_in_flight: int = 1000,
+) -> dict:
+    senders = build_requests(image, image_url)
+    # Weighted round robin keeps the mix exact for short runs.
+    schedule = [name for name, weight in mix.items() for _ in range(weight)]
+    stats = {name: ScenarioStats() for name in mix}
+    total = int(rps * duration)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def fire(name: str, scheduled: float):
+            async with in_flight:
+                try:
+                    response = await senders[name](client)
+                    error = classify(response)
+                except httpx.TimeoutException:
+                    error = "timeout"
+                except httpx.HTTPError as e:
+                    error = type(e).__name__
+                stats[name].record(time.perf_counter() - scheduled, error)
+
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(schedule[i % len(schedule)], scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    overall = ScenarioStats()
+    for scenario in stats.values():
+        overall.latencies.extend(scenario.latencies)
+        overall.errors.update(scenario.errors)
+    return {
+        "target_rps": rps,
+        "duration_s": round(elapsed, 2),
+        "overall": overall.summary(elapsed),
+        "scenarios": {name: scenario.summary(elapsed) for name, scenario in stats.items()},
+    }
+
+
+def print_report(report: dict):
+    print(f"target {report['target_rps']} rps over {report['duration_s']} s")
+    print(f"{'scenario':16} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    rows = dict(report["scenarios"], overall=report["overall"])
+    for name, row in rows.items():
+        latency = row["latency_ms"]
+        print(
+            f"{name:16} {row['requests']:7} {row['throughput_rps']:8.2f} {latency['p50'] or 0:9.1f} "
+            f"{latency['p95'] or 0:9.1f} {latency['p99'] or 0:9.1f} {row['error_rate']:8.2%}"
+        )
+    if report["overall"]["errors"]:
+        print("errors:", ", ".join(f"{kind}={count}" for kind, count in report["overall"]["errors"].items()))
+
+
+def load_image(path: Optional[Path]) -> bytes:
+    if path:
+        return path.read_bytes()
+    from app.helpers.converter import convert_image_to_bytes
+    from benchmarks.suite import document_image
+
+    return convert_image_to_bytes(document_image(1240, 1754))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m mock.loadgen")
+    parser.add_argument("--base-url", default=f"http://127.0.0.1:{Config.SERVER_PORT}")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("ocr_upload=2,ocr_url=1,receipt_upload=1"))
+    parser.add_argument("--image", type=Path, help="image to upload, defaults to a generated A4 page")
+    parser.add_argument(
+        "--image-url",
+        default=f"http://{Config.MOCK_HOST}:{Config.PROXY_PORT}/images/document.jpg",
+        help="url_image sent to /ocr/",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run(
+            args.base_url,
+            args.rps,
+            args.duration,
+            args.mix,
+            load_image(args.image),
+            args.image_url,
+            args.timeout,
+            args.max_in_flight,
+        )
+    )
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
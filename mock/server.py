@@ -0,0 +1,397 @@
+"""
+Local stand-in for the Azure APIs this service calls.
+
+    python -m mock.server                                   # listen on PROXY_PORT
+    python -m mock.server --read-latency lognormal:900:0.35 --tps 10 --throttle-rate 0.02 --error-rate 0.01
+    python -m mock.server --proxy                           # forward to Azure and record responses
+
+Speaks the Image Analysis `read` API (POST .../imageanalysis:analyze) and the
+Form Recognizer analyze/poll long-running operation (POST
+.../documentModels/{model}:analyze -> 202 + Operation-Location, then GET until
+"succeeded"). Responses come from mock/recordings when present, otherwise from
+the generated payloads in benchmarks.fixtures. Start the API with MOCK_ON=True
+to point it here.
+
+Latency specs are `fixed:MS`, `uniform:MIN_MS:MAX_MS` or `lognormal:MEDIAN_MS:SIGMA`.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.config.config import Config
+from benchmarks.fixtures import build_receipt_result, load_read_result
+
+RECORDING_DIR = Path(__file__).parent / "recordings"
+FORM_RECOGNIZER_API_VERSION = "2023-07-31"
+
+
+@dataclass(frozen=True)
+class Latency:
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, args = spec.partition(":")
+        values = [float(value) for value in args.split(":") if value]
+        if kind not in ("fixed", "uniform", "lognormal") or not values:
+            raise argparse.ArgumentTypeError(f"invalid latency spec: {spec!r}")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Seconds to wait for one call.
+        """
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b) / 1000
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) / 1000
+        return self.a / 1000
+
+
+class TokenBucket(object):
+    """
+    Admission control mirroring Azure's per-resource TPS limit.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class MockSettings:
+    read_latency: Latency = Latency("lognormal", 900, 0.35)
+    submit_latency: Latency = Latency("fixed", 80)
+    analyze_latency: Latency = Latency("lognormal", 2500, 0.3)
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    tps: float = 0.0
+    proxy: bool = False
+    seed: Optional[int] = None
+
+
+@dataclass
+class Operation:
+    model_id: str
+    ready_at: float
+    created: str
+    upstream: Optional[str] = None
+
+
+@dataclass
+class MockState:
+    settings: MockSettings
+    rng: random.Random
+    buckets: Dict[str, TokenBucket]
+    operations: Dict[str, Operation] = field(default_factory=dict)
+    ids = itertools.count(1)
+
+
+# Form Recognizer REST field shape, from the SDK `to_dict()` shape used by the fixtures.
+VALUE_KEYS = {
+    "string": ("string", "valueString"),
+    "date": ("date", "valueDate"),
+    "time": ("time", "valueTime"),
+    "phoneNumber": ("phoneNumber", "valuePhoneNumber"),
+    "float": ("number", "valueNumber"),
+    "integer": ("integer", "valueInteger"),
+    "selectionMark": ("selectionMark", "valueSelectionMark"),
+    "countryRegion": ("countryRegion", "valueCountryRegion"),
+    "signature": ("signature", "valueSignature"),
+}
+
+
+def _camel(name: str) -> str:
+    head, *tail = name.split("_")
+    return head + "".join(part.title() for part in tail)
+
+
+def _rest_regions(regions) -> list:
+    return [
+        {
+            "pageNumber": region["page_number"],
+            "polygon": [c for point in region["polygon"] for c in (point["x"], point["y"])],
+        }
+        for region in regions or ()
+    ]
+
+
+def to_rest_field(data: dict) -> dict:
+    value_type, value = data["value_type"], data["value"]
+    rest = {
+        "content": data.get("content"),
+        "boundingRegions": _rest_regions(data.get("bounding_regions")),
+        "spans": data.get("spans") or [],
+        "confidence": data.get("confidence"),
+    }
+    if value_type == "currency":
+        rest.update(
+            type="currency",
+            valueCurrency={
+                "amount": value["amount"],
+                "currencySymbol": value.get("symbol"),
+                "currencyCode": value.get("code"),
+            },
+        )
+    elif value_type == "address":
+        rest.update(type="address", valueAddress={_camel(k): v for k, v in value.items() if v is not None})
+    elif value_type == "list":
+        rest.update(type="array", valueArray=[to_rest_field(item) for item in value])
+    elif value_type == "dictionary":
+        rest.update(type="object", valueObject={name: to_rest_field(item) for name, item in value.items()})
+    else:
+        rest_type, key = VALUE_KEYS[value_type]
+        rest.update({"type": rest_type, key: value})
+    return rest
+
+
+def to_rest_analyze_result(result: dict) -> dict:
+    return {
+        "apiVersion": result["api_version"],
+        "modelId": result["model_id"],
+        "stringIndexType": "textElements",
+        "content": result["content"],
+        "pages": result["pages"],
+        "documents": [
+            {
+                "docType": document["doc_type"],
+                "boundingRegions": _rest_regions(document["bounding_regions"]),
+                "spans": document["spans"],
+                "fields": {name: to_rest_field(value) for name, value in document["fields"].items()},
+                "confidence": document["confidence"],
+            }
+            for document in result["documents"]
+        ],
+    }
+
+
+def _recording(name: str) -> Optional[dict]:
+    path = RECORDING_DIR / name
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return None
+
+
+def _record(name: str, body: dict):
+    RECORDING_DIR.mkdir(exist_ok=True)
+    (RECORDING_DIR / name).write_text(json.dumps(body, ensure_ascii=False), encoding="utf-8")
+
+
+def azure_error(status: int, code: str, message: str, retry_after: Optional[float] = None) -> JSONResponse:
+    headers = {"Retry-After": f"{retry_after:g}"} if retry_after is not None else None
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status, headers=headers)
+
+
+def inject_fault(state: MockState, api: str) -> Optional[JSONResponse]:
+    """
+    The 429/5xx a real resource might answer with, or None to serve the call.
+    """
+    settings, rng = state.settings, state.rng
+    if not state.buckets[api].take() or rng.random() < settings.throttle_rate:
+        return azure_error(
+            429, "429", "Requests to the API have exceeded the call rate limit of your current pricing tier.", 1
+        )
+    if rng.random() < settings.error_rate:
+        status = rng.choice((500, 503))
+        return azure_error(status, "InternalServerError", "An unexpected error occurred.")
+    return None
+
+
+def _upstream():
+    # A fresh settings object still carries the real endpoints: MOCK_ON only rewrites the module-level Config.
+    return type(Config)()
+
+
+async def analyze_image(request: Request):
+    state: MockState = request.app.state.mock
+    fault = inject_fault(state, "read")
+    if fault is not None:
+        return fault
+    body = await request.body()
+
+    if state.settings.proxy:
+        async with httpx.AsyncClient(timeout=60) as client:
+            upstream = await client.post(
+                _upstream().AZURE_VISION_ENDPOINT.rstrip("/") + request.url.path,
+                params=request.query_params,
+                headers={
+                    k: v
+                    for k, v in request.headers.items()
+                    if k.lower() in ("content-type", "ocp-apim-subscription-key")
+                },
+                content=body,
+            )
+        if upstream.status_code == 200:
+            _record("read_result.json", upstream.json())
+        return Response(upstream.content, upstream.status_code, media_type="application/json")
+
+    if not body:
+        return azure_error(400, "InvalidRequest", "The request body is empty.")
+    await asyncio.sleep(state.settings.read_latency.sample(state.rng))
+    return JSONResponse(request.app.state.read_result)
+
+
+async def begin_analyze_document(request: Request):
+    state: MockState = request.app.state.mock
+    model_id = request.path_params["model_id"]
+    fault = inject_fault(state, "form_recognizer")
+    if fault is not None:
+        return fault
+    body = await request.body()
+    now = time.time()
+    result_id = f"{next(MockState.ids):08d}-mock"
+    location = f"{request.base_url}formrecognizer/documentModels/{model_id}/analyzeResults/{result_id}"
+    created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+
+    if state.settings.proxy:
+        async with httpx.AsyncClient(timeout=60) as client:
+            upstream = await client.post(
+                _upstream().AZURE_FORM_RECOGNIZER_ENDPOINT.rstrip("/") + request.url.path,
+                params=request.query_params,
+                headers={
+                    k: v
+                    for k, v in request.headers.items()
+                    if k.lower() in ("content-type", "ocp-apim-subscription-key")
+                },
+                content=body,
+            )
+        if upstream.status_code != 202:
+            return Response(upstream.content, upstream.status_code, media_type="application/json")
+        state.operations[result_id] = Operation(model_id, now, created, upstream.headers["Operation-Location"])
+    else:
+        await asyncio.sleep(state.settings.submit_latency.sample(state.rng))
+        state.operations[result_id] = Operation(
+            model_id, now + state.settings.analyze_latency.sample(state.rng), created
+        )
+
+    return Response(
+        status_code=202,
+        headers={
+            "Operation-Location": f"{location}?api-version={FORM_RECOGNIZER_API_VERSION}",
+            "apim-request-id": result_id,
+        },
+    )
+
+
+async def get_analyze_result(request: Request):
+    state: MockState = request.app.state.mock
+    operation = state.operations.get(request.path_params["result_id"])
+    if operation is None:
+        return azure_error(404, "NotFound", "Resource not found.")
+
+    if operation.upstream:
+        async with httpx.AsyncClient(timeout=60) as client:
+            upstream = await client.get(
+                operation.upstream,
+                headers={"Ocp-Apim-Subscription-Key": request.headers.get("ocp-apim-subscription-key", "")},
+            )
+        body = upstream.json()
+        if body.get("status") == "succeeded":
+            _record("receipt_result.json", body["analyzeResult"])
+        return JSONResponse(
+            body, upstream.status_code, headers={"Retry-After": upstream.headers.get("Retry-After", "1")}
+        )
+
+    body = {"status": "running", "createdDateTime": operation.created, "lastUpdatedDateTime": operation.created}
+    remaining = operation.ready_at - time.time()
+    if remaining > 0:
+        # Fractional Retry-After keeps the SDK poller's wait close to the configured latency.
+        return JSONResponse(body, headers={"Retry-After": f"{max(remaining, 0.05):.3f}"})
+    state.operations.pop(request.path_params["result_id"])
+    body.update(status="succeeded", analyzeResult=request.app.state.receipt_result)
+    return JSONResponse(body)
+
+
+async def document_image(request: Request):
+    # Target for /ocr/ url_image in load tests.
+    return Response(request.app.state.image, media_type="image/jpeg")
+
+
+def create_app(settings: MockSettings) -> Starlette:
+    app = Starlette(
+        routes=[
+            Route("/computervision/imageanalysis:analyze", analyze_image, methods=["POST"]),
+            Route("/formrecognizer/documentModels/{model_id}:analyze", begin_analyze_document, methods=["POST"]),
+            Route(
+                "/formrecognizer/documentModels/{model_id}/analyzeResults/{result_id}",
+                get_analyze_result,
+                methods=["GET"],
+            ),
+            Route("/images/document.jpg", document_image, methods=["GET"]),
+        ]
+    )
+    app.state.mock = MockState(
+        settings,
+        random.Random(settings.seed),
+        {"read": TokenBucket(settings.tps), "form_recognizer": TokenBucket(settings.tps)},
+    )
+    app.state.read_result = _recording("read_result.json") or load_read_result()
+    app.state.receipt_result = _recording("receipt_result.json") or to_rest_analyze_result(build_receipt_result())
+    app.state.image = sample_image()
+    return app
+
+
+def sample_image() -> bytes:
+    from app.helpers.converter import convert_image_to_bytes
+    from benchmarks.suite import document_image as render
+
+    return convert_image_to_bytes(render(1240, 1754))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m mock.server")
+    parser.add_argument("--host", default=Config.MOCK_HOST)
+    parser.add_argument("--port", type=int, default=Config.PROXY_PORT)
+    parser.add_argument("--read-latency", type=Latency.parse, default=MockSettings.read_latency)
+    parser.add_argument("--submit-latency", type=Latency.parse, default=MockSettings.submit_latency)
+    parser.add_argument("--analyze-latency", type=Latency.parse, default=MockSettings.analyze_latency)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 500/503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--tps", type=float, default=0.0, help="per-API transactions per second, 0 = unlimited")
+    parser.add_argument("--proxy", action="store_true", default=Config.PROXY_ON, help="forward to Azure and record")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    settings = MockSettings(
+        read_latency=args.read_latency,
+        submit_latency=args.submit_latency,
+        analyze_latency=args.analyze_latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        tps=args.tps,
+        proxy=args.proxy,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
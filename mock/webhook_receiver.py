@@ -0,0 +1,101 @@
+"""
+Local webhook receiver for testing callbacks end to end.
+
+    python -m mock.webhook_receiver                       # listen on 127.0.0.1:5680
+    python -m mock.webhook_receiver --fail-rate 0.3 --latency uniform:50:400
+
+Point a job at it with `?callback_url=http://127.0.0.1:5680/hooks/<name>`.
+Every POST is checked against the signing secret of the API configuration
+and answered 204, or 401 when the signature is wrong. --fail-rate answers a
+share of valid deliveries with 503 to exercise retries. GET /hooks lists
+what was received, with duplicates (retries of a delivered id) counted.
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import orjson
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.core.webhook.signing import SIGNATURE_HEADER, TIMESTAMP_HEADER, verify, webhook_secret
+from mock.server import Latency
+
+
+@dataclass
+class ReceiverState:
+    secret: str
+    fail_rate: float
+    latency: Latency
+    rng: random.Random
+    received: List[dict] = field(default_factory=list)
+    delivered: Dict[str, int] = field(default_factory=dict)
+
+
+async def receive(request: Request):
+    state: ReceiverState = request.app.state.receiver
+    body = await request.body()
+    await asyncio.sleep(state.latency.sample(state.rng))
+
+    delivery_id = request.headers.get("x-webhook-id", "")
+    entry = {
+        "hook": request.path_params["name"],
+        "id": delivery_id,
+        "event": request.headers.get("x-webhook-event"),
+        "received_at": time.time(),
+        "bytes": len(body),
+    }
+    if not verify(body, request.headers.get(TIMESTAMP_HEADER), request.headers.get(SIGNATURE_HEADER), state.secret):
+        state.received.append(dict(entry, status=401))
+        return JSONResponse({"error": "bad signature"}, 401)
+    if state.rng.random() < state.fail_rate:
+        state.received.append(dict(entry, status=503))
+        return Response(status_code=503)
+
+    state.delivered[delivery_id] = state.delivered.get(delivery_id, 0) + 1
+    payload = orjson.loads(body)
+    entry.update(status=204, code=payload.get("code"), meta=payload.get("meta"))
+    state.received.append(entry)
+    print(f"{entry['event']} {delivery_id} code={entry['code']} {len(body)} bytes")
+    return Response(status_code=204)
+
+
+async def list_received(request: Request):
+    state: ReceiverState = request.app.state.receiver
+    duplicates = sum(count - 1 for count in state.delivered.values())
+    return JSONResponse({"delivered": len(state.delivered), "duplicates": duplicates, "received": state.received})
+
+
+def create_app(state: ReceiverState) -> Starlette:
+    app = Starlette(
+        routes=[
+            Route("/hooks", list_received, methods=["GET"]),
+            Route("/hooks/{name}", receive, methods=["POST"]),
+        ]
+    )
+    app.state.receiver = state
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m mock.webhook_receiver")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5680)
+    parser.add_argument("--secret", default=webhook_secret(), help="defaults to the API's signing secret")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of deliveries answered with 503")
+    parser.add_argument("--latency", type=Latency.parse, default=Latency())
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    state = ReceiverState(args.secret, args.fail_rate, args.latency, random.Random(args.seed))
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
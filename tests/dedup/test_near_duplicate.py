@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.config.config import Config
+from app.core.cache.result_cache import ResultCache
+from app.core.dedup import near_duplicate
+from app.core.dedup.near_duplicate import Fingerprint, NearDuplicateIndex, fingerprint
+
+HEADER = ["SEVEN-ELEVEN", "Tokyo Shibuya 1-2-3", "TEL 03-1234-5678", "2023-10-01 12:34"]
+
+
+def receipt(items, total) -> np.ndarray:
+    image = np.full((1200, 600, 3), 255, np.uint8)
+    y = 60
+    for text in HEADER:
+        cv2.putText(image, text, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2)
+        y += 50
+    y += 40
+    for name, price in items:
+        cv2.putText(image, name, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+        cv2.putText(image, str(price), (440, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+        y += 45
+    cv2.putText(image, "TOTAL", (40, y + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    cv2.putText(image, str(total), (440, y + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    return image
+
+
+def jpeg(image: np.ndarray, quality: int) -> np.ndarray:
+    return cv2.imdecode(cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+
+ORIGINAL = receipt([("Green tea", 150), ("Onigiri", 180), ("Sandwich", 150)], 480)
+LOOK_ALIKES = {
+    "other items": receipt([("Coffee", 200), ("Onigiri", 180), ("Salad", 160)], 540),
+    "other total": receipt([("Green tea", 150), ("Onigiri", 180), ("Sandwich", 150)], 540),
+}
+COPIES = {
+    "jpeg": jpeg(ORIGINAL, 40),
+    "half size": cv2.resize(ORIGINAL, (300, 600), interpolation=cv2.INTER_AREA),
+    "darker": np.clip(ORIGINAL.astype(int) - 15, 0, 255).astype(np.uint8),
+}
+
+
+class FakeRedis(object):
+    """
+    The strings, sorted sets and pipelines the index uses, in memory.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.queued = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def zrangebyscore(self, key, low, high):
+        self.queued.append([m for m, score in self.sets.get(key, {}).items() if score >= low])
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.queued.append(True)
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+        self.queued.append(len(mapping))
+
+    def zremrangebyscore(self, key, low, high):
+        self.queued.append(0)
+
+    def expire(self, key, ttl):
+        self.queued.append(True)
+
+    async def execute(self):
+        queued, self.queued = self.queued, []
+        return queued
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+@pytest.fixture
+def index(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(near_duplicate, "get_redis", lambda: redis)
+    monkeypatch.setattr("app.core.cache.result_cache.get_redis", lambda: redis)
+    monkeypatch.setattr(Config, "REDIS_ON", True)
+    monkeypatch.setattr(Config, "NEAR_DUP_ON", True)
+    return NearDuplicateIndex("test", ResultCache("test"))
+
+
+@pytest.mark.parametrize("name", LOOK_ALIKES)
+def test_look_alike_receipts_are_not_confirmed(name):
+    original, other = fingerprint(ORIGINAL), fingerprint(LOOK_ALIKES[name])
+    # The hashes alone cannot tell them apart.
+    assert original.distance(other) <= int(64 * (1 - Config.NEAR_DUP_MIN_SIMILARITY))
+    assert original.difference(other) > Config.NEAR_DUP_MAX_DIFFERENCE
+
+
+@pytest.mark.parametrize("name", COPIES)
+def test_copies_are_confirmed(name):
+    assert fingerprint(ORIGINAL).difference(fingerprint(COPIES[name])) <= Config.NEAR_DUP_MAX_DIFFERENCE
+
+
+def test_fingerprints_round_trip_and_old_ones_never_confirm():
+    fp = fingerprint(ORIGINAL)
+    assert Fingerprint.decode(fp.encode()) == fp
+    old = Fingerprint.decode(f"{fp.phash:016x}:{fp.dhash:016x}")
+    assert old.thumb == b"" and fp.difference(old) == float("inf")
+
+
+@pytest.mark.asyncio
+async def test_lookup_reuses_only_a_confirmed_match(index):
+    await index.results.put("original", {"content": "TOTAL 480"})
+    await index.add("original", fingerprint(ORIGINAL))
+
+    for image in LOOK_ALIKES.values():
+        assert await index.lookup(fingerprint(image)) is None
+    match = await index.lookup(fingerprint(COPIES["jpeg"]))
+    assert match is not None and match.document_id == "original"
+    assert match.result == {"content": "TOTAL 480"}
+
+
+def test_receipt_index_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(Config, "REDIS_ON", True)
+    assert near_duplicate.OCR_NEAR_DUPLICATES.enabled
+    assert not near_duplicate.RECEIPT_NEAR_DUPLICATES.enabled
@@ -0,0 +1,72 @@
+from app.core.document.tiling import merge_tile_results, plan_tiles
+
+
+def rect(left: float, top: float, right: float, bottom: float) -> list:
+    return [left, top, right, top, right, bottom, left, bottom]
+
+
+def word(content: str, box: list, offset: int) -> dict:
+    return {
+        "content": content,
+        "boundingBox": box,
+        "confidence": 0.9,
+        "span": {"offset": offset, "length": len(content)},
+    }
+
+
+def line(content: str, box: list, offset: int) -> dict:
+    return {"content": content, "boundingBox": box, "spans": [{"offset": offset, "length": len(content)}]}
+
+
+def read_result(lines: list, words: list) -> dict:
+    return {
+        "modelVersion": "2023-02-01-preview",
+        "readResult": {"pages": [{"angle": 0.0, "lines": lines, "words": words}]},
+    }
+
+
+def merged_page(tiles, results, width=1500, height=100) -> dict:
+    return merge_tile_results(tiles, results, width, height)["readResult"]
+
+
+def test_cores_split_the_overlap():
+    tiles = plan_tiles(1500, 100, 1000, 500)
+    assert [(tile.x, tile.width) for tile in tiles] == [(0, 1000), (500, 1000)]
+    assert [tile.core for tile in tiles] == [(0, 0, 750.0, 100), (750.0, 0, 1500, 100)]
+
+
+def test_words_of_a_line_owned_by_the_neighbour_keep_their_span():
+    tiles = plan_tiles(1500, 100, 1000, 500)
+    # "alpha beta" is centred on the core boundary and belongs to the right tile,
+    # while its "alpha" is centred in the left core. Another "alpha" comes first.
+    left = read_result(
+        [line("alpha", rect(50, 10, 150, 30), 0), line("alpha beta", rect(600, 50, 900, 70), 6)],
+        [
+            word("alpha", rect(50, 10, 150, 30), 0),
+            word("alpha", rect(600, 50, 700, 70), 6),
+            word("beta", rect(800, 50, 900, 70), 12),
+        ],
+    )
+    right = read_result(
+        [line("alpha beta", rect(100, 50, 400, 70), 0)],
+        [word("alpha", rect(100, 50, 200, 70), 0), word("beta", rect(300, 50, 400, 70), 6)],
+    )
+    result = merged_page(tiles, [left, right])
+    page = result["pages"][0]
+
+    assert result["content"] == "alpha\nalpha beta"
+    assert [(w["content"], w["span"]["offset"]) for w in page["words"]] == [("alpha", 0), ("alpha", 6), ("beta", 12)]
+    for w in page["words"]:
+        assert result["content"][w["span"]["offset"] :][: w["span"]["length"]] == w["content"]  # noqa: E203
+    assert page["words"][1]["boundingBox"] == rect(600, 50, 700, 70)
+    assert [ln["spans"] for ln in page["lines"]] == [[{"offset": 0, "length": 5}], [{"offset": 6, "length": 10}]]
+
+
+def test_word_outside_every_line_gets_its_own_content_line():
+    tiles = plan_tiles(1500, 100, 1000, 500)
+    left = read_result([line("total", rect(50, 10, 150, 30), 0)], [word("total", rect(50, 10, 150, 30), 0)])
+    right = read_result([], [word("1100", rect(700, 10, 800, 30), 0)])
+    result = merged_page(tiles, [left, right])
+
+    assert result["content"] == "total\n1100"
+    assert [(w["content"], w["span"]["offset"]) for w in result["pages"][0]["words"]] == [("total", 0), ("1100", 6)]
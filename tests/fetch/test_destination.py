@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.core.fetch.destination import destination_allowed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "host", ["127.0.0.1", "localhost", "169.254.169.254", "10.0.0.1", "192.168.1.10", "::1", "[::ffff:127.0.0.1]", ""]
+)
+async def test_internal_hosts_are_refused_by_default(host):
+    assert not await destination_allowed(host, [])
+
+
+@pytest.mark.asyncio
+async def test_public_addresses_are_allowed_by_default():
+    assert await destination_allowed("8.8.8.8", [])
+
+
+@pytest.mark.asyncio
+async def test_allowlist_admits_only_listed_hosts():
+    assert await destination_allowed("127.0.0.1", ["127.0.0.1"])
+    assert await destination_allowed("img.example.com", ["example.com"])
+    assert not await destination_allowed("8.8.8.8", ["example.com"])
+    assert not await destination_allowed("badexample.com", ["example.com"])
+
+
+@pytest.mark.asyncio
+async def test_connections_go_to_the_checked_address(monkeypatch):
+    from httpcore.backends.auto import AutoBackend
+
+    from app.core.fetch import destination
+    from app.core.fetch.fetcher import FetchError, ImageFetcher
+    from app.core.schema.error_schema import ErrorCode
+
+    # The name resolves to a public address when checked and to loopback afterwards (DNS rebinding).
+    answers = {"rebind.example": ["93.184.216.34"], "internal.example": ["10.0.0.5"]}
+    monkeypatch.setattr(destination, "resolve", lambda host: asyncio.sleep(0, answers[host]))
+    connected = []
+
+    async def connect_tcp(self, host, port, timeout=None, **options):
+        connected.append((host, port))
+        raise OSError("test stops here")
+
+    monkeypatch.setattr(AutoBackend, "connect_tcp", connect_tcp)
+    fetcher = ImageFetcher()
+    try:
+        with pytest.raises(FetchError) as refused:
+            await fetcher.fetch("http://internal.example/receipt.png", conditional=False)
+        assert refused.value.error == ErrorCode.URL_NOT_ALLOWED
+        assert connected == []
+
+        with pytest.raises(FetchError) as failed:
+            await fetcher.fetch("http://rebind.example:8080/receipt.png", conditional=False)
+        assert failed.value.error == ErrorCode.URL_FETCH_FAILED
+        assert connected == [("93.184.216.34", 8080)]
+    finally:
+        await fetcher.close()
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.helpers.limits import KeyedSemaphore
+
+
+@pytest.mark.asyncio
+async def test_idle_keys_are_dropped():
+    hosts = KeyedSemaphore(2)
+
+    async def job(host: str):
+        async with hosts(host):
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(job(f"{i}.example") for i in range(50)))
+    assert len(hosts) == 0
+
+
+@pytest.mark.asyncio
+async def test_one_key_never_exceeds_its_value():
+    hosts = KeyedSemaphore(2)
+    running, peak = 0, 0
+
+    async def job():
+        nonlocal running, peak
+        async with hosts("a.example"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(job() for _ in range(6)))
+    assert peak == 2
+    assert len(hosts) == 0
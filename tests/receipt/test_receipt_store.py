@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from azure.ai.formrecognizer import CurrencyValue, DocumentField
+from sqlalchemy.dialects import mysql
+
+from app.core.azure.document_mapping import RECEIPT_MODEL, extract_fields
+from app.core.database.models import ReceiptRecord
+from app.core.receipt.receipt_store import correct_receipt, store_receipt, to_amount, to_decimal
+
+
+def yen(amount: float) -> DocumentField:
+    return DocumentField(
+        value_type="currency", value=CurrencyValue(amount=amount, symbol="¥", code="JPY"), confidence=0.9
+    )
+
+
+def text(value: str) -> DocumentField:
+    return DocumentField(value_type="string", value=value, confidence=0.9)
+
+
+def analyzed_receipt(**money: float):
+    # What analyze_document builds from a prebuilt-receipt result.
+    fields = {
+        "MerchantName": text("セブン-イレブン"),
+        "TransactionDate": DocumentField(value_type="date", value=date(2023, 10, 1), confidence=0.9),
+        "Items": DocumentField(
+            value_type="list",
+            value=[
+                DocumentField(
+                    value_type="dictionary",
+                    value={"Description": text("お茶"), "Quantity": DocumentField(value=2.0), "TotalPrice": yen(300)},
+                )
+            ],
+        ),
+    }
+    fields.update({name: yen(amount) for name, amount in money.items()})
+    return extract_fields(fields, RECEIPT_MODEL.index, RECEIPT_MODEL.entity())
+
+
+class FakeSession(object):
+    """
+    Just enough of AsyncSession for store_receipt: one row per id, and the
+    rollup upserts compiled for MySQL so their values can be checked.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.rollups = []
+        self.commits = 0
+
+    async def get(self, model, key, with_for_update=False):
+        return self.rows.get(key)
+
+    def add(self, record):
+        self.rows[record.id] = record
+
+    async def execute(self, statement):
+        self.rollups.append(statement.compile(dialect=mysql.dialect()).params)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def test_to_decimal_reads_currency_values():
+    assert to_decimal(CurrencyValue(amount=1100.0, symbol="¥", code="JPY")) == Decimal("1100.0")
+    assert to_decimal("1100.0") == Decimal("1100.0")
+    assert to_decimal(2.5) == Decimal("2.5")
+    assert to_decimal(None) is None
+    assert to_decimal("") is None
+
+
+@pytest.mark.parametrize("value", ["¥1100.0", "n/a", "NaN", float("inf")])
+def test_to_decimal_refuses_non_amounts(value):
+    with pytest.raises(ValueError):
+        to_decimal(value)
+
+
+def test_to_amount_counts_missing_as_zero():
+    assert to_amount(None) == Decimal(0)
+    assert to_amount(CurrencyValue(amount=None, symbol="¥", code="JPY")) == Decimal(0)
+
+
+def test_mapping_keeps_the_amount_without_symbol():
+    receipt = analyzed_receipt(Subtotal=1000, TotalTax=100, Total=1100)
+    assert (receipt.subtotal, receipt.tax, receipt.total, receipt.tip) == ("1000", "100", "1100", "")
+    assert receipt.receipt_items[0].total_price == "300"
+
+
+@pytest.mark.asyncio
+async def test_store_receipt_saves_money_and_rolls_it_up():
+    session = FakeSession()
+    record = await store_receipt(session, "r1", analyzed_receipt(Subtotal=1000.0, TotalTax=100.0, Total=1100.0))
+
+    assert isinstance(record, ReceiptRecord)
+    assert (record.subtotal, record.tax, record.tip, record.total) == (
+        Decimal("1000.0"),
+        Decimal("100.0"),
+        Decimal(0),
+        Decimal("1100.0"),
+    )
+    assert record.items[0].quantity == Decimal("2.0")
+    assert record.items[0].total_price == Decimal("300")
+    assert record.items[0].price is None
+    # One upsert per period bucket, each adding the receipt once.
+    assert sorted((params["period"], params["period_start"]) for params in session.rollups) == [
+        ("day", date(2023, 10, 1)),
+        ("month", date(2023, 10, 1)),
+    ]
+    for params in session.rollups:
+        assert (params["total"], params["tax"], params["receipt_count"]) == (Decimal("1100.0"), Decimal("100.0"), 1)
+
+
+@pytest.mark.asyncio
+async def test_storing_again_leaves_rollups_untouched():
+    session = FakeSession()
+    await store_receipt(session, "r1", analyzed_receipt(Total=1100.0, TotalTax=100.0))
+    session.rollups.clear()
+
+    await store_receipt(session, "r1", analyzed_receipt(Total=1100.0, TotalTax=100.0))
+    assert session.rollups == []
+
+
+@pytest.mark.asyncio
+async def test_correction_moves_only_the_difference():
+    session = FakeSession()
+    await store_receipt(session, "r1", analyzed_receipt(Total=1100.0, TotalTax=100.0))
+    session.rollups.clear()
+
+    await correct_receipt(session, "r1", {"total": Decimal("1650"), "tax": Decimal("150")})
+    assert len(session.rollups) == 2
+    for params in session.rollups:
+        assert (params["total"], params["tax"], params["receipt_count"]) == (Decimal("550.0"), Decimal("50.0"), 0)
@@ -0,0 +1,86 @@
+import asyncio
+
+import anyio
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.schema.base_response import BaseResponse
+from app.core.schema.error_schema import Error, ErrorCode
+from app.core.tracing import middleware
+from app.core.tracing.middleware import TracingMiddleware
+from app.core.tracing.tracing import Trace, current_trace, end_trace, span, start_trace
+
+
+def parents(trace: Trace) -> dict:
+    by_id = {s.span_id: s.name for s in trace.spans}
+    return {s.name: by_id.get(s.parent_id) for s in trace.spans[1:]}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_parent_their_own_spans():
+    trace = Trace("req", sampled=False)
+    token = start_trace(trace)
+
+    def render(index: int):
+        with span(f"render{index}"):
+            pass
+
+    async def page(index: int):
+        with span(f"page{index}"):
+            # Both pages are inside their span when the other one opens its children.
+            await asyncio.sleep(0.01)
+            await anyio.to_thread.run_sync(render, index)
+            with span(f"ocr{index}"):
+                await asyncio.sleep(0.01)
+
+    try:
+        with span("document"):
+            await asyncio.gather(page(1), page(2))
+        with span("serialization"):
+            pass
+    finally:
+        end_trace(token)
+
+    assert parents(trace) == {
+        "document": "request",
+        "page1": "document",
+        "page2": "document",
+        "render1": "page1",
+        "render2": "page2",
+        "ocr1": "page1",
+        "ocr2": "page2",
+        "serialization": "request",
+    }
+    assert all(s.end_ns for s in trace.spans[1:])
+    assert current_trace() is None
+
+
+def test_span_outside_a_request_is_a_no_op():
+    with span("orphan") as recorded:
+        recorded.set("key", "value")
+    assert current_trace() is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error_code, error",
+    [(ErrorCode.INTERNAL_SERVER_ERROR, True), (ErrorCode.WEBHOOK_URL_NOT_ALLOWED, False)],
+)
+async def test_handled_failure_answered_200_is_recorded(monkeypatch, error_code, error):
+    async def endpoint(request):
+        return JSONResponse(BaseResponse.failed(Error(error_code)))
+
+    exported = []
+    monkeypatch.setattr(middleware.EXPORTER, "export", exported.append)
+    app = TracingMiddleware(Starlette(routes=[Route("/", endpoint)]))
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/", headers={"traceparent": f"00-{'1' * 32}-{'2' * 16}-01"})
+
+    assert response.status_code == 200
+    (trace,) = exported
+    assert trace.root.error is error
+    assert trace.root.attributes["error.code"] == error_code.code
+    assert trace.root.attributes["error.status"] == error_code.status
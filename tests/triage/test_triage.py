@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.core.schema.error_schema import ErrorCode
+from app.core.triage.triage import assess
+
+# A4 at 300 dpi.
+A4 = (3508, 2480)
+
+
+def scan(lines=(), scale=2.0, top=300, seed=0) -> np.ndarray:
+    # Off-white paper with scanner noise, printed lines from `top`.
+    rng = np.random.default_rng(seed)
+    page = np.clip(rng.normal(235, 2.5, A4), 0, 255).astype(np.uint8)
+    for i, text in enumerate(lines):
+        cv2.putText(page, text, (200, top + i * 90), cv2.FONT_HERSHEY_SIMPLEX, scale, 20, 4)
+    return page
+
+
+INVOICE = [f"{i:02d}  Item number {i} of the invoice      1,200 JPY" for i in range(30)]
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        pytest.param(scan(INVOICE), id="dense"),
+        pytest.param(scan(["Delivery note 2023-10-01  No. 4711"]), id="one line"),
+        pytest.param(scan(["Delivery note 2023-10-01  No. 4711"], scale=1.0), id="one small line"),
+        pytest.param(scan(["ANNUAL REPORT 2023"], scale=4.0, top=1700), id="cover sheet"),
+    ],
+)
+def test_pages_with_text_pass(page):
+    verdict = assess(page)
+    assert verdict.passed, verdict.scores
+
+
+def test_blank_page_is_blank():
+    assert assess(scan()).reason == ErrorCode.IMAGE_BLANK
+
+
+def test_black_frame_is_too_dark():
+    frame = np.clip(np.random.default_rng(0).normal(8, 3, (3000, 4000, 3)), 0, 255).astype(np.uint8)
+    assert assess(frame).reason == ErrorCode.IMAGE_TOO_DARK
+
+
+@pytest.mark.parametrize("lines", [INVOICE, ["Delivery note 2023-10-01  No. 4711"]], ids=["dense", "one line"])
+def test_out_of_focus_pages_are_blurry(lines):
+    assert assess(cv2.GaussianBlur(scan(lines), (0, 0), 12)).reason == ErrorCode.IMAGE_TOO_BLURRY
+
+
+def test_small_image_is_too_small():
+    assert assess(np.full((100, 400), 255, np.uint8)).reason == ErrorCode.IMAGE_TOO_SMALL